@@ -0,0 +1,149 @@
+import os
+import json
+import logging
+import threading
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from metrics import REGISTRY, record_error
+
+# 하락률 구간 (주의권 10% 이하, 경고권 10-30%, 발동권 30% 초과)
+DECLINE_BANDS = ('low', 'medium', 'high')
+BAND_THRESHOLDS = (10.0, 30.0)
+
+# 아래 구간으로 내려갈 때 경계보다 이만큼(%p) 더 회복해야 인정 (경계 근처 반복 알림 방지)
+DEFAULT_HYSTERESIS = 1.0
+
+DEFAULT_ALERT_LOG = "data/alerts.jsonl"
+
+ALERTS = REGISTRY.counter('stocktracker_alerts_total', '하락률 구간 변경 알림 수', ['direction'])
+
+
+def decline_band(decline_rate: Optional[float]) -> Optional[str]:
+    """하락률이 속한 구간 (low/medium/high, 하락률이 없으면 None)"""
+    if decline_rate is None:
+        return None
+    return DECLINE_BANDS[bisect_left(BAND_THRESHOLDS, decline_rate)]
+
+
+class AlertEngine:
+    """하락률 구간 변경을 감지해 알림 싱크로 보내는 엔진
+
+    종목 레코드의 alert_band에 마지막으로 알린 구간을 저장해 두고, 새로고침에서 값이 바뀐
+    종목만 새 구간과 비교한다. 위 구간으로는 경계를 넘는 즉시 옮기고, 아래 구간으로는
+    경계보다 hysteresis만큼 더 회복해야 옮긴다. alert_band가 없는 종목은 알림 없이 현재
+    구간으로 초기화한다. 한 번의 평가에서 나온 알림은 모아서 싱크마다 한 번에 보낸다.
+    """
+
+    def __init__(self, sinks: Iterable = (), hysteresis: float = DEFAULT_HYSTERESIS):
+        self.sinks = list(sinks)
+        self.hysteresis = hysteresis
+
+    def initialize(self, record: Dict):
+        """알림 없이 현재 하락률 구간을 기록 (새로 추가한 종목용)"""
+        record['alert_band'] = decline_band(record.get('decline_rate'))
+
+    def evaluate(self, records: Dict[str, Dict]) -> List[Dict]:
+        """바뀐 종목 레코드들의 구간 변경 알림 목록 (레코드의 alert_band 갱신)"""
+        now = datetime.now().isoformat()
+        alerts = []
+        for code, record in records.items():
+            decline_rate = record.get('decline_rate')
+            if decline_rate is None or record.get('error_message'):
+                continue
+            if 'alert_band' not in record or record['alert_band'] not in DECLINE_BANDS:
+                self.initialize(record)
+                continue
+
+            previous = record['alert_band']
+            band = self._next_band(previous, decline_rate)
+            if band == previous:
+                continue
+
+            record['alert_band'] = band
+            direction = 'up' if DECLINE_BANDS.index(band) > DECLINE_BANDS.index(previous) else 'down'
+            alerts.append({
+                'code': code,
+                'name': record.get('name'),
+                'previous_status': previous,
+                'status': band,
+                'direction': direction,
+                'decline_rate': decline_rate,
+                'current_price': record.get('current_price'),
+                'recent_high': record.get('recent_high'),
+                'at': now
+            })
+        return alerts
+
+    def dispatch(self, alerts: List[Dict]):
+        """알림 묶음을 모든 싱크로 전송 (싱크 하나의 실패는 다른 싱크에 영향 없음)"""
+        if not alerts:
+            return
+        for alert in alerts:
+            ALERTS.inc(direction=alert['direction'])
+        for sink in self.sinks:
+            try:
+                sink.send(alerts)
+            except Exception as e:
+                logging.error(f"Error sending {len(alerts)} alerts to {type(sink).__name__}: {e}")
+                record_error('alerts', e)
+
+    def _next_band(self, current: str, decline_rate: float) -> str:
+        """히스테리시스를 적용한 새 구간"""
+        band = decline_band(decline_rate)
+        if DECLINE_BANDS.index(band) < DECLINE_BANDS.index(current):
+            # 경계보다 hysteresis만큼 더 내려왔을 때만 아래 구간으로 인정
+            band = max(band, decline_band(decline_rate + self.hysteresis), key=DECLINE_BANDS.index)
+        return band
+
+
+class JsonlAlertSink:
+    """알림을 JSON Lines 파일에 추가 기록하는 싱크 (묶음당 한 번의 쓰기)"""
+
+    def __init__(self, path: str = DEFAULT_ALERT_LOG):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, alerts: List[Dict]):
+        lines = ''.join(json.dumps(alert, ensure_ascii=False) + '\n' for alert in alerts)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+
+
+class WebhookAlertSink:
+    """알림을 batch_size개씩 묶어 {"alerts": [...]} JSON으로 POST하는 싱크"""
+
+    def __init__(self, url: str, batch_size: int = 50, timeout: float = 5.0):
+        self.url = url
+        self.batch_size = max(1, batch_size)
+        self.timeout = timeout
+
+    def send(self, alerts: List[Dict]):
+        import requests
+
+        for start in range(0, len(alerts), self.batch_size):
+            response = requests.post(
+                self.url, json={'alerts': alerts[start:start + self.batch_size]}, timeout=self.timeout
+            )
+            response.raise_for_status()
+
+
+def create_alert_engine(default_log_file: str = DEFAULT_ALERT_LOG) -> AlertEngine:
+    """환경 변수에 따른 알림 엔진 생성
+
+    ALERT_LOG_FILE: JSONL 기록 경로 (기본 default_log_file, 빈 값이면 기록 안 함)
+    ALERT_WEBHOOK_URL: 알림을 POST할 주소 (없으면 사용 안 함)
+    """
+    sinks = []
+    log_file = os.environ.get('ALERT_LOG_FILE', default_log_file)
+    if log_file:
+        sinks.append(JsonlAlertSink(log_file))
+    webhook_url = os.environ.get('ALERT_WEBHOOK_URL')
+    if webhook_url:
+        sinks.append(WebhookAlertSink(webhook_url))
+    return AlertEngine(sinks)
@@ -1,8 +1,16 @@
 import os
+import time
 import logging
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+import threading
+from collections import deque
+from datetime import datetime
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, g, stream_with_context
 from stock_tracker import StockTracker
 from stock_search import StockSearcher
+from refresh_jobs import RefreshJobManager
+from screener import MarketScreener
+from stock_events import StockEventBroker
+from metrics import REGISTRY, CONTENT_TYPE
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -10,9 +18,66 @@ logging.basicConfig(level=logging.DEBUG)
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
 
-# Initialize stock tracker and searcher
+# Initialize stock tracker (검색기는 첫 검색 요청 때 생성)
 tracker = StockTracker()
-searcher = StockSearcher()
+_searcher = None
+_searcher_lock = threading.Lock()
+refresh_jobs = RefreshJobManager(tracker)
+# 거래소 전체 스크리닝 결과 (screener.py가 미리 계산한 결과 테이블만 읽음)
+screener = MarketScreener()
+
+# 새로고침 결과를 열린 대시보드에 한 번에 전달 (/api/stream)
+events = StockEventBroker()
+tracker.add_listener(events.publish)
+# 다른 워커가 바꾼 종목도 이 워커의 /api/stream 클라이언트에 전달되도록 주기적으로 변경 확인
+# (gunicorn --preload로 실행하면 마스터에서 만든 스레드는 워커에 없으므로 사용하지 않음)
+if tracker.shared_state:
+    threading.Thread(target=tracker.watch_shared_state, daemon=True, name='stock-state-watch').start()
+
+# 일괄 추가 API의 요청당 최대 종목 수
+MAX_BULK_ADD = 1000
+
+# 스크리닝 API의 최대 반환 종목 수
+MAX_SCREEN_RESULTS = 5000
+
+# 로컬 웹훅 수신 API가 보관할 최근 알림 (ALERT_WEBHOOK_URL을 이 서버로 지정해 확인용으로 사용)
+received_alerts = deque(maxlen=200)
+
+# 요청 처리 지표
+REQUEST_SECONDS = REGISTRY.histogram(
+    'stocktracker_http_request_seconds', 'HTTP 요청 처리 시간 (초)', ['endpoint', 'method']
+)
+REQUESTS = REGISTRY.counter(
+    'stocktracker_http_requests_total', 'HTTP 요청 수', ['endpoint', 'method', 'status']
+)
+TRACKED_STOCKS = REGISTRY.gauge('stocktracker_tracked_stocks', '추적 중인 종목 수')
+STREAM_CLIENTS = REGISTRY.gauge('stocktracker_stream_clients', '/api/stream에 연결된 클라이언트 수')
+REGISTRY.register_collector(lambda: _searcher and _searcher.collect_metrics())
+REGISTRY.register_collector(lambda: TRACKED_STOCKS.set(len(tracker.stocks)))
+REGISTRY.register_collector(lambda: STREAM_CLIENTS.set(events.subscribers))
+
+def get_searcher() -> StockSearcher:
+    """종목 검색기 (첫 호출 때 생성, 목록 화면만 보는 워커는 만들지 않음)"""
+    global _searcher
+    if _searcher is None:
+        with _searcher_lock:
+            if _searcher is None:
+                _searcher = StockSearcher()
+    return _searcher
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """엔드포인트별 요청 처리 시간과 응답 코드 기록"""
+    started = g.pop('request_started', None)
+    endpoint = request.endpoint or 'unmatched'
+    if started is not None:
+        REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint, method=request.method)
+    REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    return response
 
 @app.route('/')
 def index():
@@ -52,6 +117,41 @@ def add_stock():
     
     return redirect(url_for('index'))
 
+@app.route('/api/add_stocks', methods=['POST'])
+def add_stocks():
+    """여러 종목 일괄 추가 API
+
+    요청 본문: {"stocks": [{"code": "005930", "name": "삼성전자"}, ...]}
+    종목별 결과(added/exists/duplicate/invalid/not_found/error)를 입력 순서대로 반환한다.
+    """
+    payload = request.get_json(silent=True) or {}
+    entries = payload.get('stocks')
+    if not isinstance(entries, list) or not entries or not all(isinstance(entry, dict) for entry in entries):
+        return jsonify({
+            'success': False,
+            'error': 'stocks는 {"code", "name"} 항목의 목록이어야 합니다.'
+        }), 400
+    
+    if len(entries) > MAX_BULK_ADD:
+        return jsonify({
+            'success': False,
+            'error': f'한 번에 최대 {MAX_BULK_ADD}개 종목까지 추가할 수 있습니다.'
+        }), 400
+    
+    try:
+        results = tracker.add_stocks(entries)
+        return jsonify({
+            'success': True,
+            'results': results,
+            'added_count': len([result for result in results if result['status'] == 'added'])
+        })
+    except Exception as e:
+        logging.error(f"Error adding stocks: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @app.route('/remove_stock/<stock_code>')
 def remove_stock(stock_code):
     """추적 종목 제거"""
@@ -69,16 +169,50 @@ def remove_stock(stock_code):
 
 @app.route('/refresh_data')
 def refresh_data():
-    """모든 추적 종목의 데이터 새로고침"""
+    """모든 추적 종목의 데이터 새로고침 (백그라운드 작업으로 실행)"""
+    wants_json = request.args.get('format') == 'json' or \
+        request.accept_mimetypes.best == 'application/json'
+    
     try:
-        updated_count = tracker.refresh_all_stocks()
-        flash(f'{updated_count}개 종목의 데이터가 업데이트되었습니다.', 'success')
+        job = refresh_jobs.start_refresh()
     except Exception as e:
-        logging.error(f"Error refreshing data: {e}")
+        logging.error(f"Error starting refresh: {e}")
+        if wants_json:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 500
         flash(f'데이터 새로고침에 실패했습니다: {str(e)}', 'error')
+        return redirect(url_for('index'))
+    
+    if wants_json:
+        return jsonify({
+            'success': True,
+            'job': job,
+            'status_url': url_for('job_status', job_id=job['id'])
+        }), 202
     
+    if job['attached']:
+        flash('이미 진행 중인 새로고침이 있습니다. 완료되면 자동으로 반영됩니다.', 'success')
+    else:
+        flash(f'{job["total"]}개 종목의 새로고침을 시작했습니다.', 'success')
     return redirect(url_for('index'))
 
+@app.route('/api/jobs/<job_id>')
+def job_status(job_id):
+    """백그라운드 새로고침 작업 진행 상황 API"""
+    job = refresh_jobs.get_job(job_id)
+    if not job:
+        return jsonify({
+            'success': False,
+            'error': '작업을 찾을 수 없습니다.'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'job': job
+    })
+
 @app.route('/api/search_stock')
 def search_stock():
     """종목명으로 종목 검색 API"""
@@ -97,7 +231,7 @@ def search_stock():
             })
         
         # 종목 검색
-        results = searcher.search_stock_by_name(query)
+        results = get_searcher().search_stock_by_name(query)
         
         return jsonify({
             'success': True,
@@ -116,7 +250,7 @@ def search_stock():
 def popular_stocks():
     """인기 종목 목록 API"""
     try:
-        stocks = searcher.get_popular_stocks()
+        stocks = get_searcher().get_popular_stocks()
         return jsonify({
             'success': True,
             'stocks': stocks,
@@ -131,14 +265,26 @@ def popular_stocks():
 
 @app.route('/api/stock_status')
 def stock_status():
-    """AJAX용 주식 상태 API"""
+    """AJAX용 주식 상태 API (데이터 버전 기반 ETag/304 지원)"""
     try:
         stocks = tracker.get_tracked_stocks()
-        return jsonify({
+        etag = tracker.get_data_etag()
+        
+        # 데이터가 바뀌지 않았으면 본문 없이 304 응답
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+        
+        response = jsonify({
             'success': True,
             'stocks': stocks,
-            'count': len(stocks)
+            'count': len(stocks),
+            'drawdown_windows': list(tracker.drawdown_windows)
         })
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
     except Exception as e:
         logging.error(f"Error getting stock status: {e}")
         return jsonify({
@@ -146,5 +292,147 @@ def stock_status():
             'error': str(e)
         }), 500
 
+@app.route('/api/stream')
+def stock_stream():
+    """종목 변경 Server-Sent Events 스트림 (Last-Event-ID로 재접속 시 놓친 이벤트 전송)"""
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    response = app.response_class(
+        stream_with_context(events.stream(last_event_id)),
+        mimetype='text/event-stream'
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    # 프록시 버퍼링으로 이벤트가 늦게 전달되지 않도록 함
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/screen')
+def screen_market():
+    """거래소 전체 하락률 스크리닝 API (min_decline: %, market: KOSPI/KOSDAQ, window: 거래일 수, limit)"""
+    try:
+        min_decline = float(request.args.get('min_decline') or 0.0)
+        window = request.args.get('window')
+        window = int(window) if window else None
+        limit = int(request.args.get('limit') or 100)
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'min_decline, window, limit은 숫자여야 합니다.'
+        }), 400
+    market = (request.args.get('market') or '').strip().upper() or None
+    
+    if window is not None and window not in screener.windows:
+        return jsonify({
+            'success': False,
+            'error': f"window는 {', '.join(str(window) for window in screener.windows)} 중 하나여야 합니다."
+        }), 400
+    
+    try:
+        result = screener.screen(min_decline, market, window, max(1, min(limit, MAX_SCREEN_RESULTS)))
+        if result is None:
+            return jsonify({
+                'success': False,
+                'error': '스크리닝 결과가 아직 없습니다. screener.py를 먼저 실행하세요.'
+            }), 503
+        
+        # 결과 테이블과 조건이 같으면 304 응답
+        etag = f"screen-{result['computed_at']}-{request.query_string.decode()}"
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+        
+        response = jsonify(dict(result, success=True))
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    except Exception as e:
+        logging.error(f"Error screening market: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/alerts', methods=['GET', 'POST'])
+def alerts_webhook():
+    """하락률 구간 변경 알림 웹훅 수신(POST {"alerts": [...]}) 및 최근 수신 목록 조회(GET)"""
+    if request.method == 'POST':
+        payload = request.get_json(silent=True) or {}
+        alerts = payload.get('alerts')
+        if not isinstance(alerts, list):
+            return jsonify({
+                'success': False,
+                'error': 'alerts 목록이 필요합니다.'
+            }), 400
+        received_alerts.extend(alerts)
+        return jsonify({'success': True, 'received': len(alerts)})
+    
+    return jsonify({
+        'success': True,
+        'alerts': list(received_alerts)[::-1],
+        'count': len(received_alerts)
+    })
+
+@app.route('/api/stock/<stock_code>/drawdown')
+def stock_drawdown(stock_code):
+    """고점 대비 하락률 시계열 API (start/end: YYYY-MM-DD, points: 최대 점 수, window: 고점 기간 일수)"""
+    try:
+        start = request.args.get('start')
+        end = request.args.get('end')
+        start = datetime.strptime(start, '%Y-%m-%d') if start else None
+        end = datetime.strptime(end, '%Y-%m-%d') if end else None
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': '날짜는 YYYY-MM-DD 형식이어야 합니다.'
+        }), 400
+    
+    try:
+        points = request.args.get('points')
+        window = request.args.get('window')
+        points = int(points) if points else None
+        window = int(window) if window else None
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'points와 window는 정수여야 합니다.'
+        }), 400
+    
+    if (points is not None and points < 3) or (window is not None and window < 1):
+        return jsonify({
+            'success': False,
+            'error': 'points는 3 이상, window는 1 이상이어야 합니다.'
+        }), 400
+    
+    try:
+        # 같은 데이터 버전과 조건이면 304 응답
+        etag = f"{tracker.get_data_etag()}-{stock_code}-{request.query_string.decode()}"
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+        
+        series = tracker.get_drawdown_series(stock_code, start, end, window, points)
+        if series is None:
+            return jsonify({
+                'success': False,
+                'error': '추적 중인 종목이 아닙니다.'
+            }), 404
+        
+        response = jsonify(dict(series, success=True))
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    except Exception as e:
+        logging.error(f"Error getting drawdown series for {stock_code}: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus 텍스트 형식 지표"""
+    return app.response_class(REGISTRY.render(), mimetype=None, content_type=CONTENT_TYPE)
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+종목 검색 인덱스 벤치마크
+합성 종목명 N개(기본 10,000 / 50,000)에 대해 선형 탐색과 SymbolIndex의 질의 지연을 비교
+
+사용법: python benchmarks/bench_search.py [종목 수 ...]
+"""
+
+import os
+import sys
+import time
+import random
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search_index import (
+    SymbolIndex, extract_chosung, hangul_partial_match, has_hangul, is_chosung_query, is_hangul_syllable
+)
+
+HANGUL_SYLLABLES = [chr(code) for code in range(0xAC00, 0xD7A4, 37)]
+LATIN = 'abcdefghijklmnopqrstuvwxyz'
+
+
+def generate_database(size: int, seed: int = 42) -> dict:
+    """합성 종목 데이터베이스 생성 (한글/영문 혼합 종목명)"""
+    rng = random.Random(seed)
+    database = {}
+    while len(database) < size:
+        if rng.random() < 0.7:
+            name = ''.join(rng.choice(HANGUL_SYLLABLES) for _ in range(rng.randint(2, 8)))
+        else:
+            name = ''.join(rng.choice(LATIN) for _ in range(rng.randint(3, 12))).capitalize()
+        database[name] = {'code': f"{len(database):06d}", 'market': 'KOSPI'}
+    return database
+
+
+def linear_search(database: dict, query: str) -> list:
+    """기존 search_in_local_database 방식의 선형 탐색"""
+    query = query.lower()
+    return [
+        name for name in database
+        if query == name.lower() or query in name.lower() or name.lower() in query
+    ]
+
+
+def reference_search(database: dict, query: str) -> list:
+    """SymbolIndex.search와 같은 일치 규칙의 선형 탐색 (인덱스 결과 전체와 비교용)
+
+    종목명 부분 일치/역포함, 종목코드 접두사, 한글 질의의 초성 일치 또는 입력 중 음절 일치.
+    """
+    key = SymbolIndex.normalize(query)
+    if not key:
+        return []
+    results = []
+    for name, info in database.items():
+        target = SymbolIndex.normalize(name)
+        code = SymbolIndex.normalize(str(info.get('code', '')))
+        if key in target or target in key or code.startswith(key):
+            results.append(name)
+        elif has_hangul(key):
+            if is_chosung_query(key):
+                matched = key in extract_chosung(target)
+            else:
+                matched = hangul_partial_match(key, target)
+            if matched:
+                results.append(name)
+    return results
+
+
+def generate_queries(database: dict, count: int, seed: int = 7) -> list:
+    """실제 입력과 비슷한 질의 생성 (접두사, 중간 부분 문자열, 없는 문자열)"""
+    rng = random.Random(seed)
+    names = list(database)
+    queries = []
+    for _ in range(count):
+        name = rng.choice(names)
+        kind = rng.random()
+        if kind < 0.5:
+            queries.append(name[:rng.randint(2, max(2, len(name)))])
+        elif kind < 0.8 and len(name) > 3:
+            start = rng.randint(1, len(name) - 2)
+            queries.append(name[start:start + 2])
+        else:
+            queries.append(''.join(rng.choice(HANGUL_SYLLABLES) for _ in range(3)))
+    return queries
+
+
+def measure(fn, queries: list) -> list:
+    """질의별 소요 시간(마이크로초) 측정"""
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return timings
+
+
+def summarize(timings: list) -> str:
+    """p50/p95/평균 요약 문자열"""
+    ordered = sorted(timings)
+    p50 = ordered[len(ordered) // 2]
+    p95 = ordered[int(len(ordered) * 0.95)]
+    return f"p50 {p50:9.1f}us  p95 {p95:9.1f}us  mean {statistics.mean(timings):9.1f}us"
+
+
+def run(size: int, query_count: int = 500):
+    database = generate_database(size)
+    queries = generate_queries(database, query_count)
+
+    start = time.perf_counter()
+    index = SymbolIndex(database.items())
+    build_ms = (time.perf_counter() - start) * 1000
+
+    # 결과 일치 확인 (누락, 순서뿐 아니라 추가로 잘못 찾은 종목도 불일치로 봄)
+    rng = random.Random(11)
+    hangul_names = [name for name in database if is_hangul_syllable(name[0])]
+    chosung_queries = [extract_chosung(rng.choice(hangul_names))[:3] for _ in range(query_count)]
+    code_queries = [info['code'][:4] for info in list(database.values())[:10]]
+    for query in queries[:50] + chosung_queries[:50] + code_queries:
+        expected = reference_search(database, query)
+        actual = [name for name, _ in index.search(query)]
+        assert actual == expected, f"결과 불일치: {query} (기대 {len(expected)}개, 실제 {len(actual)}개)"
+        # 기존 선형 탐색 결과는 모두 포함되어야 함
+        assert set(linear_search(database, query)) <= set(actual), f"기존 결과 누락: {query}"
+
+    print(f"\n=== 종목 수 {size:,} (인덱스 구축 {build_ms:.0f}ms) ===")
+    print(f"선형 탐색 : {summarize(measure(lambda q: linear_search(database, q), queries))}")
+    print(f"인덱스    : {summarize(measure(index.search, queries))}")
+
+    # 초성 질의 (예: 'ㅅㅅㅈ')
+    chosung_keys = [extract_chosung(name) for name in database]
+    print(f"초성 선형 : {summarize(measure(lambda q: [k for k in chosung_keys if q in k], chosung_queries))}")
+    print(f"초성 인덱스: {summarize(measure(index.search, chosung_queries))}")
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 50000]
+    for size in sizes:
+        run(size)
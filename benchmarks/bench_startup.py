@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+콜드 스타트(import 및 첫 화면) 시간 벤치마크
+시나리오마다 새 파이썬 프로세스를 -X importtime으로 실행해 전체 소요 시간과
+모듈별 누적 import 시간을 측정한다. 시간 예산을 넘거나, 시세를 받지 않는 경로에서
+무거운 모듈(yfinance, pandas, numpy, requests)을 불러오면 종료 코드 1을 반환한다.
+
+사용법:
+  python benchmarks/bench_startup.py [--runs 5] [--top 8] [--budget-scale 1.0]
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+
+# 시세 조회나 하락률 계산 없이 목록만 보여주는 경로에서 불러오면 안 되는 모듈
+HEAVY_MODULES = ('yfinance', 'pandas', 'numpy', 'requests')
+
+# (시나리오 이름, 실행할 코드, 시간 예산(ms))
+SCENARIOS = [
+    ('import_tracker', 'import stock_tracker', 150),
+    ('import_export', 'import static_export', 150),
+    ('import_app', 'import app', 400),
+    ('render_cached', (
+        "import app\n"
+        "client = app.app.test_client()\n"
+        "assert client.get('/').status_code == 200\n"
+        "assert client.get('/api/stock_status').status_code == 200"
+    ), 500),
+]
+
+CHILD_TEMPLATE = """
+import sys, json, time
+start = time.perf_counter()
+{code}
+seconds = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{'seconds': seconds, 'heavy': heavy}}))
+"""
+
+
+def run_scenario(code: str, workdir: str) -> dict:
+    """새 프로세스에서 코드 한 번 실행 ({'seconds', 'heavy', 'modules'})"""
+    env = dict(os.environ, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE='1')
+    env.pop('STOCK_STORAGE', None)
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD_TEMPLATE.format(code=code, heavy=HEAVY_MODULES)],
+        cwd=workdir, env=env, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr else 'failed')
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['modules'] = parse_importtime(completed.stderr)
+    return result
+
+
+def parse_importtime(stderr: str) -> dict:
+    """-X importtime 출력에서 저장소 모듈과 저장소 모듈이 직접 불러온 모듈의 누적 시간 (이름 -> 초)
+
+    출력은 하위 import가 먼저 나오고 들여쓰기 깊이가 중첩 수준이므로, 거꾸로 읽으며
+    바로 위 수준의 모듈을 부모로 찾는다.
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((depth, name.strip(), int(cumulative) / 1_000_000))
+
+    modules = {}
+    parents = []
+    for depth, name, seconds in reversed(entries):
+        del parents[depth:]
+        parent = parents[-1] if parents else None
+        if is_repo_module(name) or (parent and is_repo_module(parent)):
+            modules[name] = modules.get(name, 0.0) + seconds
+        parents.append(name)
+    return modules
+
+
+def is_repo_module(name: str) -> bool:
+    """저장소 최상위의 모듈인지 여부"""
+    return os.path.exists(os.path.join(ROOT, name.split('.')[0] + '.py'))
+
+
+def prepare_workdir() -> str:
+    """저장소의 종목 데이터를 복사한 임시 작업 디렉토리 (실제 data/를 건드리지 않음)"""
+    workdir = tempfile.mkdtemp(prefix='stock-startup-')
+    os.makedirs(os.path.join(workdir, 'data'))
+    source = os.path.join(ROOT, 'data', 'stocks.json')
+    if os.path.exists(source):
+        shutil.copy(source, os.path.join(workdir, 'data', 'stocks.json'))
+    return workdir
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='StockTracker 콜드 스타트 벤치마크')
+    parser.add_argument('--runs', type=int, default=5, help='시나리오별 반복 횟수 (중앙값 사용)')
+    parser.add_argument('--top', type=int, default=8, help='출력할 모듈별 import 시간 개수')
+    parser.add_argument('--budget-scale', type=float, default=1.0,
+                        help='시간 예산 배율 (느린 CI 머신에서 예: 2.0)')
+    args = parser.parse_args()
+
+    ok = True
+    workdir = prepare_workdir()
+    try:
+        print(f"{'시나리오':<18}{'중앙값(ms)':>12}{'예산(ms)':>10}  결과")
+        details = []
+        for name, code, budget_ms in SCENARIOS:
+            runs = [run_scenario(code, workdir) for _ in range(max(1, args.runs))]
+            median_ms = statistics.median(run['seconds'] for run in runs) * 1000
+            budget_ms *= args.budget_scale
+            heavy = sorted(set().union(*(run['heavy'] for run in runs)))
+
+            status = 'ok'
+            if median_ms > budget_ms:
+                status = 'FAIL (예산 초과)'
+                ok = False
+            if heavy:
+                status = f"FAIL (무거운 모듈: {', '.join(heavy)})"
+                ok = False
+            print(f"{name:<18}{median_ms:>12.1f}{budget_ms:>10.0f}  {status}")
+            details.append((name, runs[-1]['modules']))
+
+        for name, modules in details:
+            print(f"\n=== {name}: 모듈별 누적 import 시간 (저장소 모듈 및 직접 불러온 모듈) ===")
+            for module, seconds in sorted(modules.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+                marker = '' if is_repo_module(module) else '  (의존성)'
+                print(f"{module:<32}{seconds * 1000:>10.1f}ms{marker}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+추적기/검색/정적 내보내기 핵심 경로 벤치마크
+합성 시장 데이터와 가짜 검색 백엔드로 네트워크 없이 실행하며, 종목 수별로
+시나리오마다 소요 시간, 처리량, 최대 메모리 증가량을 측정한다.
+종목 수마다 새 프로세스에서 실행하고, 결과를 기준값(baseline.json)과 비교한다.
+
+사용법:
+  python benchmarks/bench_suite.py [--sizes 10,1000,10000] [--save-baseline]
+                                   [--baseline PATH] [--max-regression 0.25]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+DEFAULT_SIZES = [10, 1000, 10000]
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+
+# 이보다 짧은 시나리오는 측정 오차가 커서 회귀 판정에서 제외
+MIN_COMPARABLE_SECONDS = 0.05
+
+SEARCH_QUERIES = ['삼성', '카카오', 'ㅅㅅㅈㅈ', '현대ㅊ', 'apple', '005930', '없는종목이름', 'zzqx']
+
+
+def current_rss_mb() -> float:
+    """현재 프로세스 RSS (MB)"""
+    return _read_status('VmRSS:')
+
+
+def peak_rss_mb() -> float:
+    """프로세스 최대 RSS (MB)"""
+    peak = _read_status('VmHWM:')
+    if peak:
+        return peak
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def reset_peak_rss():
+    """최대 RSS 기록 초기화 (Linux에서만 지원, 실패하면 누적 최대값 사용)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def _read_status(field: str) -> float:
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+class ScenarioRunner:
+    """시나리오 실행 및 측정 결과 수집"""
+
+    def __init__(self):
+        self.results = {}
+
+    def run(self, name: str, func, items: int):
+        """func 실행 시간과 최대 RSS 증가량 측정 (items: 처리량 계산용 작업 수)"""
+        reset_peak_rss()
+        base_rss = current_rss_mb()
+        start = time.perf_counter()
+        func()
+        seconds = time.perf_counter() - start
+        self.results[name] = {
+            'seconds': round(seconds, 4),
+            'throughput': round(items / seconds, 1) if seconds > 0 else None,
+            'peak_mb': round(max(peak_rss_mb() - base_rss, 0.0), 1),
+            'items': items
+        }
+
+
+def run_size(size: int) -> dict:
+    """종목 수 하나에 대한 전체 시나리오 (자식 프로세스에서 실행)"""
+    from synthetic_market import SyntheticMarket, FakeSearchBackend, make_codes, write_symbol_master
+
+    market = SyntheticMarket()
+
+    from stock_tracker import StockTracker
+    from stock_search import StockSearcher
+    from refresh_engine import RefreshEngine
+    from search_cache import SearchCache
+    import static_export
+
+    runner = ScenarioRunner()
+    workdir = tempfile.mkdtemp(prefix='stock-bench-')
+    try:
+        os.makedirs(os.path.join(workdir, 'data'))
+        shutil.copytree(os.path.join(ROOT, 'static'), os.path.join(workdir, 'static'))
+        os.chdir(workdir)
+        os.environ.pop('STOCK_STORAGE', None)
+
+        # 요청 속도 제한 없이 처리 경로 자체의 비용을 측정
+        tracker = StockTracker('data/stocks.json', refresh_engine=RefreshEngine(requests_per_second=1e6),
+                               provider=market)
+        codes = make_codes(size)
+        for code in codes:
+            tracker.stocks[code] = {
+                'name': f"종목{code}",
+                'code': code,
+                'original_code': code,
+                'added_date': None,
+                'last_updated': None,
+                'current_price': None,
+                'recent_high': None,
+                'recent_high_date': None,
+                'decline_rate': None,
+                'error_message': None,
+                'market_type': tracker._get_market_type(code)
+            }
+
+        # 실행 시각의 장 상태와 무관하게 모든 종목을 조회
+        runner.run('refresh_cold', lambda: tracker.refresh_all_stocks(force=True), size)
+        runner.run('refresh_incremental', lambda: tracker.refresh_all_stocks(force=True), size)
+        runner.run('save_stocks', tracker.save_stocks, size)
+
+        def view_cold():
+            tracker._bump_version()
+            tracker.get_tracked_stocks()
+        runner.run('tracked_stocks_build', view_cold, size)
+        runner.run('tracked_stocks_cached', lambda: [tracker.get_tracked_stocks() for _ in range(100)], 100)
+        runner.run('static_export', static_export.create_static_html, size)
+
+        # 검색: 종목 마스터 크기 = 종목 수
+        master = os.path.join(workdir, 'data', 'symbol_master.csv')
+        names = write_symbol_master(master, size)
+        os.environ['SYMBOL_MASTER_FILE'] = master
+        backend = FakeSearchBackend()
+        searcher = StockSearcher(cache=SearchCache())
+        backend.install(searcher)
+        queries = SEARCH_QUERIES + [name[:2] for name in names[:20]]
+
+        runner.run('search_index_build', lambda: searcher.search_index, size)
+        runner.run('search_cold', lambda: [searcher.search_stock_by_name(q) for q in queries], len(queries))
+        runner.run('search_warm', lambda: [searcher.search_stock_by_name(q) for q in queries * 10], len(queries) * 10)
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return runner.results
+
+
+def measure(size: int) -> dict:
+    """자식 프로세스에서 종목 수 하나를 측정"""
+    output = subprocess.check_output([sys.executable, __file__, '--child', str(size)], cwd=ROOT)
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> bool:
+    """기준값 대비 변화 출력 (허용 범위를 넘는 회귀가 있으면 False)"""
+    ok = True
+    for size, scenarios in results.items():
+        base_scenarios = baseline.get('results', {}).get(size, {})
+        print(f"\n=== 종목 수 {int(size):,} ===")
+        print(f"{'시나리오':<24}{'시간(s)':>10}{'처리량/s':>12}{'최대메모리':>10}{'기준 대비':>12}")
+        for name, result in scenarios.items():
+            base = base_scenarios.get(name)
+            delta = ''
+            if base and base['seconds'] >= MIN_COMPARABLE_SECONDS:
+                change = (result['seconds'] - base['seconds']) / base['seconds']
+                delta = f"{change * 100:+.1f}%"
+                if max_regression is not None and change > max_regression:
+                    delta += ' FAIL'
+                    ok = False
+            throughput = f"{result['throughput']:,.0f}" if result['throughput'] else '-'
+            print(f"{name:<24}{result['seconds']:>10.3f}{throughput:>12}{result['peak_mb']:>8.1f}MB{delta:>12}")
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='StockTracker 오프라인 벤치마크')
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES))
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='측정 결과를 기준값으로 저장')
+    parser.add_argument('--max-regression', type=float, default=None,
+                        help='기준 대비 허용 시간 증가율 (예: 0.25). 넘으면 종료 코드 1')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    results = {str(size): measure(size) for size in sizes}
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    ok = compare(results, baseline, args.max_regression)
+
+    if args.save_baseline:
+        merged = dict(baseline.get('results', {}), **results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'results': merged
+            }, f, ensure_ascii=False, indent=2)
+        print(f"\n기준값 저장: {args.baseline}")
+
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2 and sys.argv[1] == '--child':
+        import logging
+        logging.disable(logging.CRITICAL)
+        print(json.dumps(run_size(int(sys.argv[2]))))
+    else:
+        sys.exit(main())
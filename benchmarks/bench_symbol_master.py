@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+종목 마스터 로드 벤치마크
+합성 전체 상장 종목 CSV(기본 40,000건)를 만들어 로드 시간과 RSS 증가량을 측정하고
+예산을 넘으면 실패(종료 코드 1)한다. 측정마다 새 프로세스를 사용한다.
+
+사용법: python benchmarks/bench_symbol_master.py [종목 수]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# 예산 (종목 40,000건 기준)
+BUDGET_TABLE_RSS_MB = 16
+BUDGET_INDEX_RSS_MB = 160
+BUDGET_LOAD_SECONDS = 1.0
+BUDGET_INDEX_SECONDS = 5.0
+
+HANGUL_SYLLABLES = [chr(code) for code in range(0xAC00, 0xD7A4, 37)]
+LATIN = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+MARKETS = [('KOSPI', '.KS'), ('KOSDAQ', '.KQ'), ('NASDAQ', ''), ('NYSE', ''), ('Tokyo', '.T')]
+
+
+def current_rss_mb() -> float:
+    """현재 프로세스 RSS (MB)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def write_listing(path: str, size: int, seed: int = 42):
+    """합성 종목 마스터 CSV 생성"""
+    rng = random.Random(seed)
+    names = set()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('name,code,market,suffix\n')
+        while len(names) < size:
+            market, suffix = rng.choice(MARKETS)
+            if suffix in ('.KS', '.KQ'):
+                name = ''.join(rng.choice(HANGUL_SYLLABLES) for _ in range(rng.randint(2, 8)))
+                code = f"{rng.randint(0, 999999):06d}"
+            else:
+                name = ''.join(rng.choice(LATIN) for _ in range(rng.randint(3, 14))).title()
+                code = ''.join(rng.choice(LATIN) for _ in range(rng.randint(2, 5)))
+            if name in names:
+                continue
+            names.add(name)
+            f.write(f"{name},{code},{market},{suffix}\n")
+
+
+def child(mode: str, path: str):
+    """측정용 자식 프로세스: 결과를 JSON으로 출력"""
+    from stock_search import StockSearcher
+    from symbol_master import load_symbol_table, read_symbol_master
+    from search_index import SymbolIndex
+
+    builtin = StockSearcher()._load_stock_database()
+    base_rss = current_rss_mb()
+    start = time.perf_counter()
+
+    if mode == 'table':
+        table = load_symbol_table(builtin, path)
+        count = len(table)
+    elif mode == 'dict':
+        table = dict(builtin)
+        for name, code, market, suffix in read_symbol_master(path):
+            table.setdefault(name, {'code': code, 'market': market, 'suffix': suffix})
+        count = len(table)
+    else:
+        table = load_symbol_table(builtin, path)
+        index = SymbolIndex(table=table)
+        count = len(index)
+
+    print(json.dumps({
+        'count': count,
+        'seconds': time.perf_counter() - start,
+        'rss_mb': current_rss_mb() - base_rss
+    }))
+
+
+def measure(mode: str, path: str) -> dict:
+    output = subprocess.check_output([sys.executable, __file__, '--child', mode, path], cwd=ROOT)
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def main(size: int) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'symbol_master.csv')
+        write_listing(path, size)
+
+        results = {mode: measure(mode, path) for mode in ('dict', 'table', 'index')}
+
+    print(f"=== 종목 마스터 {size:,}건 ===")
+    labels = {'dict': 'dict 레이아웃', 'table': '압축 테이블', 'index': '테이블+인덱스'}
+    for mode, result in results.items():
+        print(f"{labels[mode]:<14}: {result['seconds'] * 1000:8.0f}ms  RSS +{result['rss_mb']:6.1f}MB")
+
+    checks = [
+        ('테이블 RSS', results['table']['rss_mb'], BUDGET_TABLE_RSS_MB),
+        ('테이블 로드 시간', results['table']['seconds'], BUDGET_LOAD_SECONDS),
+        ('인덱스 포함 RSS', results['index']['rss_mb'], BUDGET_INDEX_RSS_MB),
+        ('인덱스 구축 시간', results['index']['seconds'], BUDGET_INDEX_SECONDS)
+    ]
+    failed = False
+    for label, value, budget in checks:
+        ok = value <= budget
+        failed |= not ok
+        print(f"{'OK ' if ok else 'FAIL'} {label}: {value:.2f} (예산 {budget})")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        child(sys.argv[2], sys.argv[3])
+    else:
+        sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 40000))
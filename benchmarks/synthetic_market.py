@@ -0,0 +1,118 @@
+"""
+벤치마크용 합성 시장 데이터와 가짜 검색 백엔드
+네트워크 없이 항상 같은 결과를 내도록 종목 코드로 난수 시드를 정한다.
+"""
+
+import time
+import zlib
+import random
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from market_data import MarketDataProvider, slice_history
+
+# 합성 가격의 기준 시작일 (요청 기간과 무관하게 같은 날짜의 봉은 항상 같은 값)
+EPOCH = pd.Timestamp('2015-01-02')
+
+HANGUL_SYLLABLES = [chr(code) for code in range(0xAC00, 0xD7A4, 37)]
+LATIN = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def make_codes(count: int) -> List[str]:
+    """합성 종목 코드 목록 (한국/미국 형식 혼합)"""
+    codes = []
+    for i in range(count):
+        if i % 3 == 2:
+            codes.append(f"S{i:05d}")
+        else:
+            codes.append(f"{i:06d}.KS")
+    return codes
+
+
+class SyntheticMarket(MarketDataProvider):
+    """종목별 결정적 일봉(OHLCV)을 만드는 시세 제공자
+
+    StockTracker(provider=SyntheticMarket())로 주면 네트워크 없이 동작한다.
+    latency를 주면 호출마다 그만큼 대기하여 외부 API 지연을 흉내 낸다.
+    """
+
+    def __init__(self, latency: float = 0.0, as_of: Optional[datetime] = None):
+        self.latency = latency
+        self.as_of = pd.Timestamp(as_of or datetime.now()).normalize()
+        self.calls = 0
+        self._dates = pd.bdate_range(EPOCH, self.as_of)
+
+    def history(self, code: str, start=None, end=None) -> pd.DataFrame:
+        """종목 하나의 일봉 DataFrame"""
+        rng = np.random.default_rng(zlib.crc32(code.encode()))
+        count = len(self._dates)
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0002, 0.02, count)))
+        spread = np.abs(rng.normal(0, 0.01, count))
+        frame = pd.DataFrame({
+            'Open': close * (1 + rng.normal(0, 0.005, count)),
+            'High': close * (1 + spread),
+            'Low': close * (1 - spread),
+            'Close': close,
+            'Volume': rng.integers(1_000, 1_000_000, count).astype(float)
+        }, index=self._dates)
+        frame.index.name = 'Date'
+        return slice_history(frame, start, end)
+
+    def get_history(self, symbols: List[str], start: datetime, end: datetime) -> Dict[str, pd.DataFrame]:
+        """여러 종목의 일봉 (호출마다 latency만큼 대기)"""
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return {symbol: self.history(symbol, start, end) for symbol in symbols}
+
+
+class FakeSearchBackend:
+    """외부 종목 검색 제공자 대용 (지연 시간 후 합성 결과 반환)"""
+
+    def __init__(self, latency: float = 0.02):
+        self.latency = latency
+        self.calls = 0
+
+    def __call__(self, query: str) -> List[Dict]:
+        self.calls += 1
+        time.sleep(self.latency)
+        seed = zlib.crc32(query.encode())
+        if seed % 4 == 0:
+            return []
+        return [{
+            'name': f"{query} {i}",
+            'code': f"{(seed + i) % 1000000:06d}",
+            'market': 'KOSPI',
+            'suffix': '.KS',
+            'full_code': f"{(seed + i) % 1000000:06d}.KS"
+        } for i in range(3)]
+
+    def install(self, searcher):
+        """StockSearcher의 모든 외부 제공자를 이 백엔드로 교체"""
+        for provider in searcher.remote_providers:
+            searcher.remote_providers[provider] = self
+
+
+def write_symbol_master(path: str, size: int, seed: int = 42) -> List[str]:
+    """합성 종목 마스터 CSV 생성 (생성된 종목명 목록 반환)"""
+    rng = random.Random(seed)
+    names = []
+    seen = set()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('name,code,market,suffix\n')
+        while len(names) < size:
+            if rng.random() < 0.7:
+                name = ''.join(rng.choice(HANGUL_SYLLABLES) for _ in range(rng.randint(2, 8)))
+                f_code, market, suffix = f"{rng.randint(0, 999999):06d}", 'KOSPI', '.KS'
+            else:
+                name = ''.join(rng.choice(LATIN) for _ in range(rng.randint(3, 12))).title()
+                f_code, market, suffix = ''.join(rng.choice(LATIN) for _ in range(4)), 'NASDAQ', ''
+            if name in seen:
+                continue
+            seen.add(name)
+            names.append(name)
+            f.write(f"{name},{f_code},{market},{suffix}\n")
+    return names
@@ -0,0 +1,51 @@
+import os
+import json
+import hashlib
+import tempfile
+from typing import Dict, Optional
+
+# 가격 변동과 무관하게 조회할 때마다 바뀌는 필드 (변경 감지에서 제외)
+VOLATILE_FIELDS = ('last_updated', 'high_window')
+
+
+def record_digest(data: Dict) -> str:
+    """종목 레코드에서 의미 있는 필드(가격, 고점, 하락률, 오류 등)만의 해시"""
+    meaningful = {key: value for key, value in data.items() if key not in VOLATILE_FIELDS}
+    payload = json.dumps(meaningful, ensure_ascii=False, sort_keys=True, default=str)
+    return content_digest(payload.encode('utf-8'))
+
+
+def content_digest(content: bytes) -> str:
+    """바이트 내용의 SHA-256 해시"""
+    return hashlib.sha256(content).hexdigest()
+
+
+def file_digest(path: str) -> Optional[str]:
+    """파일 내용의 해시 (파일이 없으면 None)"""
+    try:
+        with open(path, 'rb') as f:
+            return content_digest(f.read())
+    except FileNotFoundError:
+        return None
+
+
+def write_if_changed(path: str, content: bytes) -> bool:
+    """내용이 기존 파일과 다를 때만 원자적으로 기록 (기록했으면 True)"""
+    if file_digest(path) == content_digest(content):
+        return False
+
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return True
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import math
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# numpy/pandas는 계산할 때 불러옴 (목록 화면만 보여주는 경로에서 import 시간을 쓰지 않도록)
+if TYPE_CHECKING:
+    import numpy as np
+
+# 기본 조회 구간 (거래일 수): 약 1개월 / 3개월 / 4.5개월 / 1년
+DEFAULT_WINDOWS = (20, 60, 90, 252)
+
+
+class PriceMatrix:
+    """종목 × 거래일 가격 행렬
+
+    종목마다 거래일이 다르므로 날짜를 합치지 않고 각 종목의 봉을 오른쪽(최신)에
+    맞춰 채운다. 마지막 열은 항상 각 종목의 최신 봉이며, 봉이 부족한 앞쪽은 NaN/NaT이다.
+    """
+
+    def __init__(self, codes: List[str], dates: np.ndarray, high: np.ndarray, close: np.ndarray):
+        self.codes = codes
+        self.dates = dates
+        self.high = high
+        self.close = close
+
+    @classmethod
+    def from_series(cls, series: Dict[str, Tuple[Sequence, Sequence, Sequence]]) -> 'PriceMatrix':
+        """종목별 (날짜, 고가, 종가) 배열로 행렬 생성 (날짜 오름차순)"""
+        import numpy as np
+
+        codes = list(series.keys())
+        width = max((len(dates) for dates, _, _ in series.values()), default=0)
+
+        dates = np.full((len(codes), width), np.datetime64('NaT'), dtype='datetime64[D]')
+        high = np.full((len(codes), width), np.nan)
+        close = np.full((len(codes), width), np.nan)
+        for row, code in enumerate(codes):
+            bar_dates, bar_high, bar_close = series[code]
+            count = len(bar_dates)
+            if not count:
+                continue
+            dates[row, width - count:] = np.asarray(bar_dates, dtype='datetime64[D]')
+            high[row, width - count:] = np.asarray(bar_high, dtype=float)
+            close[row, width - count:] = np.asarray(bar_close, dtype=float)
+
+        return cls(codes, dates, high, close)
+
+
+def compute_drawdowns(matrix: PriceMatrix, windows: Iterable[int] = DEFAULT_WINDOWS,
+                      since: Optional[datetime] = None, base: bool = True) -> Dict[str, Dict]:
+    """모든 종목의 현재가, 구간별 고점/고점일/하락률을 한 번에 계산
+
+    windows의 각 구간은 최근 N개 봉이며, since를 주면 그 날짜 이후 봉 전체를
+    기본 구간(recent_high, recent_high_date, decline_rate)으로 사용한다.
+    since가 없으면 보유한 봉 전체가 기본 구간이다. base가 False면 기본 구간은
+    계산하지 않는다 (호출자가 고점 덱 등으로 따로 유지하는 경우).
+    """
+    import numpy as np
+
+    count, width = matrix.high.shape
+    results = {code: _empty_result() for code in matrix.codes}
+    if not count or not width:
+        return results
+
+    valid = ~np.isnan(matrix.high)
+    current_price = matrix.close[:, -1]
+
+    base_extremes = None
+    if base:
+        if since is not None:
+            base_mask = valid & (matrix.dates >= np.datetime64(since.strftime('%Y-%m-%d'), 'D'))
+        else:
+            base_mask = valid
+        base_extremes = _window_extremes(matrix, base_mask, current_price)
+
+    columns = np.arange(width)
+    window_results = {}
+    for window in windows:
+        window_results[window] = _window_extremes(matrix, valid & (columns >= width - window), current_price)
+
+    for row, code in enumerate(matrix.codes):
+        if np.isnan(current_price[row]):
+            continue
+        result = results[code]
+        result['current_price'] = float(current_price[row])
+        if base_extremes is not None:
+            result['recent_high'], result['recent_high_date'], result['decline_rate'], _ = _pick(base_extremes, row)
+        for window, extremes in window_results.items():
+            high, high_date, decline_rate, bars = _pick(extremes, row)
+            result['drawdowns'][str(window)] = {
+                'high': high,
+                'high_date': high_date,
+                'decline_rate': decline_rate,
+                'bars': bars
+            }
+
+    return results
+
+
+def _empty_result() -> Dict:
+    """데이터가 없는 종목의 결과"""
+    return {
+        'current_price': None,
+        'recent_high': None,
+        'recent_high_date': None,
+        'decline_rate': None,
+        'drawdowns': {}
+    }
+
+
+def _window_extremes(matrix: PriceMatrix, mask: np.ndarray, current_price: np.ndarray):
+    """마스크 구간의 종목별 최고가, 최고가 날짜, 하락률, 봉 수 (벡터 연산)"""
+    import numpy as np
+
+    masked = np.where(mask, matrix.high, -np.inf)
+    # 최고가가 여러 번 나오면 가장 이른 날짜 (pandas idxmax와 동일)
+    positions = masked.argmax(axis=1)
+    rows = np.arange(masked.shape[0])
+    high = masked[rows, positions]
+    high_dates = matrix.dates[rows, positions]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        decline_rate = (high - current_price) / high * 100
+    bars = mask.sum(axis=1)
+    return high, high_dates, decline_rate, bars
+
+
+def _pick(extremes, row: int):
+    """벡터 계산 결과에서 한 종목의 값을 파이썬 값으로 꺼냄"""
+    high, high_dates, decline_rate, bars = extremes
+    if not bars[row] or not math.isfinite(high[row]) or high[row] == 0:
+        return None, None, None, int(bars[row])
+    return (
+        float(high[row]),
+        str(high_dates[row]),
+        float(decline_rate[row]),
+        int(bars[row])
+    )
+
+
+def drawdown_series(dates: np.ndarray, high: np.ndarray, close: np.ndarray, window_days: int) -> Dict[str, np.ndarray]:
+    """날짜별 직전 window_days일 고점과 그 고점 대비 하락률 시계열
+
+    각 날짜의 고점은 그 날짜를 포함한 최근 window_days일(달력 기준)의 최고가로,
+    종목 레코드의 recent_high와 같은 기준이다.
+    """
+    import numpy as np
+    import pandas as pd
+
+    index = pd.DatetimeIndex(np.asarray(dates, dtype='datetime64[ns]'))
+    # 시작일 당일도 포함하도록 하루를 더함 (date >= 기준일 - window_days)
+    rolling_high = pd.Series(np.asarray(high, dtype=float), index=index).rolling(f'{window_days + 1}D').max().to_numpy()
+    close = np.asarray(close, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdown = (rolling_high - close) / rolling_high * 100
+    return {
+        'dates': np.asarray(dates, dtype='datetime64[D]'),
+        'close': close,
+        'rolling_high': rolling_high,
+        'drawdown': drawdown
+    }
+
+
+def lttb_indices(y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets 다운샘플링으로 남길 위치 목록
+
+    x는 등간격 위치(0..n-1)로 보고, 첫 점과 마지막 점은 항상 남긴다.
+    각 구간에서 이전에 고른 점과 다음 구간 평균점으로 만든 삼각형의 넓이가 가장 큰 점을 고른다.
+    """
+    import numpy as np
+
+    y = np.asarray(y, dtype=float)
+    count = len(y)
+    if threshold >= count or threshold < 3:
+        return np.arange(count)
+
+    # NaN은 넓이 계산에서 0으로 취급 (선택 위치만 결정)
+    values = np.nan_to_num(y)
+    edges = np.linspace(1, count - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = count - 1
+    previous = 0
+
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_start = end
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else count
+        average_x = (next_start + next_end - 1) / 2.0
+        average_y = values[next_start:next_end].mean()
+
+        positions = np.arange(start, end)
+        areas = np.abs(
+            (previous - average_x) * (values[start:end] - values[previous])
+            - (previous - positions) * (average_y - values[previous])
+        )
+        previous = start + int(areas.argmax())
+        selected[bucket + 1] = previous
+
+    return selected
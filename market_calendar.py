@@ -0,0 +1,164 @@
+import os
+import json
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+# 장 마감 후 제공자의 일봉이 확정될 때까지 기다릴 시간
+SETTLEMENT_DELAY = timedelta(minutes=20)
+
+DEFAULT_HOLIDAYS_FILE = "data/market_holidays.json"
+
+
+class MarketCalendar:
+    """거래소 하나의 정규장 시간과 휴장일
+
+    주말과 holidays에 들어 있는 날짜는 휴장일로 본다. 휴장일 목록에 없는 공휴일은
+    거래일로 취급되어 조회가 한 번 더 일어날 뿐 결과에는 영향이 없다.
+    """
+
+    def __init__(self, name: str, timezone: str, open_time: time, close_time: time,
+                 holidays: Iterable[date] = ()):
+        self.name = name
+        self.timezone = ZoneInfo(timezone)
+        self.open_time = open_time
+        self.close_time = close_time
+        self.holidays = set(holidays)
+
+    def is_trading_day(self, day: date) -> bool:
+        return day.weekday() < 5 and day not in self.holidays
+
+    def is_open(self, now: datetime) -> bool:
+        """정규장 시간 중인지 여부"""
+        local = now.astimezone(self.timezone)
+        return self.is_trading_day(local.date()) and self.open_time <= local.time() < self.close_time
+
+    def last_settlement(self, now: datetime) -> Optional[datetime]:
+        """now 이전에 가장 최근 일봉이 확정된 시각 (마지막 거래일 마감 + 확정 대기)"""
+        local = now.astimezone(self.timezone)
+        day = local.date()
+        for _ in range(15):
+            if self.is_trading_day(day):
+                settled = datetime.combine(day, self.close_time, self.timezone) + SETTLEMENT_DELAY
+                if settled <= local:
+                    return settled
+            day -= timedelta(days=1)
+        return None
+
+    def next_open(self, now: datetime) -> Optional[datetime]:
+        """now 이후 처음 장이 열리는 시각"""
+        local = now.astimezone(self.timezone)
+        day = local.date()
+        for _ in range(15):
+            if self.is_trading_day(day):
+                opens = datetime.combine(day, self.open_time, self.timezone)
+                if opens > local:
+                    return opens
+            day += timedelta(days=1)
+        return None
+
+
+def timestamp_now() -> str:
+    """저장용 현재 시각 (시간대 오프셋을 포함한 ISO 문자열)
+
+    Actions 러너(UTC)가 기록한 시각을 앱(KST)이 읽어도 같은 시점으로 해석되도록
+    오프셋을 함께 저장한다.
+    """
+    return datetime.now().astimezone().isoformat()
+
+
+def parse_timestamp(value: str) -> datetime:
+    """저장된 ISO 시각을 이 머신의 시간대 없는 로컬 시각으로 변환
+
+    오프셋이 없는 예전 값은 로컬 시각으로 본다. 형식이 잘못되면 ValueError/TypeError.
+    """
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def default_calendars(holidays: Optional[Dict[str, List[date]]] = None) -> Dict[str, MarketCalendar]:
+    """market_type별 기본 거래소 달력 (OTHER는 달력 없이 항상 조회)"""
+    holidays = holidays or {}
+    return {
+        'KRX': MarketCalendar('KRX', 'Asia/Seoul', time(9, 0), time(15, 30), holidays.get('KRX', ())),
+        'TSE': MarketCalendar('TSE', 'Asia/Tokyo', time(9, 0), time(15, 30), holidays.get('TSE', ())),
+        'US': MarketCalendar('US', 'America/New_York', time(9, 30), time(16, 0), holidays.get('US', ()))
+    }
+
+
+def load_holidays(path: str) -> Dict[str, List[date]]:
+    """휴장일 파일 읽기 ({"KRX": ["2026-01-01", ...], "US": [...]} 형식)"""
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return {
+            market: [datetime.strptime(day, '%Y-%m-%d').date() for day in days]
+            for market, days in data.items()
+        }
+    except Exception as e:
+        logging.error(f"Error loading market holidays from {path}: {e}")
+        return {}
+
+
+class RefreshScheduler:
+    """시장별 장 시간에 따라 새로고침이 필요한 종목을 고르는 클래스
+
+    장중에는 항상 조회하고, 장이 닫힌 뒤에는 마지막 성공 조회가 마감 확정 시각
+    이전인 종목만 한 번 더 조회(마감 정산)한다. 그 뒤로는 다음 장 시작까지 건너뛴다.
+    오류가 있거나 데이터가 없는 종목, 달력이 없는 시장(OTHER)은 항상 조회한다.
+    """
+
+    def __init__(self, calendars: Optional[Dict[str, MarketCalendar]] = None):
+        if calendars is None:
+            holidays_file = os.environ.get('MARKET_HOLIDAYS_FILE', DEFAULT_HOLIDAYS_FILE)
+            calendars = default_calendars(load_holidays(holidays_file))
+        self.calendars = calendars
+
+    def is_due(self, market_type: str, last_success: Optional[datetime], now: Optional[datetime] = None) -> bool:
+        """종목을 지금 조회해야 하는지 여부"""
+        calendar = self.calendars.get(market_type)
+        if calendar is None or last_success is None:
+            return True
+
+        now = (now or datetime.now()).astimezone()
+        if calendar.is_open(now):
+            return True
+
+        settlement = calendar.last_settlement(now)
+        return settlement is None or last_success.astimezone() < settlement
+
+    def next_due_at(self, market_type: str, now: Optional[datetime] = None) -> Optional[datetime]:
+        """건너뛰는 중인 종목이 다시 조회 대상이 되는 시각 (다음 장 시작)"""
+        calendar = self.calendars.get(market_type)
+        if calendar is None:
+            return None
+        opens = calendar.next_open((now or datetime.now()).astimezone())
+        # 호출자가 사용하는 시간대 없는 로컬 시각으로 변환
+        return opens.astimezone().replace(tzinfo=None) if opens else None
+
+    def plan(self, stocks: Dict[str, Dict], now: Optional[datetime] = None) -> Tuple[List[str], Dict[str, int]]:
+        """(조회할 종목 코드 목록, 시장별 건너뛴 종목 수) 반환"""
+        due = []
+        skipped = {}
+        for code, data in stocks.items():
+            market_type = data.get('market_type', 'OTHER')
+            if self.is_due(market_type, self.last_success(data), now):
+                due.append(code)
+            else:
+                skipped[market_type] = skipped.get(market_type, 0) + 1
+        return due, skipped
+
+    @staticmethod
+    def last_success(data: Dict) -> Optional[datetime]:
+        """마지막 성공 조회 시각 (오류 상태이거나 데이터가 없으면 None)"""
+        if data.get('error_message') or data.get('current_price') is None:
+            return None
+        try:
+            return parse_timestamp(data['last_updated'])
+        except (KeyError, TypeError, ValueError):
+            return None
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import os
+import logging
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+# pandas/yfinance는 실제로 시세를 받거나 픽스처를 읽을 때 불러옴 (import 시간 절약)
+if TYPE_CHECKING:
+    import pandas as pd
+
+# 일봉 DataFrame의 표준 컬럼
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+DEFAULT_FIXTURE_DIR = "data/fixtures"
+
+class MarketDataProvider(ABC):
+    """시세 제공자 인터페이스
+
+    get_history는 여러 종목을 한 번에 요청할 수 있으며, 종목별로
+    날짜 인덱스(시간대 없음)와 OHLCV 컬럼을 가진 DataFrame을 돌려준다.
+    데이터가 없는 종목은 결과에서 빠진다. 요청 자체가 실패하면 예외를 던진다.
+    """
+
+    @abstractmethod
+    def get_history(self, symbols: List[str], start: datetime, end: datetime) -> Dict[str, pd.DataFrame]:
+        """여러 종목의 일봉 ({종목 코드: DataFrame})"""
+
+
+class YFinanceProvider(MarketDataProvider):
+    """yfinance 종목별 히스토리 조회 기반 제공자
+
+    yf.download()는 0.2.x에서 결과를 모듈 전역(shared._DFS)에 모으므로 여러 새로고침 작업
+    스레드에서 동시에 호출하면 서로의 결과를 덮어쓴다. 그래서 전역 상태를 쓰지 않는
+    yf.Ticker(...).history()로 종목마다 받는다 (download()도 내부에서 같은 함수를 호출한다).
+    묶음 안의 종목은 threads개 스레드로 동시에 요청하므로 묶음 하나의 소요 시간은 종목 수가
+    아니라 가장 느린 요청에 가깝다. 모든 종목이 예외로 실패하면 첫 예외를 던져 새로고침
+    엔진이 재시도하게 한다.
+    """
+
+    def __init__(self, timeout: float = 10.0, threads: int = 8):
+        self.timeout = timeout
+        self.threads = max(1, threads)
+
+    def get_history(self, symbols: List[str], start: datetime, end: datetime) -> Dict[str, pd.DataFrame]:
+        from concurrent.futures import ThreadPoolExecutor
+
+        symbols = list(symbols)
+        if len(symbols) <= 1 or self.threads == 1:
+            fetched = [self._fetch_one(symbol, start, end) for symbol in symbols]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.threads, len(symbols))) as pool:
+                fetched = list(pool.map(lambda symbol: self._fetch_one(symbol, start, end), symbols))
+        return collect_histories(symbols, fetched)
+
+    def _fetch_one(self, symbol: str, start: datetime, end: datetime):
+        """종목 하나의 일봉 (실패하면 예외 객체를 반환)"""
+        import yfinance as yf
+
+        try:
+            return yf.Ticker(symbol).history(
+                start=start,
+                end=end,
+                auto_adjust=True,
+                actions=False,
+                timeout=self.timeout
+            )
+        except Exception as e:
+            return e
+
+
+def collect_histories(symbols: List[str], fetched: List) -> Dict[str, pd.DataFrame]:
+    """종목별 조회 결과(DataFrame 또는 예외)를 정리 (모두 예외면 첫 예외를 던짐)"""
+    errors = [result for result in fetched if isinstance(result, Exception)]
+    if errors and len(errors) == len(fetched):
+        raise errors[0]
+
+    histories = {}
+    for symbol, hist in zip(symbols, fetched):
+        if isinstance(hist, Exception):
+            logging.warning(f"Error fetching history for {symbol}: {hist}")
+            continue
+        if hist is None or hist.empty:
+            continue
+        hist = normalize_history(hist)
+        if not hist.empty:
+            histories[symbol] = hist
+    return histories
+
+
+class RecordingProvider(MarketDataProvider):
+    """다른 제공자의 응답을 종목별 CSV 픽스처로 기록하는 제공자
+
+    같은 종목을 여러 번 받으면 기존 픽스처에 날짜 기준으로 합쳐 저장하므로,
+    기록한 기간 안의 어떤 요청이든 ReplayProvider로 다시 재생할 수 있다.
+    """
+
+    def __init__(self, inner: MarketDataProvider, fixture_dir: str = DEFAULT_FIXTURE_DIR):
+        self.inner = inner
+        self.fixture_dir = fixture_dir
+        self._lock = threading.Lock()
+        os.makedirs(self.fixture_dir, exist_ok=True)
+
+    def get_history(self, symbols: List[str], start: datetime, end: datetime) -> Dict[str, pd.DataFrame]:
+        histories = self.inner.get_history(symbols, start, end)
+        with self._lock:
+            for symbol, hist in histories.items():
+                try:
+                    self._record(symbol, hist)
+                except Exception as e:
+                    logging.error(f"Error recording fixture for {symbol}: {e}")
+        return histories
+
+    def _record(self, symbol: str, hist: pd.DataFrame):
+        import pandas as pd
+
+        path = fixture_path(self.fixture_dir, symbol)
+        if os.path.exists(path):
+            existing = read_fixture(path)
+            # 새로 받은 봉이 우선 (당일 봉 갱신, 수정주가 반영)
+            hist = pd.concat([existing[~existing.index.isin(hist.index)], hist]).sort_index()
+        hist.to_csv(path, index_label='Date')
+
+
+class ReplayProvider(MarketDataProvider):
+    """기록된 CSV 픽스처로 응답하는 오프라인 제공자 (네트워크 사용 안 함)"""
+
+    def __init__(self, fixture_dir: str = DEFAULT_FIXTURE_DIR):
+        self.fixture_dir = fixture_dir
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def get_history(self, symbols: List[str], start: datetime, end: datetime) -> Dict[str, pd.DataFrame]:
+        histories = {}
+        for symbol in symbols:
+            hist = self._load(symbol)
+            if hist is None:
+                continue
+            hist = slice_history(hist, start, end)
+            if not hist.empty:
+                histories[symbol] = hist
+        return histories
+
+    def _load(self, symbol: str) -> Optional[pd.DataFrame]:
+        with self._lock:
+            if symbol not in self._cache:
+                path = fixture_path(self.fixture_dir, symbol)
+                self._cache[symbol] = read_fixture(path) if os.path.exists(path) else None
+            return self._cache[symbol]
+
+
+def normalize_history(hist: pd.DataFrame) -> pd.DataFrame:
+    """표준 OHLCV 컬럼, 시간대 없는 날짜 인덱스, 빈 행 제거"""
+    import pandas as pd
+
+    hist = hist.reindex(columns=OHLCV_COLUMNS).dropna(how='all')
+    index = pd.DatetimeIndex(hist.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    hist.index = index.normalize()
+    hist.index.name = 'Date'
+    return hist
+
+
+def slice_history(hist: pd.DataFrame, start: Optional[datetime], end: Optional[datetime]) -> pd.DataFrame:
+    """[start, end) 기간의 봉 (yfinance와 같이 종료일은 포함하지 않음)"""
+    import pandas as pd
+
+    if start is not None:
+        hist = hist[hist.index >= pd.Timestamp(start).normalize()]
+    if end is not None:
+        hist = hist[hist.index < pd.Timestamp(end)]
+    return hist
+
+
+def fixture_path(fixture_dir: str, symbol: str) -> str:
+    """종목 픽스처 파일 경로"""
+    safe_name = ''.join(char if char.isalnum() or char in '.-^_' else '_' for char in symbol)
+    return os.path.join(fixture_dir, f"{safe_name}.csv")
+
+
+def read_fixture(path: str) -> pd.DataFrame:
+    """픽스처 CSV를 일봉 DataFrame으로 읽기"""
+    import pandas as pd
+
+    hist = pd.read_csv(path, index_col='Date', parse_dates=['Date'], float_precision='round_trip')
+    return normalize_history(hist)
+
+
+def create_market_data_provider(mode: Optional[str] = None, fixture_dir: Optional[str] = None) -> MarketDataProvider:
+    """환경 변수 MARKET_DATA_MODE(live/record/replay)에 따른 제공자 생성
+
+    픽스처 경로는 MARKET_DATA_FIXTURES (기본 data/fixtures).
+    """
+    mode = (mode or os.environ.get('MARKET_DATA_MODE', 'live')).lower()
+    fixture_dir = fixture_dir or os.environ.get('MARKET_DATA_FIXTURES', DEFAULT_FIXTURE_DIR)
+
+    if mode == 'replay':
+        logging.info(f"Replaying market data from {fixture_dir}")
+        return ReplayProvider(fixture_dir)
+    if mode == 'record':
+        logging.info(f"Recording market data to {fixture_dir}")
+        return RecordingProvider(YFinanceProvider(), fixture_dir)
+    return YFinanceProvider()
@@ -0,0 +1,220 @@
+import os
+import sqlite3
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class PriceHistoryStore:
+    """종목별 일봉(OHLCV) 히스토리를 로컬 SQLite 파일에 저장하는 클래스"""
+
+    # 증분 조회 시 이미 저장된 봉과 비교할 허용 오차 (수정주가 변경 감지용)
+    ADJUSTMENT_TOLERANCE = 0.001
+
+    # 증분 조회 시 마지막 저장일보다 앞서 다시 받을 기간 (겹치는 확정 봉으로 수정주가 검증)
+    OVERLAP_DAYS = 5
+
+    # 저장된 첫 봉이 조회 기간 시작보다 이 일수 이상 늦으면 앞부분을 다시 받음
+    # (주말/연휴로 인한 자연스러운 공백은 허용)
+    BACKFILL_TOLERANCE_DAYS = 10
+
+    def __init__(self, db_file: str = "data/price_history.db"):
+        self.db_file = db_file
+        os.makedirs(os.path.dirname(self.db_file) or '.', exist_ok=True)
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        """DB 연결 생성 (호출마다 새 연결을 사용하여 스레드 간 공유 문제 방지)"""
+        conn = sqlite3.connect(self.db_file, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def _init_schema(self):
+        """테이블 생성"""
+        conn = self._connect()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS price_history (
+                    code TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    open REAL,
+                    high REAL,
+                    low REAL,
+                    close REAL,
+                    volume REAL,
+                    PRIMARY KEY (code, date)
+                )
+            ''')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get_date_range(self, code: str) -> Tuple[Optional[str], Optional[str]]:
+        """저장된 첫 봉과 마지막 봉의 날짜 (YYYY-MM-DD) 반환"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                'SELECT MIN(date), MAX(date) FROM price_history WHERE code = ?', (code,)
+            ).fetchone()
+            return (row[0], row[1]) if row else (None, None)
+        finally:
+            conn.close()
+
+    def get_fetch_start(self, code: str, window_start: datetime) -> datetime:
+        """제공자에게 요청할 시작일 계산
+
+        저장된 봉이 있으면 마지막 저장일 직전 며칠부터(당일 미완성 봉 갱신 및
+        수정주가 검증용 겹침 포함), 없거나 조회 기간보다 오래되었으면
+        조회 기간 시작일부터 요청한다. 조회 기간이 늘어나 저장된 첫 봉이
+        기간 시작보다 한참 뒤라면 앞부분을 채우기 위해 시작일부터 다시 요청한다.
+        """
+        first_date, last_date = self.get_date_range(code)
+        if not last_date:
+            return window_start
+
+        backfill_limit = window_start + timedelta(days=self.BACKFILL_TOLERANCE_DAYS)
+        if datetime.strptime(first_date, '%Y-%m-%d') > backfill_limit:
+            return window_start
+
+        fetch_start = datetime.strptime(last_date, '%Y-%m-%d') - timedelta(days=self.OVERLAP_DAYS)
+        if fetch_start < window_start:
+            return window_start
+        return fetch_start
+
+    def merge_history(self, code: str, hist) -> bool:
+        """새로 받은 봉을 저장소에 병합
+
+        이미 저장된 봉(마지막 저장일 제외)과 종가가 어긋나면 분할/배당으로
+        수정주가가 바뀐 것으로 보고 해당 종목의 히스토리를 비운 뒤 False를 반환한다.
+        호출자는 이 경우 전체 기간을 다시 받아야 한다.
+        """
+        if hist is None or hist.empty:
+            return True
+
+        # 행 단위 pandas 접근 대신 배열로 한 번에 변환 (NaN은 None으로)
+        values = hist.reindex(columns=['Open', 'High', 'Low', 'Close', 'Volume']).to_numpy(dtype=float)
+        dates = [self._format_date(idx) for idx in hist.index]
+        rows = [
+            (code, date, *[None if value != value else value for value in bar])
+            for date, bar in zip(dates, values.tolist())
+        ]
+
+        conn = self._connect()
+        try:
+            last_date = conn.execute(
+                'SELECT MAX(date) FROM price_history WHERE code = ?', (code,)
+            ).fetchone()[0]
+
+            if last_date and self._has_adjustment(conn, code, rows, last_date):
+                logging.info(f"Adjusted prices changed for {code}, discarding local history")
+                conn.execute('DELETE FROM price_history WHERE code = ?', (code,))
+                conn.commit()
+                return False
+
+            conn.executemany('''
+                INSERT OR REPLACE INTO price_history (code, date, open, high, low, close, volume)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            conn.commit()
+            return True
+        finally:
+            conn.close()
+
+    def _has_adjustment(self, conn: sqlite3.Connection, code: str, rows, last_date: str) -> bool:
+        """겹치는 확정 봉의 종가가 저장된 값과 다른지 확인"""
+        for row in rows:
+            date, close = row[1], row[5]
+            if date >= last_date or close is None:
+                continue
+            stored = conn.execute(
+                'SELECT close FROM price_history WHERE code = ? AND date = ?', (code, date)
+            ).fetchone()
+            if stored and stored[0]:
+                if abs(stored[0] - close) / stored[0] > self.ADJUSTMENT_TOLERANCE:
+                    return True
+        return False
+
+    def load_history(self, code: str, start: Optional[datetime] = None, end: Optional[datetime] = None):
+        """저장된 히스토리를 날짜 인덱스의 DataFrame으로 반환"""
+        import pandas as pd
+
+        query = 'SELECT date, open, high, low, close, volume FROM price_history WHERE code = ? AND close IS NOT NULL'
+        params = [code]
+        if start is not None:
+            query += ' AND date >= ?'
+            params.append(start.strftime('%Y-%m-%d'))
+        if end is not None:
+            query += ' AND date <= ?'
+            params.append(end.strftime('%Y-%m-%d'))
+        query += ' ORDER BY date'
+
+        conn = self._connect()
+        try:
+            rows = conn.execute(query, params).fetchall()
+        finally:
+            conn.close()
+
+        hist = pd.DataFrame(rows, columns=['Date', 'Open', 'High', 'Low', 'Close', 'Volume'])
+        hist['Date'] = pd.to_datetime(hist['Date'])
+        return hist.set_index('Date')
+
+    def load_price_series(self, codes: Iterable[str], start: Optional[datetime] = None,
+                          end: Optional[datetime] = None) -> Dict[str, Tuple]:
+        """여러 종목의 (날짜, 고가, 종가) 배열을 한 번의 조회로 반환
+
+        DataFrame을 만들지 않으므로 다수 종목의 하락률을 행렬로 계산할 때 사용한다.
+        저장된 봉이 없는 종목은 빈 배열을 가진다.
+        """
+        import numpy as np
+
+        codes = list(codes)
+        series = {code: ([], [], []) for code in codes}
+        if not codes:
+            return {}
+
+        placeholders = ','.join('?' for _ in codes)
+        query = (
+            f'SELECT code, date, high, close FROM price_history '
+            f'WHERE code IN ({placeholders}) AND close IS NOT NULL'
+        )
+        params = list(codes)
+        if start is not None:
+            query += ' AND date >= ?'
+            params.append(start.strftime('%Y-%m-%d'))
+        if end is not None:
+            query += ' AND date <= ?'
+            params.append(end.strftime('%Y-%m-%d'))
+        query += ' ORDER BY code, date'
+
+        conn = self._connect()
+        try:
+            rows = conn.execute(query, params).fetchall()
+        finally:
+            conn.close()
+
+        for code, date, high, close in rows:
+            dates, highs, closes = series[code]
+            dates.append(date)
+            highs.append(np.nan if high is None else high)
+            closes.append(close)
+
+        return {
+            code: (np.array(dates, dtype='datetime64[D]'), np.array(highs, dtype=float), np.array(closes, dtype=float))
+            for code, (dates, highs, closes) in series.items()
+        }
+
+    def delete_history(self, code: str):
+        """종목의 저장된 히스토리 삭제"""
+        conn = self._connect()
+        try:
+            conn.execute('DELETE FROM price_history WHERE code = ?', (code,))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _format_date(self, idx) -> str:
+        """인덱스 값을 YYYY-MM-DD 문자열로 변환"""
+        try:
+            return idx.strftime('%Y-%m-%d')
+        except AttributeError:
+            return str(idx)[:10]
@@ -0,0 +1,206 @@
+import time
+import queue
+import random
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class TokenBucket:
+    """초당 요청 수를 제한하는 토큰 버킷 (스레드 안전)"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """토큰 하나를 얻을 때까지 대기 (timeout 초과 시 False)"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait_time = (1 - self.tokens) / self.rate
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait_time = min(wait_time, remaining)
+            time.sleep(wait_time)
+
+
+class RefreshEngine:
+    """종목 데이터 조회를 여러 작업 스레드에서 병렬 실행하는 새로고침 엔진
+
+    작업 단위(unit)는 종목 코드 목록이며, fetch_fn(unit)은 {종목코드: 결과}를 반환한다.
+    결과 값이 Exception이면 해당 종목만 실패로 처리한다. fetch_fn이 예외를 던지면
+    지수 백오프(지터 포함)로 재시도하고, 단위별 제한 시간을 넘기면 시간 초과로 처리한다.
+    작업 스레드는 데몬 스레드라서, 제한 시간을 넘겨 응답 없이 멈춘 조회가 남아 있어도
+    프로세스(cron 스크립트 등)는 기다리지 않고 종료된다. 모든 작업 스레드가 제한 시간을 넘긴
+    조회에 묶여 있으면 대기 중인 작업 단위도 시작하지 않고 시간 초과로 처리한다.
+    """
+
+    def __init__(self, max_workers: int = 4, requests_per_second: Optional[float] = 2.0,
+                 max_retries: int = 2, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 deadline: float = 60.0):
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter = TokenBucket(requests_per_second) if requests_per_second else None
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.deadline = deadline
+
+    def run(self, units: List[List[str]], fetch_fn: Callable[[List[str]], Dict],
+            progress_callback: Optional[Callable[[int, int, int], None]] = None) -> Tuple[Dict, List[Dict]]:
+        """모든 작업 단위를 실행하고 (종목별 결과, 종목별 실행 리포트) 반환
+
+        progress_callback이 주어지면 작업 단위가 끝날 때마다
+        (완료 종목 수, 전체 종목 수, 실패 종목 수)로 호출한다.
+        """
+        results = {}
+        report = []
+        if not units:
+            return results, report
+
+        total = sum(len(unit) for unit in units)
+        started_at = {}
+        attempts = {}
+        state_lock = threading.Lock()
+
+        def run_unit(index: int, unit: List[str]) -> Dict:
+            start = time.monotonic()
+            with state_lock:
+                started_at[index] = start
+            attempt = 0
+            while True:
+                attempt += 1
+                with state_lock:
+                    attempts[index] = attempt
+                if self.rate_limiter:
+                    self.rate_limiter.acquire()
+                try:
+                    return fetch_fn(unit)
+                except Exception as e:
+                    delay = self._get_backoff(attempt)
+                    elapsed = time.monotonic() - start
+                    if attempt > self.max_retries or elapsed + delay >= self.deadline:
+                        raise
+                    logging.warning(f"Retrying {unit} after error (attempt {attempt}): {e}")
+                    time.sleep(delay)
+
+        tasks = queue.Queue()
+        for index, unit in enumerate(units):
+            tasks.put((index, unit))
+        finished = queue.Queue()
+        stopped = threading.Event()
+
+        def worker():
+            while not stopped.is_set():
+                try:
+                    index, unit = tasks.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    finished.put((index, run_unit(index, unit)))
+                except Exception as e:
+                    finished.put((index, e))
+
+        worker_count = min(self.max_workers, len(units))
+        for number in range(worker_count):
+            threading.Thread(target=worker, name=f"refresh-{number}", daemon=True).start()
+
+        try:
+            pending = set(range(len(units)))
+            # 시간 초과로 기록했지만 작업 스레드가 아직 붙잡고 있는 작업 단위
+            abandoned = set()
+            reported = 0
+
+            while pending:
+                completed = []
+                try:
+                    completed.append(finished.get(timeout=0.1))
+                    while True:
+                        completed.append(finished.get_nowait())
+                except queue.Empty:
+                    pass
+                now = time.monotonic()
+
+                for index, outcome in completed:
+                    if index not in pending:
+                        # 이미 시간 초과로 기록한 작업이 늦게 끝난 경우 (작업 스레드가 다시 사용 가능)
+                        abandoned.discard(index)
+                        continue
+                    pending.discard(index)
+                    latency = now - started_at.get(index, now)
+                    if isinstance(outcome, Exception):
+                        for code in units[index]:
+                            results[code] = outcome
+                            report.append(self._make_entry(code, outcome, latency, attempts.get(index, 1)))
+                    else:
+                        for code in units[index]:
+                            value = outcome.get(code) if outcome else None
+                            results[code] = value
+                            report.append(self._make_entry(code, value, latency, attempts.get(index, 1)))
+
+                # 제한 시간을 넘긴 작업은 결과를 기다리지 않고 시간 초과로 기록
+                for index in list(pending):
+                    start = started_at.get(index)
+                    if start is None or now - start < self.deadline:
+                        continue
+                    pending.discard(index)
+                    abandoned.add(index)
+                    error = TimeoutError(f"Refresh exceeded {self.deadline:g}s deadline")
+                    for code in units[index]:
+                        results[code] = error
+                        entry = self._make_entry(code, error, now - start, attempts.get(index, 1))
+                        entry['status'] = 'timeout'
+                        report.append(entry)
+
+                # 모든 작업 스레드가 멈춘 조회에 묶여 있으면 대기 중인 작업은 시작될 수 없음
+                if len(abandoned) >= worker_count:
+                    error = TimeoutError(f"No refresh worker available: all workers stuck past {self.deadline:g}s deadline")
+                    while True:
+                        try:
+                            index, _ = tasks.get_nowait()
+                        except queue.Empty:
+                            break
+                        pending.discard(index)
+                        for code in units[index]:
+                            results[code] = error
+                            entry = self._make_entry(code, error, 0.0, 0)
+                            entry['status'] = 'timeout'
+                            report.append(entry)
+
+                if progress_callback and len(report) != reported:
+                    reported = len(report)
+                    failures = sum(1 for entry in report if entry['status'] != 'success')
+                    progress_callback(reported, total, failures)
+        finally:
+            # 남은 작업은 시작하지 않음 (실행 중인 조회는 데몬 스레드에 남겨 둠)
+            stopped.set()
+
+        return results, report
+
+    def _get_backoff(self, attempt: int) -> float:
+        """지터가 포함된 지수 백오프 대기 시간"""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return random.uniform(0, delay)
+
+    def _make_entry(self, code: str, value, latency: float, attempts: int) -> Dict:
+        """종목별 실행 리포트 항목 생성"""
+        failed = isinstance(value, Exception)
+        return {
+            'code': code,
+            'status': 'error' if failed else 'success',
+            'latency': round(latency, 3),
+            'attempts': attempts,
+            'error': str(value) if failed else None
+        }
@@ -0,0 +1,182 @@
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+from stock_store import SharedFileLock, write_json_atomic
+
+
+class RefreshJobManager:
+    """전체 새로고침을 백그라운드 스레드에서 실행하고 진행 상황을 추적하는 클래스
+
+    한 번에 하나의 새로고침만 실행되며, 실행 중에 들어온 요청은
+    새 작업을 만들지 않고 진행 중인 작업에 합류한다.
+
+    state_file을 주면(공유 모드 추적기는 기본으로 data/refresh_jobs.json) 작업 목록을
+    파일 잠금을 잡은 채 그 파일에 기록하므로, 여러 gunicorn 워커 중 어느 워커가 요청을
+    받아도 같은 작업을 조회하고 실행 중인 작업에 합류한다. 작업을 실행하던 프로세스가
+    사라졌거나 진행 기록이 STALE_SECONDS 동안 없으면 실행 중이 아닌 것으로 본다.
+    """
+
+    # 완료된 작업 정보를 보관할 최대 개수
+    MAX_FINISHED_JOBS = 20
+
+    # 진행 상황이 이 시간(초) 동안 기록되지 않은 실행 중 작업은 중단된 것으로 처리
+    STALE_SECONDS = 900
+
+    # 상태 파일에 진행 상황을 기록하는 최소 간격 (초)
+    PROGRESS_INTERVAL = 0.5
+
+    def __init__(self, tracker, state_file: Optional[str] = None):
+        self.tracker = tracker
+        self.jobs = {}
+        self.lock = threading.Lock()
+        if state_file is None and getattr(tracker, 'shared_state', False):
+            state_file = os.path.join(os.path.dirname(tracker.data_file), 'refresh_jobs.json')
+        self.state_file = state_file
+        self.file_lock = SharedFileLock(state_file + '.lock') if state_file else None
+
+    def start_refresh(self) -> Dict:
+        """새로고침 작업 시작 (이미 실행 중이면 해당 작업 반환)"""
+        with self._jobs() as jobs:
+            running = self._running_job(jobs)
+            if running:
+                return dict(self._public_view(running), attached=True)
+
+            now = time.time()
+            job_id = uuid.uuid4().hex[:12]
+            job = {
+                'id': job_id,
+                'status': 'running',
+                'done': 0,
+                'total': len(self.tracker.stocks),
+                'failures': 0,
+                'updated_count': None,
+                'skipped_count': None,
+                'error': None,
+                'started_at': datetime.now().isoformat(),
+                'finished_at': None,
+                '_started': now,
+                '_finished': None,
+                '_owner': os.getpid(),
+                '_heartbeat': now
+            }
+            jobs[job_id] = job
+            self._prune_finished_jobs(jobs)
+
+        thread = threading.Thread(target=self._run_job, args=(job_id,), daemon=True)
+        thread.start()
+        return dict(self._public_view(job), attached=False)
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """작업 상태 조회 (경과 시간 포함)"""
+        with self.lock:
+            jobs = self._read_jobs() if self.state_file else self.jobs
+            job = jobs.get(job_id)
+            if not job:
+                return None
+            return self._public_view(job)
+
+    def _run_job(self, job_id: str):
+        """백그라운드에서 새로고침 실행"""
+        last_write = [0.0]
+
+        def on_progress(done: int, total: int, failures: int):
+            now = time.monotonic()
+            if done < total and now - last_write[0] < self.PROGRESS_INTERVAL:
+                return
+            last_write[0] = now
+            self._update_job(job_id, done=done, total=total, failures=failures)
+
+        fields = {}
+        try:
+            updated_count = self.tracker.refresh_all_stocks(progress_callback=on_progress)
+            fields.update(
+                status='completed',
+                updated_count=updated_count,
+                skipped_count=sum(self.tracker.last_schedule_report['skipped'].values())
+            )
+        except Exception as e:
+            logging.error(f"Refresh job {job_id} failed: {e}")
+            fields.update(status='failed', error=str(e))
+        finally:
+            fields.update(finished_at=datetime.now().isoformat(), _finished=time.time())
+            self._update_job(job_id, **fields)
+
+    def _update_job(self, job_id: str, **fields):
+        """작업 정보 갱신 (진행 기록 시각 포함)"""
+        try:
+            with self._jobs() as jobs:
+                job = jobs.get(job_id)
+                if job is not None:
+                    job.update(fields, _heartbeat=time.time())
+        except Exception as e:
+            logging.error(f"Error updating refresh job {job_id}: {e}")
+
+    @contextmanager
+    def _jobs(self):
+        """작업 목록을 읽고-고치고-쓰는 구간 (상태 파일이 있으면 파일 잠금을 잡고 다시 읽은 뒤 저장)"""
+        with self.lock:
+            if not self.state_file:
+                yield self.jobs
+                return
+            with self.file_lock:
+                jobs = self._read_jobs()
+                yield jobs
+                write_json_atomic(self.state_file, jobs)
+
+    def _read_jobs(self) -> Dict:
+        """상태 파일의 작업 목록 (없거나 읽을 수 없으면 빈 목록)"""
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.error(f"Error reading refresh jobs from {self.state_file}: {e}")
+            return {}
+
+    def _running_job(self, jobs: Dict) -> Optional[Dict]:
+        """실행 중인 작업 (실행하던 프로세스가 사라진 작업은 실패로 정리)"""
+        for job in jobs.values():
+            if job['status'] != 'running':
+                continue
+            if self._is_alive(job):
+                return job
+            logging.warning(f"Refresh job {job['id']} was abandoned by process {job.get('_owner')}")
+            job.update(status='failed', error='새로고침을 실행하던 프로세스가 중단되었습니다.',
+                       finished_at=datetime.now().isoformat(), _finished=time.time())
+        return None
+
+    def _is_alive(self, job: Dict) -> bool:
+        """작업을 실행하는 프로세스가 살아 있고 진행 기록이 최근인지 여부"""
+        if time.time() - job.get('_heartbeat', 0) > self.STALE_SECONDS:
+            return False
+        owner = job.get('_owner')
+        if owner is None or owner == os.getpid() or os.name != 'posix':
+            return True
+        try:
+            os.kill(owner, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def _public_view(self, job: Dict) -> Dict:
+        """내부 필드를 제외하고 경과 시간을 계산한 작업 정보"""
+        end = job['_finished'] if job['_finished'] is not None else time.time()
+        view = {key: value for key, value in job.items() if not key.startswith('_')}
+        view['elapsed'] = round(end - job['_started'], 2)
+        return view
+
+    def _prune_finished_jobs(self, jobs: Dict):
+        """오래된 완료 작업 정보 정리"""
+        finished = [job_id for job_id, job in jobs.items() if job['status'] != 'running']
+        for job_id in finished[:-self.MAX_FINISHED_JOBS]:
+            del jobs[job_id]
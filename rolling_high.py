@@ -0,0 +1,82 @@
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class RollingHigh:
+    """기간 내 최고가를 유지하는 단조 감소 덱 (sliding window maximum)
+
+    덱에는 (날짜, 고가)가 고가 비증가 순으로 들어 있으며, 새 봉보다 낮은 고가는
+    다시 최고가가 될 수 없으므로 뒤에서 제거된다. 따라서 봉 추가는 분할 상환
+    O(1)이고, 기간을 벗어난 봉은 앞에서 제거된다. 덱 맨 앞이 현재 기간의 최고가다.
+
+    같은 날짜의 봉을 다시 넣으면 당일 미완성 봉의 갱신으로 처리한다.
+    과거 날짜가 들어오거나 당일 고가가 낮아진 경우(수정주가 등)는 덱만으로
+    복원할 수 없으므로 push가 False를 반환하며, 호출자가 히스토리로 다시 만들어야 한다.
+    """
+
+    def __init__(self, window_days: int, entries: Iterable[Tuple[str, float]] = (),
+                 last_date: Optional[str] = None):
+        self.window_days = window_days
+        self.entries = deque((date, float(high)) for date, high in entries)
+        self.last_date = last_date
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict], window_days: int) -> Optional['RollingHigh']:
+        """저장된 상태 복원 (없거나 기간 설정이 다르면 None)"""
+        if not data or data.get('window_days') != window_days:
+            return None
+        return cls(window_days, data.get('entries') or (), data.get('last_date'))
+
+    @classmethod
+    def from_bars(cls, window_days: int, bars: Iterable[Tuple[str, float]],
+                  as_of: Optional[datetime] = None) -> 'RollingHigh':
+        """날짜 오름차순 봉 목록으로 새로 생성"""
+        rolling = cls(window_days)
+        for date, high in bars:
+            rolling.push(date, high)
+        rolling.evict(as_of)
+        return rolling
+
+    def to_dict(self) -> Dict:
+        """종목 레코드에 저장할 상태"""
+        return {
+            'window_days': self.window_days,
+            'last_date': self.last_date,
+            'entries': [[date, high] for date, high in self.entries]
+        }
+
+    def push(self, date: str, high: float) -> bool:
+        """봉 추가 (YYYY-MM-DD 날짜). 증분으로 반영할 수 없으면 False"""
+        if high is None or high != high:
+            return True
+        high = float(high)
+
+        if self.last_date is not None:
+            if date < self.last_date:
+                return False
+            if date == self.last_date and self.entries and self.entries[-1][0] == date:
+                # 당일 봉 갱신: 고가는 장중에 낮아질 수 없음
+                if high < self.entries[-1][1]:
+                    return False
+                self.entries.pop()
+
+        # 같은 고가는 남겨 두어 가장 이른 날짜가 최고가 날짜가 되게 함
+        while self.entries and self.entries[-1][1] < high:
+            self.entries.pop()
+        self.entries.append((date, high))
+        self.last_date = date
+        return True
+
+    def evict(self, as_of: Optional[datetime] = None):
+        """기간을 벗어난 봉 제거 (기준 시각: as_of, 기본 현재)"""
+        cutoff = ((as_of or datetime.now()) - timedelta(days=self.window_days)).strftime('%Y-%m-%d')
+        while self.entries and self.entries[0][0] < cutoff:
+            self.entries.popleft()
+
+    @property
+    def high(self) -> Tuple[Optional[str], Optional[float]]:
+        """현재 기간의 (최고가 날짜, 최고가)"""
+        if not self.entries:
+            return None, None
+        return self.entries[0]
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+거래소 전체 종목의 고점 대비 하락률 스크리너
+종목 마스터(StockSearcher 종목 DB + SYMBOL_MASTER_FILE)의 전 종목 일봉을 로컬 저장소에
+증분으로 유지하고, 하락률을 한 번에 계산해 결과 테이블(JSON)로 저장한다.
+API(/api/screen)는 저장된 결과 테이블만 읽으므로 조회 비용이 들지 않는다.
+
+사용법:
+  python screener.py [--markets KOSPI,KOSDAQ] [--listing 종목목록.csv] [--require-listing]
+
+거래소 전체를 훑으려면 종목 마스터가 있어야 한다(python symbol_master.py로 생성).
+없으면 내장 종목(약 70개)만 대상이 된다.
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+import threading
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from drawdown_engine import DEFAULT_WINDOWS, PriceMatrix, compute_drawdowns
+from metrics import record_error, stage_timer
+from price_store import PriceHistoryStore
+from refresh_engine import RefreshEngine
+from stock_store import write_json_atomic
+
+# 기본 스크리닝 대상 시장과 yfinance 접미사
+DEFAULT_MARKETS = ('KOSPI', 'KOSDAQ')
+MARKET_SUFFIXES = {'KOSPI': '.KS', 'KOSDAQ': '.KQ'}
+
+DEFAULT_HISTORY_DB = "data/screen_history.db"
+DEFAULT_RESULT_FILE = "data/screen_results.json"
+
+# 기본 하락률(decline_rate)의 고점 조회 기간 (일)
+RECENT_HIGH_DAYS = 90
+
+# 종목 수가 이 이상이면 하락률 계산을 프로세스 풀로 나눠 실행
+PROCESS_POOL_THRESHOLD = 2000
+COMPUTE_CHUNK_SIZE = 500
+
+
+class MarketScreener:
+    """거래소 전체 종목 하락률 스크리너
+
+    refresh()는 일봉 동기화와 하락률 계산 후 결과 테이블을 저장하고,
+    screen()은 저장된 테이블을 시장/구간별로 하락률 내림차순 정렬해 둔 목록에서
+    이진 탐색으로 min_decline 이상인 종목을 잘라 반환한다.
+    결과 파일이 다른 프로세스에서 갱신되면 다음 조회 때 다시 읽는다.
+    """
+
+    def __init__(self, result_file: str = DEFAULT_RESULT_FILE, history_db: str = DEFAULT_HISTORY_DB,
+                 provider=None, refresh_engine: Optional[RefreshEngine] = None,
+                 windows: Tuple[int, ...] = DEFAULT_WINDOWS, batch_size: int = 100,
+                 max_processes: Optional[int] = None):
+        self.result_file = result_file
+        self.history_db = history_db
+        self.provider = provider
+        self.refresh_engine = refresh_engine
+        self.windows = tuple(sorted(windows))
+        self.batch_size = batch_size
+        self.max_processes = max_processes
+        self._table = None
+        self._indexes = {}
+        self._loaded_mtime = None
+        self._lock = threading.Lock()
+
+    # ---- 결과 테이블 생성 ----
+
+    def refresh(self, universe: List[Dict]) -> Dict:
+        """전 종목 일봉 동기화, 하락률 계산, 결과 테이블 저장 (요약 반환)
+
+        universe: [{'symbol': '005930.KS', 'code': '005930', 'name': '삼성전자', 'market': 'KOSPI'}, ...]
+        """
+        symbols = [entry['symbol'] for entry in universe]
+        failed = self.sync_histories(symbols)
+        with stage_timer('screener', 'compute'):
+            rows = self.compute(universe)
+
+        table = {
+            'computed_at': datetime.now().isoformat(),
+            'windows': list(self.windows),
+            'universe_size': len(universe),
+            'rows': rows
+        }
+        write_json_atomic(self.result_file, table)
+        self._install(table, self._result_mtime())
+        summary = {'universe_size': len(universe), 'screened': len(rows), 'fetch_failures': len(failed)}
+        logging.info(f"Screened {len(rows)} of {len(universe)} symbols ({len(failed)} fetch failures)")
+        return summary
+
+    def sync_histories(self, symbols: List[str]) -> List[str]:
+        """전 종목의 신규 봉만 받아 로컬 저장소에 병합 (실패한 종목 목록 반환)
+
+        마지막 저장일이 같은 종목끼리 batch_size개씩 묶어 새로고침 엔진으로 병렬 조회한다.
+        """
+        if self.provider is None:
+            from market_data import create_market_data_provider
+            self.provider = create_market_data_provider()
+        engine = self.refresh_engine or RefreshEngine()
+        store = PriceHistoryStore(self.history_db)
+        start_date, end_date = self._history_range()
+
+        fetch_starts = {symbol: store.get_fetch_start(symbol, start_date) for symbol in symbols}
+        groups = {}
+        for symbol in symbols:
+            groups.setdefault(fetch_starts[symbol], []).append(symbol)
+        units = [
+            codes[i:i + self.batch_size]
+            for codes in groups.values() for i in range(0, len(codes), self.batch_size)
+        ]
+
+        def fetch(unit_codes: List[str]) -> Dict:
+            # 한 묶음의 종목은 모두 조회 시작일이 같음
+            histories = self.provider.get_history(unit_codes, fetch_starts[unit_codes[0]], end_date)
+            stale = [code for code in unit_codes if not store.merge_history(code, histories.get(code))]
+            # 수정주가가 바뀐 종목은 전체 기간을 다시 받음
+            if stale:
+                histories = self.provider.get_history(stale, start_date, end_date)
+                for code in stale:
+                    store.merge_history(code, histories.get(code))
+            return {code: True for code in unit_codes}
+
+        with stage_timer('screener', 'sync'):
+            results, _ = engine.run(units, fetch)
+
+        failed = [code for code, result in results.items() if isinstance(result, Exception)]
+        for code in failed:
+            record_error('screener', results[code])
+        return failed
+
+    def compute(self, universe: List[Dict]) -> List[Dict]:
+        """로컬 일봉으로 전 종목 하락률 계산 (종목이 많으면 프로세스 풀 사용)"""
+        start_date, _ = self._history_range()
+        since = datetime.now() - timedelta(days=RECENT_HIGH_DAYS)
+        symbols = [entry['symbol'] for entry in universe]
+        chunks = [symbols[i:i + COMPUTE_CHUNK_SIZE] for i in range(0, len(symbols), COMPUTE_CHUNK_SIZE)]
+
+        metrics = {}
+        if len(symbols) >= PROCESS_POOL_THRESHOLD and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=self.max_processes) as pool:
+                futures = [
+                    pool.submit(_compute_chunk, self.history_db, chunk, self.windows, start_date, since)
+                    for chunk in chunks
+                ]
+                for future in futures:
+                    metrics.update(future.result())
+        else:
+            for chunk in chunks:
+                metrics.update(_compute_chunk(self.history_db, chunk, self.windows, start_date, since))
+
+        rows = []
+        for entry in universe:
+            result = metrics.get(entry['symbol'])
+            if result is None:
+                continue
+            rows.append(dict(result, symbol=entry['symbol'], code=entry['code'],
+                             name=entry['name'], market=entry['market']))
+        return rows
+
+    def _history_range(self) -> Tuple[datetime, datetime]:
+        """로컬 저장소에 유지할 조회 기간 (가장 긴 하락률 구간, 거래일을 달력 일수로 환산)"""
+        end_date = datetime.now()
+        window_days = int(max(self.windows, default=0) * 1.5) + 10
+        return end_date - timedelta(days=max(RECENT_HIGH_DAYS, window_days)), end_date
+
+    # ---- 결과 조회 ----
+
+    def screen(self, min_decline: float = 0.0, market: Optional[str] = None,
+               window: Optional[int] = None, limit: int = 100) -> Optional[Dict]:
+        """하락률이 min_decline(%) 이상인 종목을 하락률 내림차순으로 반환 (결과 테이블이 없으면 None)
+
+        window를 주면 해당 구간(거래일 수)의 하락률로, 없으면 기본 하락률(90일 고점)로 거른다.
+        """
+        if not self._ensure_loaded():
+            return None
+
+        keys, rows = self._indexes.get((market, window), ([], []))
+        end = bisect_right(keys, -min_decline)
+        return {
+            'computed_at': self._table['computed_at'],
+            'universe_size': self._table.get('universe_size', 0),
+            'total': end,
+            'results': rows[:min(end, limit)]
+        }
+
+    def computed_at(self) -> Optional[str]:
+        """결과 테이블 계산 시각 (없으면 None)"""
+        return self._table['computed_at'] if self._ensure_loaded() else None
+
+    def _ensure_loaded(self) -> bool:
+        """결과 파일이 바뀌었으면 다시 읽기 (결과 테이블이 있으면 True)"""
+        mtime = self._result_mtime()
+        if mtime is not None and mtime != self._loaded_mtime:
+            with self._lock:
+                if mtime != self._loaded_mtime:
+                    try:
+                        with open(self.result_file, 'r', encoding='utf-8') as f:
+                            self._install(json.load(f), mtime)
+                    except Exception as e:
+                        logging.error(f"Error loading screen results from {self.result_file}: {e}")
+                        record_error('screener', e)
+        return self._table is not None
+
+    def _install(self, table: Dict, mtime: Optional[float]):
+        """결과 테이블과 (시장, 구간)별 하락률 내림차순 인덱스 교체"""
+        windows = [None] + [int(window) for window in table.get('windows', [])]
+        markets = [None] + sorted({row['market'] for row in table['rows']})
+        indexes = {}
+        for window in windows:
+            ranked = [(rate, row) for row in table['rows']
+                      for rate in [_decline_for(row, window)] if rate is not None]
+            ranked.sort(key=lambda item: item[0], reverse=True)
+            for market in markets:
+                selected = [(rate, row) for rate, row in ranked if market is None or row['market'] == market]
+                indexes[(market, window)] = ([-rate for rate, _ in selected], [row for _, row in selected])
+        self._table = table
+        self._indexes = indexes
+        self._loaded_mtime = mtime
+
+    def _result_mtime(self) -> Optional[float]:
+        try:
+            return os.path.getmtime(self.result_file)
+        except OSError:
+            return None
+
+
+def _compute_chunk(db_file: str, symbols: List[str], windows: Tuple[int, ...],
+                   start_date: datetime, since: datetime) -> Dict[str, Dict]:
+    """종목 묶음 하나의 하락률 계산 (프로세스 풀 작업 단위, 결과는 작은 dict로 반환)"""
+    series = PriceHistoryStore(db_file).load_price_series(symbols, start_date)
+    if not series:
+        return {}
+    results = compute_drawdowns(PriceMatrix.from_series(series), windows, since=since)
+    metrics = {}
+    for symbol, result in results.items():
+        if result['decline_rate'] is None:
+            continue
+        metrics[symbol] = {
+            'current_price': result['current_price'],
+            'recent_high': result['recent_high'],
+            'recent_high_date': result['recent_high_date'],
+            'decline_rate': round(result['decline_rate'], 4),
+            'drawdowns': {
+                window: round(entry['decline_rate'], 4)
+                for window, entry in result['drawdowns'].items() if entry['decline_rate'] is not None
+            }
+        }
+    return metrics
+
+
+def _decline_for(row: Dict, window: Optional[int]) -> Optional[float]:
+    if window is None:
+        return row.get('decline_rate')
+    return row.get('drawdowns', {}).get(str(window))
+
+
+def build_universe(symbols: Iterable[Tuple[str, Dict]], markets: Iterable[str] = DEFAULT_MARKETS) -> List[Dict]:
+    """(종목명, 종목 정보) 목록에서 대상 시장 종목만 골라 yfinance 심볼 목록 생성 (코드 중복 제거)"""
+    markets = set(markets)
+    universe = []
+    seen = set()
+    for name, info in symbols:
+        market = info.get('market')
+        if market not in markets:
+            continue
+        code = info['code']
+        symbol = code if '.' in code else code + (info.get('suffix') or MARKET_SUFFIXES.get(market, ''))
+        if symbol in seen:
+            continue
+        seen.add(symbol)
+        universe.append({'symbol': symbol, 'code': code, 'name': name, 'market': market})
+    return universe
+
+
+def load_universe(markets: Iterable[str] = DEFAULT_MARKETS, listing: Optional[str] = None) -> List[Dict]:
+    """스크리닝 대상 종목 목록 (StockSearcher 종목 DB + 종목 마스터, 또는 지정한 목록 파일)"""
+    from stock_search import StockSearcher
+    from symbol_master import load_symbol_table, symbol_master_path
+
+    listing = symbol_master_path(listing)
+    if not listing or not os.path.exists(listing):
+        logging.warning(f"종목 마스터 파일이 없어 내장 종목만 스크리닝합니다 ({listing}). "
+                        f"python symbol_master.py로 생성하세요.")
+    builtin = StockSearcher().stock_database
+    return build_universe(load_symbol_table(builtin, listing), markets)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='거래소 전체 종목 하락률 스크리닝')
+    parser.add_argument('--markets', default=','.join(DEFAULT_MARKETS), help='대상 시장 (쉼표로 구분)')
+    parser.add_argument('--listing', default=None, help='종목 목록 CSV (name,code,market[,suffix])')
+    parser.add_argument('--require-listing', action='store_true',
+                        help='종목 마스터 파일이 없으면 내장 종목만 훑지 않고 실패')
+    parser.add_argument('--result-file', default=DEFAULT_RESULT_FILE)
+    parser.add_argument('--history-db', default=DEFAULT_HISTORY_DB)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.require_listing:
+        from symbol_master import symbol_master_path
+
+        listing = symbol_master_path(args.listing)
+        if not listing or not os.path.exists(listing):
+            print(f'종목 마스터 파일이 없습니다: {listing}')
+            return 1
+    universe = load_universe([market for market in args.markets.split(',') if market], args.listing)
+    if not universe:
+        print('스크리닝할 종목이 없습니다.')
+        return 1
+
+    screener = MarketScreener(args.result_file, args.history_db)
+    summary = screener.refresh(universe)
+    print(f"스크리닝 완료: {summary['screened']}/{summary['universe_size']}개 종목 "
+          f"(조회 실패 {summary['fetch_failures']}개)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class SearchCache:
+    """외부 종목 검색 결과용 TTL + LRU 캐시
+
+    - 최대 항목 수를 넘으면 가장 오래 사용하지 않은 항목부터 제거한다.
+    - 빈 결과나 실패한 조회는 짧은 TTL로 저장(네거티브 캐시)하여 같은 질의가
+      반복해서 외부 API로 나가지 않게 한다.
+    - disk_file을 지정하면 SQLite 파일에도 저장하여 재시작 후에도 결과를 재사용한다.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 6 * 3600, negative_ttl: float = 300,
+                 disk_file: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.disk_file = disk_file
+        # key -> (만료 시각, 값)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'negative_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'disk_hits': 0
+        }
+        if self.disk_file:
+            self._init_disk()
+
+    @staticmethod
+    def make_key(provider: str, query: str) -> str:
+        """제공자와 정규화된 질의로 캐시 키 생성"""
+        return f"{provider}:{' '.join(query.strip().lower().split())}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """캐시된 값 반환 (없거나 만료되었으면 None)"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    if not value:
+                        self.stats['negative_hits'] += 1
+                    return value
+                del self._entries[key]
+                self.stats['expirations'] += 1
+
+        entry = self._disk_get(key, now)
+        with self._lock:
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self.stats['hits'] += 1
+            self.stats['disk_hits'] += 1
+            self._store(key, entry[0], entry[1])
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """값 저장 (빈 값은 네거티브 TTL 적용)"""
+        if ttl is None:
+            ttl = self.ttl if value else self.negative_ttl
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._store(key, expires_at, value)
+        self._disk_set(key, expires_at, value)
+
+    def set_negative(self, key: str):
+        """조회 실패를 네거티브 항목으로 저장"""
+        self.set(key, [], self.negative_ttl)
+
+    def clear(self):
+        """메모리 캐시 비우기"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        """적중/미스/제거 횟수와 현재 크기"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
+
+    def _store(self, key: str, expires_at: float, value: Any):
+        """메모리에 저장하고 용량을 넘으면 LRU 항목 제거 (잠금 상태에서 호출)"""
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def _connect(self) -> sqlite3.Connection:
+        """디스크 캐시 DB 연결"""
+        conn = sqlite3.connect(self.disk_file, timeout=5)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def _init_disk(self):
+        """디스크 캐시 테이블 생성 및 만료 항목 정리"""
+        try:
+            os.makedirs(os.path.dirname(self.disk_file) or '.', exist_ok=True)
+            conn = self._connect()
+            try:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS search_cache (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL,
+                        expires_at REAL NOT NULL
+                    )
+                ''')
+                conn.execute('DELETE FROM search_cache WHERE expires_at <= ?', (time.time(),))
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            logging.error(f"검색 캐시 파일 초기화 실패: {e}")
+            self.disk_file = None
+
+    def _disk_get(self, key: str, now: float):
+        """디스크 캐시 조회 ((만료 시각, 값) 또는 None)"""
+        if not self.disk_file:
+            return None
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    'SELECT value, expires_at FROM search_cache WHERE key = ? AND expires_at > ?',
+                    (key, now)
+                ).fetchone()
+            finally:
+                conn.close()
+            if row:
+                return row[1], json.loads(row[0])
+        except Exception as e:
+            logging.error(f"검색 캐시 파일 조회 실패: {e}")
+        return None
+
+    def _disk_set(self, key: str, expires_at: float, value: Any):
+        """디스크 캐시에 저장"""
+        if not self.disk_file:
+            return
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    'INSERT OR REPLACE INTO search_cache (key, value, expires_at) VALUES (?, ?, ?)',
+                    (key, json.dumps(value, ensure_ascii=False), expires_at)
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            logging.error(f"검색 캐시 파일 저장 실패: {e}")
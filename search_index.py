@@ -0,0 +1,326 @@
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Set, Tuple
+
+# 한글 음절 분해용 자모 테이블 (호환 자모)
+HANGUL_BASE = 0xAC00
+HANGUL_END = 0xD7A3
+CHOSUNG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+JUNGSUNG = ['ㅏ', 'ㅐ', 'ㅑ', 'ㅒ', 'ㅓ', 'ㅔ', 'ㅕ', 'ㅖ', 'ㅗ', 'ㅗㅏ', 'ㅗㅐ', 'ㅗㅣ', 'ㅛ', 'ㅜ',
+            'ㅜㅓ', 'ㅜㅔ', 'ㅜㅣ', 'ㅠ', 'ㅡ', 'ㅡㅣ', 'ㅣ']
+JONGSUNG = ['', 'ㄱ', 'ㄲ', 'ㄱㅅ', 'ㄴ', 'ㄴㅈ', 'ㄴㅎ', 'ㄷ', 'ㄹ', 'ㄹㄱ', 'ㄹㅁ', 'ㄹㅂ', 'ㄹㅅ', 'ㄹㅌ',
+            'ㄹㅍ', 'ㄹㅎ', 'ㅁ', 'ㅂ', 'ㅂㅅ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+# 입력 중인 겹자모를 분해된 형태로 맞추기 위한 표
+COMPOUND_JAMO = {
+    'ㅘ': 'ㅗㅏ', 'ㅙ': 'ㅗㅐ', 'ㅚ': 'ㅗㅣ', 'ㅝ': 'ㅜㅓ', 'ㅞ': 'ㅜㅔ', 'ㅟ': 'ㅜㅣ', 'ㅢ': 'ㅡㅣ',
+    'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ', 'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ', 'ㄼ': 'ㄹㅂ', 'ㄽ': 'ㄹㅅ',
+    'ㄾ': 'ㄹㅌ', 'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ'
+}
+
+
+def is_hangul_syllable(char: str) -> bool:
+    """완성형 한글 음절 여부"""
+    return HANGUL_BASE <= ord(char) <= HANGUL_END
+
+
+def is_consonant_jamo(char: str) -> bool:
+    """호환 자모 자음(ㄱ~ㅎ) 여부"""
+    return 'ㄱ' <= char <= 'ㅎ'
+
+
+def decompose_hangul(text: str) -> str:
+    """한글 음절을 자모 단위로 분해 (겹모음/겹받침도 입력 순서대로 분해)
+
+    예: '삼성전자' -> 'ㅅㅏㅁㅅㅓㅇㅈㅓㄴㅈㅏ'
+    한글이 아닌 문자는 그대로 둔다.
+    """
+    result = []
+    for char in text:
+        if is_hangul_syllable(char):
+            offset = ord(char) - HANGUL_BASE
+            result.append(CHOSUNG[offset // 588])
+            result.append(JUNGSUNG[(offset % 588) // 28])
+            result.append(JONGSUNG[offset % 28])
+        else:
+            result.append(COMPOUND_JAMO.get(char, char))
+    return ''.join(result)
+
+
+def extract_chosung(text: str) -> str:
+    """한글 음절의 초성만 추출 (한글이 아닌 문자는 그대로)
+
+    예: '삼성전자' -> 'ㅅㅅㅈㅈ', 'SK하이닉스' -> 'skㅎㅇㄴㅅ'
+    """
+    result = []
+    for char in text:
+        if is_hangul_syllable(char):
+            result.append(CHOSUNG[(ord(char) - HANGUL_BASE) // 588])
+        else:
+            result.append(char)
+    return ''.join(result)
+
+
+def is_chosung_query(text: str) -> bool:
+    """초성 질의인지 여부 (예: 'ㅅㅅㅈㅈ', 'skㅎㅇ')
+
+    자음 자모가 하나 이상 있고 완성형 음절이나 모음 자모는 없어야 한다.
+    """
+    has_consonant = False
+    for char in text:
+        if is_consonant_jamo(char):
+            has_consonant = True
+        elif is_hangul_syllable(char) or 'ㅏ' <= char <= 'ㅣ':
+            return False
+    return has_consonant
+
+
+def has_hangul(text: str) -> bool:
+    """한글 음절 또는 자모 포함 여부"""
+    return any(is_hangul_syllable(char) or 'ㄱ' <= char <= 'ㅣ' for char in text)
+
+
+def hangul_partial_match(query: str, name: str) -> bool:
+    """입력 중인 한글 질의가 종목명과 일치하는지 확인
+
+    마지막 글자를 제외한 음절은 그대로 일치해야 하고, 마지막 글자는 자모 단위
+    접두사로 비교한다. 받침이 다음 음절의 초성으로 넘어가는 입력 중간 상태
+    ('삼성저', '삼성전ㅈ', '사ㅇ' 등)도 일치로 본다.
+    """
+    if not query:
+        return False
+    head, last = query[:-1], decompose_hangul(query[-1])
+
+    start = name.find(head)
+    while start != -1:
+        rest = name[start + len(head):]
+        if rest and decompose_hangul(rest).startswith(last):
+            return True
+        start = name.find(head, start + 1)
+    return False
+
+
+class _SortedPrefixIndex:
+    """정렬된 배열로 표현한 접두사 트라이
+
+    키 자체는 keys 목록에 두고, 키 순서로 정렬한 항목 번호만 array로 보관한다.
+    노드 객체를 만들지 않으므로 종목 수가 많아도 메모리가 거의 늘지 않는다.
+    """
+
+    def __init__(self, keys: List[str]):
+        self.keys = keys
+        self.order = array('I')
+        self._dirty = False
+
+    def mark_dirty(self):
+        """키가 추가되어 다음 조회 때 다시 정렬해야 함을 표시"""
+        self._dirty = True
+
+    def _sorted(self) -> array:
+        if self._dirty or len(self.order) != len(self.keys):
+            keys = self.keys
+            self.order = array('I', sorted(range(len(keys)), key=keys.__getitem__))
+            self._dirty = False
+        return self.order
+
+    def _lower_bound(self, prefix: str) -> int:
+        """prefix 이상인 첫 키의 위치"""
+        order = self._sorted()
+        keys = self.keys
+        low, high = 0, len(order)
+        while low < high:
+            mid = (low + high) // 2
+            if keys[order[mid]] < prefix:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def prefix_ids(self, prefix: str) -> Set[int]:
+        """prefix로 시작하는 모든 키의 항목 번호"""
+        order = self._sorted()
+        ids = set()
+        position = self._lower_bound(prefix)
+        while position < len(order) and self.keys[order[position]].startswith(prefix):
+            ids.add(order[position])
+            position += 1
+        return ids
+
+    def contained_ids(self, text: str) -> Set[int]:
+        """text 안에 부분 문자열로 들어 있는 키의 항목 번호
+
+        text의 각 시작 위치에서 한 글자씩 늘려 가며 트라이를 따라가듯 탐색하고,
+        그 접두사로 시작하는 키가 더 이상 없으면 다음 위치로 넘어간다.
+        """
+        order = self._sorted()
+        keys = self.keys
+        found = set()
+        for start in range(len(text)):
+            for end in range(start + 1, len(text) + 1):
+                prefix = text[start:end]
+                position = self._lower_bound(prefix)
+                if position >= len(order) or not keys[order[position]].startswith(prefix):
+                    break
+                while position < len(order) and keys[order[position]] == prefix:
+                    found.add(order[position])
+                    position += 1
+        return found
+
+
+class _NgramPostings:
+    """문자 n-gram 역색인 (부분 문자열 후보 검색용)
+
+    항목 번호는 증가하는 순서로 추가되므로 각 목록은 정렬된 array로 유지된다.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.keys = []
+        self.postings = {}
+        # n보다 짧은 질의를 위한 문자 단위 역색인
+        self.unigrams = {}
+
+    def add(self, key: str):
+        """키 추가 (항목 번호는 추가 순서)"""
+        entry_id = len(self.keys)
+        self.keys.append(key)
+        for gram in set(self._ngrams(key)):
+            ids = self.postings.get(gram)
+            if ids is None:
+                ids = self.postings[gram] = array('I')
+            ids.append(entry_id)
+        for char in set(key):
+            ids = self.unigrams.get(char)
+            if ids is None:
+                ids = self.unigrams[char] = array('I')
+            ids.append(entry_id)
+
+    def find(self, query: str) -> Set[int]:
+        """query를 부분 문자열로 포함하는 키의 항목 번호"""
+        if not query:
+            return set()
+        if len(query) < self.size:
+            candidates = self.unigrams.get(query[0], ())
+            return {entry_id for entry_id in candidates if query in self.keys[entry_id]}
+
+        postings = []
+        for gram in set(self._ngrams(query)):
+            ids = self.postings.get(gram)
+            if not ids:
+                return set()
+            postings.append(ids)
+
+        # 가장 작은 후보 목록부터 교집합
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for ids in postings[1:]:
+            candidates = {entry_id for entry_id in candidates if self._contains(ids, entry_id)}
+            if not candidates:
+                return candidates
+
+        return {entry_id for entry_id in candidates if query in self.keys[entry_id]}
+
+    @staticmethod
+    def _contains(ids: array, entry_id: int) -> bool:
+        """정렬된 array에 항목 번호가 있는지 확인"""
+        position = bisect_left(ids, entry_id)
+        return position < len(ids) and ids[position] == entry_id
+
+    def _ngrams(self, key: str) -> List[str]:
+        """문자 n-gram 목록"""
+        size = self.size
+        return [key[i:i + size] for i in range(len(key) - size + 1)]
+
+
+class SymbolIndex:
+    """종목명/종목코드 검색 인덱스 (접두사 트라이 + 문자 n-gram 역색인)
+
+    search_in_local_database의 기존 일치 규칙을 그대로 따른다.
+    - 완전 일치: query == name
+    - 부분 일치: query in name  (n-gram 역색인 후보 교집합 후 확인)
+    - 역포함:   name in query  (query의 각 위치에서 트라이를 따라가며 탐색)
+    종목코드는 완전 일치와 접두사 일치만 허용한다.
+
+    한글 질의는 추가로 초성 키('ㅅㅅㅈㅈ')와 자모 분해 키('ㅅㅏㅁㅅㅓㅇㅈ')로도
+    찾으므로, 초성 입력이나 입력 중인 음절도 로컬에서 바로 처리된다.
+    """
+
+    NGRAM_SIZE = 2
+    # 자모 키는 문자 종류가 적으므로 더 긴 n-gram 사용
+    JAMO_NGRAM_SIZE = 3
+
+    def __init__(self, entries: Iterable[Tuple[str, Dict]] = (), table=None):
+        """entries로 항목을 하나씩 추가하거나, table(CompactSymbolTable 등 번호로
+        (종목명, 종목 정보)를 돌려주는 객체)을 주면 항목을 복사하지 않고 참조한다."""
+        # 항목 번호 -> (원래 종목명, 종목 정보)
+        self.entries = []
+        self.names = _NgramPostings(self.NGRAM_SIZE)
+        self.chosung = _NgramPostings(self.NGRAM_SIZE)
+        self.jamo = _NgramPostings(self.JAMO_NGRAM_SIZE)
+        self.code_keys = []
+        self.name_trie = _SortedPrefixIndex(self.names.keys)
+        self.code_trie = _SortedPrefixIndex(self.code_keys)
+        for name, info in entries:
+            self.add(name, info)
+
+        if table is not None:
+            for entry_id in range(len(table)):
+                self._index_keys(table.name(entry_id), table.code(entry_id))
+            self.entries = table
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """검색용 정규화 (소문자 변환, 앞뒤 공백 제거)"""
+        return text.strip().lower()
+
+    def add(self, name: str, info: Dict):
+        """종목 하나를 인덱스에 추가"""
+        self.entries.append((name, info))
+        self._index_keys(name, str(info.get('code', '')))
+
+    def _index_keys(self, name: str, code: str):
+        """종목명/코드 키를 트라이와 n-gram 역색인에 등록"""
+        key = self.normalize(name)
+        self.names.add(key)
+        self.chosung.add(extract_chosung(key))
+        self.jamo.add(decompose_hangul(key))
+        self.code_keys.append(self.normalize(code))
+        self.name_trie.mark_dirty()
+        self.code_trie.mark_dirty()
+
+    def search(self, query: str) -> List[Tuple[str, Dict]]:
+        """질의와 일치하는 (종목명, 종목 정보) 목록을 등록 순서대로 반환"""
+        key = self.normalize(query)
+        if not key:
+            return []
+
+        matched = set()
+        matched.update(self.names.find(key))
+        matched.update(self.name_trie.contained_ids(key))
+        matched.update(self.code_trie.prefix_ids(key))
+        if has_hangul(key):
+            matched.update(self._hangul_matches(key))
+
+        return [self.entries[entry_id] for entry_id in sorted(matched)]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _hangul_matches(self, key: str) -> Set[int]:
+        """초성 질의 및 입력 중인 한글 질의와 일치하는 항목"""
+        if is_chosung_query(key):
+            return self.chosung.find(key)
+
+        return {
+            entry_id for entry_id in self.jamo.find(decompose_hangul(key))
+            if hangul_partial_match(key, self.names.keys[entry_id])
+        }
+
+    def is_hangul_match(self, query: str, name: str) -> bool:
+        """초성 또는 자모 단위로 질의가 종목명과 일치하는지 여부 (결과 정렬용)"""
+        key = self.normalize(query)
+        target = self.normalize(name)
+        if not has_hangul(key):
+            return False
+        if is_chosung_query(key):
+            return key in extract_chosung(target)
+        return hangul_partial_match(key, target)
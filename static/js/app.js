@@ -54,19 +54,12 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
     
-    // 새로고침 버튼 로딩 효과
+    // 새로고침 버튼: 백그라운드 작업 시작 후 진행 상황 표시
     const refreshLinks = document.querySelectorAll('a[href="/refresh_data"]');
     refreshLinks.forEach(function(link) {
         link.addEventListener('click', function(e) {
-            const originalText = this.innerHTML;
-            this.innerHTML = '<span class="loading me-2"></span>새로고침 중...';
-            this.classList.add('disabled');
-            
-            // 타임아웃으로 복원 (실제로는 페이지가 리로드됨)
-            setTimeout(function() {
-                link.innerHTML = originalText;
-                link.classList.remove('disabled');
-            }, 5000);
+            e.preventDefault();
+            startRefreshJob();
         });
     });
     
@@ -95,7 +88,7 @@ document.addEventListener('DOMContentLoaded', function() {
         // Ctrl + R: 새로고침
         if (e.ctrlKey && e.key === 'r') {
             e.preventDefault();
-            window.location.href = '/refresh_data';
+            startRefreshJob();
         }
         
         // Ctrl + A: 종목 추가 폼으로 포커스
@@ -109,6 +102,183 @@ document.addEventListener('DOMContentLoaded', function() {
     });
 });
 
+// 백그라운드 새로고침 작업 시작 및 진행 상황 폴링
+function startRefreshJob() {
+    const refreshLinks = document.querySelectorAll('a[href="/refresh_data"]');
+    const originalTexts = Array.from(refreshLinks).map(link => link.innerHTML);
+    
+    function setProgress(text) {
+        refreshLinks.forEach(function(link) {
+            link.innerHTML = `<span class="loading me-2"></span>${text}`;
+            link.classList.add('disabled');
+        });
+    }
+    
+    function restore() {
+        refreshLinks.forEach(function(link, i) {
+            link.innerHTML = originalTexts[i];
+            link.classList.remove('disabled');
+        });
+    }
+    
+    setProgress('새로고침 중...');
+    
+    fetch('/refresh_data?format=json')
+        .then(response => response.json())
+        .then(data => {
+            if (!data.success) {
+                throw new Error(data.error || '새로고침을 시작하지 못했습니다.');
+            }
+            pollRefreshJob(data.status_url, setProgress, restore);
+        })
+        .catch(error => {
+            console.error('새로고침 오류:', error);
+            showAlert(`데이터 새로고침에 실패했습니다: ${error.message}`, 'danger');
+            restore();
+        });
+}
+
+function pollRefreshJob(statusUrl, setProgress, restore) {
+    fetch(statusUrl)
+        .then(response => response.json())
+        .then(data => {
+            if (!data.success) {
+                throw new Error(data.error);
+            }
+            
+            const job = data.job;
+            if (job.status === 'running') {
+                setProgress(`새로고침 중... ${job.done}/${job.total}`);
+                setTimeout(() => pollRefreshJob(statusUrl, setProgress, restore), 1000);
+                return;
+            }
+            
+            if (job.status === 'completed') {
+                // 스트림이 연결되어 있으면 바뀐 행은 이미 갱신됨
+                if (stockStream && stockStream.readyState === EventSource.OPEN) {
+                    restore();
+                } else {
+                    window.location.reload();
+                }
+            } else {
+                showAlert(`데이터 새로고침에 실패했습니다: ${job.error}`, 'danger');
+                restore();
+            }
+        })
+        .catch(error => {
+            console.error('새로고침 상태 조회 오류:', error);
+            restore();
+        });
+}
+
+// 종목 변경 스트림 (/api/stream)
+let stockStream = null;
+
+function initStockStream() {
+    if (!window.EventSource || !document.querySelector('tr[data-code]')) return;
+    
+    // 재접속과 Last-Event-ID 전송은 브라우저가 처리
+    stockStream = new EventSource('/api/stream');
+    
+    stockStream.addEventListener('stocks', function(e) {
+        const data = JSON.parse(e.data);
+        data.stocks.forEach(patchStockRow);
+    });
+    
+    stockStream.addEventListener('removed', function(e) {
+        const row = findStockRow(JSON.parse(e.data).code);
+        if (row) row.remove();
+    });
+    
+    // 새 종목 행은 서버에서 그려야 하므로 새로 고침
+    stockStream.addEventListener('added', function() {
+        window.location.reload();
+    });
+    
+    // 다른 워커로 재접속했거나 놓친 이벤트가 있으면 현재 목록으로 다시 맞춤
+    stockStream.addEventListener('reset', resyncStockRows);
+}
+
+function resyncStockRows() {
+    fetch('/api/stock_status', { cache: 'no-cache' })
+        .then(response => response.json())
+        .then(data => {
+            if (!data.success) {
+                throw new Error(data.error);
+            }
+            
+            const rowCodes = Array.from(document.querySelectorAll('tr[data-code]')).map(row => row.dataset.code);
+            const codes = data.stocks.map(stock => stock.code);
+            // 종목이 추가/삭제되었으면 행 구성이 달라지므로 새로 고침
+            if (rowCodes.length !== codes.length || !codes.every(code => rowCodes.includes(code))) {
+                window.location.reload();
+                return;
+            }
+            data.stocks.forEach(patchStockRow);
+        })
+        .catch(error => {
+            console.error('종목 목록 동기화 오류:', error);
+            window.location.reload();
+        });
+}
+
+function findStockRow(code) {
+    return Array.from(document.querySelectorAll('tr[data-code]'))
+        .find(row => row.dataset.code === code);
+}
+
+// 종목 행의 값/상태 셀만 바꿔 쓰기 (templates/index.html과 같은 마크업)
+function patchStockRow(stock) {
+    const row = findStockRow(stock.code);
+    if (!row) return;
+    
+    const muted = '<span class="text-muted">-</span>';
+    const cells = {
+        price: stock.current_price_formatted ? `<strong>${escapeHtml(stock.current_price_formatted)}</strong>` : muted,
+        high: stock.recent_high_formatted ? escapeHtml(stock.recent_high_formatted) : muted,
+        decline: renderDeclineBadge(stock),
+        updated: `<div class="d-flex flex-column align-items-center">
+            ${stock.recent_high_date ? `<small>${escapeHtml(stock.recent_high_date)}</small>` : muted}
+            ${stock.last_updated_formatted ? `<small class="text-muted">${escapeHtml(stock.last_updated_formatted)}</small>` : ''}
+        </div>`,
+        status: renderStatusBadge(stock)
+    };
+    
+    Object.keys(cells).forEach(function(field) {
+        const cell = row.querySelector(`td[data-field="${field}"]`);
+        if (cell) cell.innerHTML = cells[field];
+    });
+    row.classList.toggle('table-danger', stock.status === 'error');
+}
+
+function renderDeclineBadge(stock) {
+    if (!stock.decline_rate_formatted) return '<span class="text-muted">-</span>';
+    
+    const color = {low: 'secondary', medium: 'warning'}[stock.decline_status] || 'danger';
+    const windows = Object.entries(stock.drawdowns || {})
+        .map(([window, drawdown]) => `${window}일: ${drawdown.decline_rate_formatted || '-'}`)
+        .join(' / ');
+    const title = windows ? ` title="${escapeHtml(windows)}"` : '';
+    return `<span class="badge bg-${color}"${title}>${escapeHtml(stock.decline_rate_formatted)}</span>`;
+}
+
+function renderStatusBadge(stock) {
+    if (stock.status === 'error') {
+        return `<span class="badge bg-danger" title="${escapeHtml(stock.error_message || '')}">오류</span>`;
+    }
+    if (stock.status === 'no_data') return '<span class="badge bg-warning">데이터없음</span>';
+    if (stock.status === 'outdated') return '<span class="badge bg-secondary">업데이트필요</span>';
+    return '<span class="badge bg-success">정상</span>';
+}
+
+function escapeHtml(text) {
+    return String(text)
+        .replace(/&/g, '&amp;')
+        .replace(/</g, '&lt;')
+        .replace(/>/g, '&gt;')
+        .replace(/"/g, '&quot;');
+}
+
 // 알림 표시 함수
 function showAlert(message, type = 'info') {
     const alertContainer = document.querySelector('.container');
@@ -6,28 +6,32 @@ GitHub Pages 배포용
 
 import os
 import json
-import shutil
 from datetime import datetime
+from content_digest import write_if_changed
+from market_calendar import parse_timestamp
 from stock_tracker import StockTracker
-from stock_search import StockSearcher
+
+OUTPUT_DIR = 'docs'
+
+# 그대로 복사하는 정적 파일 (원본 경로, docs 안의 경로)
+STATIC_FILES = [
+    ('static/css/style.css', 'static/css/style.css'),
+    ('static/js/app.js', 'static/js/app.js')
+]
 
 def create_static_html():
-    """정적 HTML 파일 생성"""
-    
-    # 정적 파일 디렉토리 생성
-    if os.path.exists('docs'):
-        shutil.rmtree('docs')
-    os.makedirs('docs', exist_ok=True)
-    os.makedirs('docs/static/css', exist_ok=True)
-    os.makedirs('docs/static/js', exist_ok=True)
+    """정적 HTML 파일 생성
     
-    # CSS, JS 파일 복사
-    shutil.copy('static/css/style.css', 'docs/static/css/')
-    shutil.copy('static/js/app.js', 'docs/static/js/')
+    생성할 파일 내용을 모두 만든 뒤 해시가 기존 파일과 다른 파일만 다시 쓰고,
+    더 이상 생성하지 않는 파일은 지운다. 페이지의 시각은 생성 시각 대신 데이터의
+    마지막 업데이트 시각을 사용하므로, 데이터가 그대로면 docs/도 바뀌지 않는다.
+    """
     
     # 데이터 로드
     tracker = StockTracker()
     stocks = tracker.get_tracked_stocks()
+    data_time = _data_timestamp(tracker.stocks)
+    data_time_text = data_time.strftime('%Y-%m-%d %H:%M:%S')
     
     # HTML 템플릿 생성
     html_content = f"""<!DOCTYPE html>
@@ -51,7 +55,7 @@ def create_static_html():
             </a>
             <span class="navbar-text">
                 <i class="fas fa-clock me-1"></i>
-                <span id="current_time">{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</span>
+                <span id="current_time">{data_time_text}</span>
             </span>
         </div>
     </nav>
@@ -62,7 +66,7 @@ def create_static_html():
             <i class="fas fa-info-circle me-2"></i>
             <strong>정적 버전:</strong> 이 페이지는 GitHub Pages용 정적 버전입니다. 
             실시간 데이터 업데이트나 종목 추가/삭제 기능은 제공되지 않습니다.
-            <br><small>마지막 업데이트: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</small>
+            <br><small>마지막 업데이트: {data_time_text}</small>
         </div>
 
         <!-- 통계 카드 섹션 -->
@@ -264,7 +268,7 @@ def create_static_html():
             <p class="text-muted mb-0">
                 <i class="fas fa-chart-line me-2"></i>
                 한국 주식 추적기 - 정적 버전
-                <br><small>GitHub Pages 배포용 | 마지막 업데이트: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</small>
+                <br><small>GitHub Pages 배포용 | 마지막 업데이트: """ + data_time_text + """</small>
             </p>
         </div>
     </footer>
@@ -294,27 +298,65 @@ def create_static_html():
 </body>
 </html>"""
 
-    # HTML 파일 생성
-    with open('docs/index.html', 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    outputs = {'index.html': html_content.encode('utf-8')}
     
     # 데이터 JSON 파일도 생성 (참고용)
-    with open('docs/stocks_data.json', 'w', encoding='utf-8') as f:
-        json.dump({
-            'last_updated': datetime.now().isoformat(),
-            'stocks': stocks,
-            'total_count': len(stocks),
-            'category_counts': {
-                'low': len([s for s in stocks if s.get('decline_status') == 'low']),
-                'medium': len([s for s in stocks if s.get('decline_status') == 'medium']),
-                'high': len([s for s in stocks if s.get('decline_status') == 'high'])
-            }
-        }, f, ensure_ascii=False, indent=2)
+    outputs['stocks_data.json'] = json.dumps({
+        'last_updated': data_time.astimezone().isoformat(),
+        'stocks': stocks,
+        'total_count': len(stocks),
+        'category_counts': {
+            'low': len([s for s in stocks if s.get('decline_status') == 'low']),
+            'medium': len([s for s in stocks if s.get('decline_status') == 'medium']),
+            'high': len([s for s in stocks if s.get('decline_status') == 'high'])
+        }
+    }, ensure_ascii=False, indent=2).encode('utf-8')
+    
+    for source, target in STATIC_FILES:
+        with open(source, 'rb') as f:
+            outputs[target] = f.read()
+    
+    written, removed = write_outputs(OUTPUT_DIR, outputs)
     
-    print(f"정적 HTML 파일이 생성되었습니다: docs/index.html")
+    print(f"정적 HTML 파일이 생성되었습니다: {OUTPUT_DIR}/index.html")
     print(f"총 {len(stocks)}개 종목 포함")
+    print(f"변경된 파일 {len(written)}개, 삭제된 파일 {len(removed)}개"
+          + (f": {', '.join(written + removed)}" if written or removed else ''))
     
     return True
 
+def _data_timestamp(stocks: dict) -> datetime:
+    """종목 데이터의 가장 최근 업데이트 시각 (없으면 현재 시각)"""
+    latest = None
+    for data in stocks.values():
+        try:
+            updated = parse_timestamp(data['last_updated'])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if latest is None or updated > latest:
+            latest = updated
+    return latest or datetime.now()
+
+def write_outputs(output_dir: str, outputs: dict):
+    """내용이 바뀐 파일만 기록하고 outputs에 없는 기존 파일은 삭제
+    
+    (기록한 상대 경로 목록, 삭제한 상대 경로 목록) 반환
+    """
+    written = [
+        relative for relative, content in sorted(outputs.items())
+        if write_if_changed(os.path.join(output_dir, relative), content)
+    ]
+    
+    removed = []
+    for root, _, files in os.walk(output_dir, topdown=False):
+        for name in files:
+            relative = os.path.relpath(os.path.join(root, name), output_dir).replace(os.sep, '/')
+            if relative not in outputs:
+                os.remove(os.path.join(root, name))
+                removed.append(relative)
+        if root != output_dir and not os.listdir(root):
+            os.rmdir(root)
+    return written, sorted(removed)
+
 if __name__ == '__main__':
     create_static_html()
\ No newline at end of file
@@ -0,0 +1,113 @@
+import json
+import time
+import uuid
+import threading
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class StockEventBroker:
+    """종목 변경 이벤트를 Server-Sent Events로 여러 클라이언트에 전달하는 브로커
+
+    이벤트는 발행할 때 한 번만 SSE 텍스트로 직렬화해 최근 history_size개를 보관하고,
+    모든 연결은 같은 조건 변수에서 기다렸다가 보관된 텍스트를 그대로 보낸다.
+    이벤트 ID는 '<브로커 ID>-<순번>' 형식이다. 브로커는 워커마다 따로 있으므로, 재접속 시
+    Last-Event-ID가 다른 프로세스(워커)의 것이거나 형식이 잘못되었거나 보관 범위를 벗어났으면
+    놓친 이벤트를 보낼 수 없어 전체 목록을 다시 받으라는 reset 이벤트를 보낸다.
+
+    연결 하나가 워커 스레드를 계속 잡고 있지 않도록 max_stream_seconds가 지나면 응답을 끝내고,
+    브라우저 EventSource가 Last-Event-ID와 함께 다시 접속하게 한다.
+    """
+
+    # 재접속 대기 시간 (밀리초, 브라우저 EventSource에 전달)
+    RETRY_MS = 1000
+
+    def __init__(self, history_size: int = 500, heartbeat_seconds: float = 15.0,
+                 max_stream_seconds: float = 25.0):
+        self.broker_id = uuid.uuid4().hex[:8]
+        self.heartbeat_seconds = heartbeat_seconds
+        # gunicorn 워커 timeout(기본 30초)보다 짧게 유지
+        self.max_stream_seconds = max_stream_seconds
+        self.subscribers = 0
+        self._events = deque(maxlen=history_size)
+        self._last_seq = 0
+        self._cond = threading.Condition()
+
+    def publish(self, event: str, data: Dict) -> str:
+        """이벤트 발행 (발행된 이벤트 ID 반환)"""
+        with self._cond:
+            self._last_seq += 1
+            event_id = f"{self.broker_id}-{self._last_seq}"
+            payload = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+            self._events.append((self._last_seq, format_sse(event, payload, event_id)))
+            self._cond.notify_all()
+            return event_id
+
+    def stream(self, last_event_id: Optional[str] = None) -> Iterator[str]:
+        """SSE 응답 본문 생성기 (이벤트가 없으면 heartbeat 주석 전송, max_stream_seconds 후 종료)"""
+        deadline = time.monotonic() + self.max_stream_seconds
+        with self._cond:
+            self.subscribers += 1
+        try:
+            yield f"retry: {self.RETRY_MS}\n\n"
+
+            seq = self._resume_seq(last_event_id)
+            if seq is None:
+                seq = self._last_seq
+                yield format_sse('reset', '{}', f"{self.broker_id}-{seq}")
+            else:
+                # 이벤트 없이 연결이 끝나도 재접속 때 이 순번부터 이어 받도록 ID만 전달
+                yield f"id: {self.broker_id}-{seq}\n\n"
+
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                seq, messages = self._wait(seq, min(self.heartbeat_seconds, remaining))
+                if messages is None:
+                    # 느린 클라이언트가 보관 범위를 놓친 경우
+                    yield format_sse('reset', '{}', f"{self.broker_id}-{seq}")
+                elif messages:
+                    yield ''.join(messages)
+                else:
+                    yield ': heartbeat\n\n'
+        finally:
+            with self._cond:
+                self.subscribers -= 1
+
+    def _resume_seq(self, last_event_id: Optional[str]) -> Optional[int]:
+        """Last-Event-ID에서 이어 받을 순번 (놓친 이벤트를 보낼 수 없으면 None)"""
+        if not last_event_id:
+            return self._last_seq
+        broker_id, _, seq = last_event_id.rpartition('-')
+        if broker_id != self.broker_id or not seq.isdigit():
+            # 다른 워커의 ID는 이 브로커의 순번과 무관하므로 그 사이 이벤트를 알 수 없음
+            return None
+        seq = int(seq)
+        with self._cond:
+            if seq > self._last_seq or not self._covers(seq):
+                return None
+        return seq
+
+    def _wait(self, seq: int, timeout: float) -> Tuple[int, Optional[List[str]]]:
+        """seq 이후 이벤트를 timeout까지 기다려 반환 ((새 순번, 메시지 목록 또는 None))"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._last_seq > seq, timeout=timeout)
+            if not self._covers(seq):
+                return self._last_seq, None
+            messages = [message for event_seq, message in self._events if event_seq > seq]
+            return self._last_seq, messages
+
+    def _covers(self, seq: int) -> bool:
+        """seq 다음 이벤트부터 모두 보관 중인지 여부"""
+        return not self._events or self._events[0][0] <= seq + 1
+
+
+def format_sse(event: str, data: str, event_id: Optional[str] = None) -> str:
+    """SSE 메시지 한 개 (data는 한 줄 문자열)"""
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {data}")
+    return '\n'.join(lines) + '\n\n'
@@ -1,20 +1,98 @@
-import requests
+import os
 import json
 import logging
 from typing import List, Dict, Optional
 from urllib.parse import quote
 import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from search_index import SymbolIndex, is_chosung_query
+from search_cache import SearchCache
+from symbol_master import KRX_MARKETS, load_symbol_table
+from metrics import REGISTRY, record_error, stage_timer
+
+# 외부 검색 제공자 지표와 검색 캐시 상태 지표
+PROVIDER_SECONDS = REGISTRY.histogram(
+    'stocktracker_search_provider_seconds', '외부 종목 검색 제공자 응답 시간 (초)', ['provider']
+)
+PROVIDER_TIMEOUTS = REGISTRY.counter(
+    'stocktracker_search_provider_timeouts_total', '제한 시간 안에 끝나지 않은 외부 검색 수', ['provider']
+)
+SEARCH_CACHE_EVENTS = REGISTRY.gauge(
+    'stocktracker_search_cache_events', '검색 캐시 누적 적중/미스/제거 수', ['event']
+)
+SEARCH_CACHE_HIT_RATIO = REGISTRY.gauge(
+    'stocktracker_search_cache_hit_ratio', '검색 캐시 적중률'
+)
 
 class StockSearcher:
     """한국 주식 종목명으로 종목 코드 검색 클래스"""
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        # 한국 주요 종목 데이터베이스 (실제 데이터)
-        self.stock_database = self._load_stock_database()
+    # 외부 검색 전체에 허용하는 응답 시간 (초)
+    DEFAULT_SEARCH_BUDGET = 0.3
+    
+    def __init__(self, cache: Optional[SearchCache] = None, search_budget: float = DEFAULT_SEARCH_BUDGET,
+                 enabled_providers: Optional[List[str]] = None):
+        # 외부 검색용 HTTP 세션 (첫 외부 검색 때 생성)
+        self._session = None
+        # 한국 주요 종목 데이터베이스 (실제 데이터, 첫 사용 때 생성)
+        self._stock_database = None
+        # 전체 종목 마스터와 검색 인덱스는 첫 검색 때 한 번만 구축
+        self._search_index = None
+        self._index_lock = threading.Lock()
+        # 외부 검색 결과 캐시 (SEARCH_CACHE_FILE 지정 시 디스크에도 저장)
+        self.cache = cache or SearchCache(disk_file=os.environ.get('SEARCH_CACHE_FILE'))
+        
+        # 외부 검색 제공자 (동시에 조회하고 제한 시간까지 도착한 결과만 사용)
+        self.remote_providers = {
+            'naver': self.search_by_name_naver,
+            'investing': self.search_by_name_investing
+        }
+        # Investing.com 검색은 SEARCH_PROVIDERS=naver,investing 처럼 지정할 때만 사용
+        if enabled_providers is None:
+            enabled_providers = os.environ.get('SEARCH_PROVIDERS', 'naver').split(',')
+        self.enabled_providers = [name.strip() for name in enabled_providers if name.strip() in self.remote_providers]
+        self.search_budget = search_budget
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='stock-search')
+        # 진행 중인 외부 조회 (같은 질의가 동시에 들어오면 하나의 요청을 공유)
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+    
+    @property
+    def session(self):
+        """외부 검색용 requests 세션 (지연 생성, 로컬 검색만 쓰면 requests를 불러오지 않음)"""
+        if self._session is None:
+            with self._index_lock:
+                if self._session is None:
+                    import requests
+                    session = requests.Session()
+                    session.headers.update({
+                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+                    })
+                    self._session = session
+        return self._session
+    
+    @property
+    def stock_database(self) -> Dict[str, Dict]:
+        """내장 주요 종목 데이터베이스 (지연 로드)"""
+        if self._stock_database is None:
+            with self._index_lock:
+                if self._stock_database is None:
+                    self._stock_database = self._load_stock_database()
+        return self._stock_database
+    
+    @property
+    def search_index(self) -> SymbolIndex:
+        """종목명/코드 검색 인덱스 (내장 종목 + 종목 마스터 파일, 지연 로드)"""
+        if self._search_index is None:
+            builtin = self.stock_database
+            with self._index_lock:
+                if self._search_index is None:
+                    table = load_symbol_table(builtin)
+                    self._search_index = SymbolIndex(table=table)
+                    logging.info(f"종목 검색 인덱스 구축 완료: {len(table)}개 종목")
+        return self._search_index
     
     def _load_stock_database(self) -> Dict[str, Dict]:
         """한국 주요 상장기업 데이터베이스 로드"""
@@ -363,17 +441,15 @@ class StockSearcher:
         results = []
         
         # 로컬 데이터베이스에서 검색
-        local_results = self.search_in_local_database(stock_name)
+        with stage_timer('search', 'local'):
+            local_results = self.search_in_local_database(stock_name)
         results.extend(local_results)
         
         # 추가 검색이 필요한 경우 외부 API 사용
-        if len(results) < 5:
-            # 네이버 금융 검색
-            try:
-                naver_results = self.search_by_name_naver(stock_name)
-                results.extend(naver_results)
-            except Exception as e:
-                logging.error(f"네이버 검색 실패: {e}")
+        # (초성 질의는 외부 자동완성으로 찾을 수 없으므로 로컬 결과가 있으면 생략)
+        if len(results) < 5 and not (results and is_chosung_query(stock_name)):
+            with stage_timer('search', 'remote'):
+                results.extend(self._search_remote_providers(stock_name))
         
         # 중복 제거 (코드 기준)
         unique_results = {}
@@ -382,41 +458,98 @@ class StockSearcher:
             if code not in unique_results:
                 unique_results[code] = result
         
-        # 결과 정렬 (이름 일치도 기준)
+        # 결과 정렬 (이름 일치도 기준, 같은 점수면 먼저 들어온 로컬 결과 우선)
         final_results = list(unique_results.values())
         final_results.sort(key=lambda x: self._calculate_similarity(stock_name, x['name']), reverse=True)
         
         return final_results[:10]  # 상위 10개만 반환
     
+    def _search_remote_providers(self, stock_name: str) -> List[Dict]:
+        """활성화된 외부 제공자를 동시에 조회하고 제한 시간 안에 도착한 결과만 반환
+        
+        제한 시간을 넘긴 조회는 취소하지 않고 백그라운드에서 끝까지 실행되어
+        결과를 캐시에 채우므로, 같은 질의가 다시 들어오면 캐시에서 바로 응답한다.
+        """
+        results = []
+        futures = []
+        for provider in self.enabled_providers:
+            key = SearchCache.make_key(provider, stock_name)
+            cached = self.cache.get(key)
+            if cached is not None:
+                results.extend(cached)
+            else:
+                futures.append((provider, self._submit_remote_search(provider, key, stock_name)))
+        
+        if not futures:
+            return results
+        
+        done, _ = wait([future for _, future in futures], timeout=self.search_budget)
+        for provider, future in futures:
+            if future in done:
+                results.extend(future.result())
+            else:
+                PROVIDER_TIMEOUTS.inc(provider=provider)
+                logging.info(f"{provider} 검색이 {self.search_budget}초 안에 끝나지 않아 결과 없이 응답합니다")
+        
+        return results
+    
+    def _submit_remote_search(self, provider: str, key: str, stock_name: str):
+        """외부 조회 작업 제출 (같은 키의 진행 중인 작업이 있으면 재사용)"""
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._executor.submit(self._run_remote_search, provider, key, stock_name)
+                self._inflight[key] = future
+            return future
+    
+    def _run_remote_search(self, provider: str, key: str, stock_name: str) -> List[Dict]:
+        """외부 제공자 조회 후 결과를 캐시에 저장 (빈 결과/실패는 짧게 캐시)"""
+        start = time.perf_counter()
+        try:
+            results = self.remote_providers[provider](stock_name)
+            self.cache.set(key, results)
+            return results
+        except Exception as e:
+            logging.error(f"{provider} 검색 실패: {e}")
+            record_error(f'search_{provider}', e)
+            self.cache.set_negative(key)
+            return []
+        finally:
+            PROVIDER_SECONDS.observe(time.perf_counter() - start, provider=provider)
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+    
+    def collect_metrics(self):
+        """검색 캐시 통계를 지표로 옮김 (/metrics 출력 직전에 호출)"""
+        stats = self.cache.get_stats()
+        for event in ('hits', 'negative_hits', 'misses', 'evictions', 'expirations', 'disk_hits', 'size'):
+            SEARCH_CACHE_EVENTS.set(stats[event], event=event)
+        SEARCH_CACHE_HIT_RATIO.set(stats['hit_rate'])
+    
     def search_in_local_database(self, stock_name: str) -> List[Dict]:
-        """로컬 데이터베이스에서 종목 검색"""
+        """로컬 데이터베이스에서 종목 검색 (완전 일치, 부분 일치, 역포함)"""
         results = []
-        query = stock_name.lower()
         
-        for name, info in self.stock_database.items():
-            name_lower = name.lower()
-            
-            # 완전 일치 또는 부분 일치
-            if query == name_lower or query in name_lower or name_lower in query:
-                # suffix가 있으면 사용, 없으면 기본값 설정
-                suffix = info.get('suffix', '')
-                if not suffix:
-                    # 한국 주식이면 .KS 추가
-                    if info['market'] in ['KOSPI', 'KOSDAQ']:
-                        suffix = '.KS'
-                
-                # full_code 생성
-                full_code = f"{info['code']}{suffix}" if suffix else info['code']
-                
-                results.append({
-                    'name': name,
-                    'code': info['code'],
-                    'full_code': full_code,
-                    'market': info['market']
-                })
+        for name, info in self.search_index.search(stock_name):
+            results.append(self._make_local_result(name, info))
         
         return results
     
+    def _make_local_result(self, name: str, info: Dict) -> Dict:
+        """로컬 데이터베이스 항목을 검색 결과 형식으로 변환"""
+        # 종목 마스터 행의 suffix가 있으면 사용, 없으면 시장별 기본값 (KOSPI .KS, KOSDAQ .KQ)
+        suffix = info.get('suffix') or KRX_MARKETS.get(info['market'], ('', ''))[1]
+        
+        # full_code 생성
+        full_code = f"{info['code']}{suffix}" if suffix else info['code']
+        
+        return {
+            'name': name,
+            'code': info['code'],
+            'full_code': full_code,
+            'market': info['market']
+        }
+    
     def _calculate_similarity(self, query: str, target: str) -> float:
         """간단한 문자열 유사도 계산"""
         query = query.lower()
@@ -430,6 +563,10 @@ class StockSearcher:
         if query in target or target in query:
             return 0.8
         
+        # 초성 또는 입력 중인 음절 일치
+        if self.search_index.is_hangul_match(query, target):
+            return 0.6
+        
         # 첫 글자 일치
         if query[0] == target[0]:
             return 0.3
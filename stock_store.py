@@ -0,0 +1,247 @@
+import os
+import json
+import sqlite3
+import logging
+import tempfile
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 프로세스 내 잠금만 사용
+    fcntl = None
+
+
+class SharedFileLock:
+    """여러 프로세스(gunicorn 워커 등)가 같은 저장소를 읽고-고치고-쓰는 동안 잡는 잠금
+
+    잠금 파일에 flock 배타 잠금을 걸며, 같은 프로세스 안에서는 다시 들어갈 수 있다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def __enter__(self):
+        self._lock.acquire()
+        try:
+            if self._depth == 0:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._file = open(self.path, 'a')
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        except Exception:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._lock.release()
+            raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._depth -= 1
+        if self._depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+        self._lock.release()
+        return False
+
+
+class JsonStockStore:
+    """추적 종목 데이터를 JSON 파일 하나에 저장하는 저장소
+
+    임시 파일에 먼저 기록한 뒤 교체하므로 쓰는 도중 중단되어도
+    기존 파일이 깨지지 않는다. 교체할 때마다 파일이 바뀌므로 (mtime, 크기, inode)를
+    버전으로 써서 다른 프로세스의 저장을 감지한다.
+    """
+
+    def __init__(self, data_file: str = "data/stocks.json"):
+        self.data_file = data_file
+        self.lock = SharedFileLock(data_file + '.lock')
+
+    def version(self) -> Optional[tuple]:
+        """저장된 내용의 버전 (파일이 없으면 None)"""
+        try:
+            stat = os.stat(self.data_file)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def load(self) -> Dict:
+        """저장된 주식 데이터 로드"""
+        if not os.path.exists(self.data_file):
+            return {}
+        with open(self.data_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save(self, stocks: Dict):
+        """주식 데이터 저장"""
+        write_json_atomic(self.data_file, stocks)
+
+    def export_json(self, path: str, stocks: Dict):
+        """현재 데이터를 JSON 파일로 내보내기"""
+        write_json_atomic(path, stocks)
+
+
+class SqliteStockStore:
+    """추적 종목 데이터를 SQLite(WAL 모드)에 종목별 행으로 저장하는 저장소
+
+    저장 시 마지막으로 읽거나 쓴 내용과 비교하여 바뀐 종목만 갱신하고,
+    삭제된 종목만 지운다. 모든 변경은 하나의 트랜잭션으로 처리되며, 같은 트랜잭션에서
+    store_meta의 버전 번호를 올려 다른 프로세스가 행을 읽지 않고도 변경을 감지하게 한다.
+    """
+
+    def __init__(self, db_file: str = "data/stocks.db", import_from: Optional[str] = None):
+        self.db_file = db_file
+        self.lock = SharedFileLock(db_file + '.lock')
+        # 종목별로 마지막으로 동기화된 직렬화 결과 (변경 감지용)
+        self._snapshot = {}
+        self._init_schema()
+        if import_from:
+            self._import_json_if_empty(import_from)
+
+    def _connect(self) -> sqlite3.Connection:
+        """DB 연결 생성"""
+        conn = sqlite3.connect(self.db_file, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _init_schema(self):
+        """테이블 생성"""
+        conn = self._connect()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS stocks (
+                    code TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS store_meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            ''')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _import_json_if_empty(self, json_file: str):
+        """DB가 비어 있으면 기존 JSON 파일 내용을 가져옴"""
+        if not os.path.exists(json_file):
+            return
+        conn = self._connect()
+        try:
+            count = conn.execute('SELECT COUNT(*) FROM stocks').fetchone()[0]
+        finally:
+            conn.close()
+        if count == 0:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                stocks = json.load(f)
+            logging.info(f"Importing {len(stocks)} stocks from {json_file} into {self.db_file}")
+            self.save(stocks)
+
+    def version(self) -> Optional[int]:
+        """저장된 내용의 버전 번호 (한 번도 저장하지 않았으면 None)"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT value FROM store_meta WHERE key = 'version'").fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else None
+
+    def load(self) -> Dict:
+        """저장된 주식 데이터 로드"""
+        conn = self._connect()
+        try:
+            rows = conn.execute('SELECT code, data FROM stocks ORDER BY rowid').fetchall()
+        finally:
+            conn.close()
+
+        self._snapshot = {code: data for code, data in rows}
+        return {code: json.loads(data) for code, data in rows}
+
+    def save(self, stocks: Dict):
+        """바뀐 종목만 upsert하고 사라진 종목은 삭제"""
+        serialized = {
+            code: json.dumps(data, ensure_ascii=False, sort_keys=True)
+            for code, data in stocks.items()
+        }
+        changed = [
+            (code, data) for code, data in serialized.items()
+            if self._snapshot.get(code) != data
+        ]
+        removed = [code for code in self._snapshot if code not in serialized]
+
+        if not changed and not removed:
+            return
+
+        now = datetime.now().isoformat()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany('''
+                    INSERT INTO stocks (code, data, updated_at) VALUES (?, ?, ?)
+                    ON CONFLICT(code) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at
+                ''', [(code, data, now) for code, data in changed])
+                conn.executemany('DELETE FROM stocks WHERE code = ?', [(code,) for code in removed])
+                conn.execute('''
+                    INSERT INTO store_meta (key, value) VALUES ('version', 1)
+                    ON CONFLICT(key) DO UPDATE SET value = value + 1
+                ''')
+        finally:
+            conn.close()
+
+        self._snapshot = serialized
+
+    def export_json(self, path: str, stocks: Optional[Dict] = None):
+        """현재 데이터를 기존 stocks.json 형태로 내보내기"""
+        write_json_atomic(path, stocks if stocks is not None else self.load())
+
+
+def write_json_atomic(path: str, data):
+    """같은 디렉토리의 임시 파일에 쓴 뒤 원자적으로 교체"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def create_stock_store(data_file: str = "data/stocks.json"):
+    """STOCK_STORAGE 환경 변수에 따라 저장소 생성 (json 기본, sqlite 선택)"""
+    backend = os.environ.get('STOCK_STORAGE', 'json').lower()
+    if backend == 'sqlite':
+        db_file = os.path.splitext(data_file)[0] + '.db'
+        return SqliteStockStore(db_file, import_from=data_file)
+    return JsonStockStore(data_file)
+
+
+if __name__ == '__main__':
+    import sys
+
+    # 사용법: python stock_store.py [출력 경로]
+    # SQLite 저장소의 내용을 static_export.py와 워크플로우가 쓰는 JSON 형태로 내보낸다.
+    output = sys.argv[1] if len(sys.argv) > 1 else "data/stocks.json"
+    store = SqliteStockStore("data/stocks.db")
+    store.export_json(output)
+    print(f"{output} 파일로 내보냈습니다")
@@ -1,18 +1,130 @@
-import json
 import os
-import yfinance as yf
 import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
+from alert_engine import AlertEngine, create_alert_engine, decline_band
+from content_digest import record_digest
+from drawdown_engine import DEFAULT_WINDOWS, PriceMatrix, compute_drawdowns, drawdown_series, lttb_indices
+from market_calendar import RefreshScheduler, parse_timestamp, timestamp_now
+from market_data import MarketDataProvider, create_market_data_provider
+from metrics import REGISTRY, record_error, stage_timer
+from price_store import PriceHistoryStore
+from refresh_engine import RefreshEngine
+from rolling_high import RollingHigh
+from stock_store import create_stock_store
+
+# 종목별 조회 시간과 화면용 목록 캐시 적중 지표
+TICKER_FETCH_SECONDS = REGISTRY.histogram(
+    'stocktracker_ticker_fetch_seconds', '새로고침 시 종목별 조회 시간 (묶음 조회는 묶음 전체 시간)', ['status']
+)
+VIEW_CACHE = REGISTRY.counter(
+    'stocktracker_view_cache_total', '화면용 종목 목록 캐시 사용 결과', ['result']
+)
+REFRESH_WRITES = REGISTRY.counter(
+    'stocktracker_refresh_writes_total', '새로고침 후 종목 데이터 저장 여부 (바뀐 내용이 없으면 skipped)', ['result']
+)
+REFRESH_SKIPPED = REGISTRY.counter(
+    'stocktracker_refresh_skipped_total', '장 마감 후 이미 정산된 종목이라 건너뛴 조회 수', ['market']
+)
+STATE_RELOADS = REGISTRY.counter(
+    'stocktracker_state_reloads_total', '다른 프로세스가 바꾼 종목 데이터를 다시 읽은 횟수'
+)
 
 class StockTracker:
     """한국 주식 추적 및 고점 대비 하락률 계산 클래스"""
     
-    def __init__(self, data_file: str = "data/stocks.json"):
+    # 한 번의 다중 종목 다운로드에 묶을 기본 종목 수
+    DEFAULT_BATCH_SIZE = 50
+    
+    # 기본 하락률(recent_high, decline_rate)의 고점 조회 기간 (일)
+    RECENT_HIGH_DAYS = 90
+    
+    # 종목 추가 시 유효성 검증에 사용할 최근 기간 (일, 연휴 포함)
+    VALIDATION_DAYS = 10
+    
+    # 하락률 시계열 API의 기본/최대 반환 점 수
+    DEFAULT_SERIES_POINTS = 500
+    MAX_SERIES_POINTS = 5000
+    
+    def __init__(self, data_file: str = "data/stocks.json", batch_size: int = DEFAULT_BATCH_SIZE,
+                 price_store: Optional[PriceHistoryStore] = None,
+                 refresh_engine: Optional[RefreshEngine] = None, store=None,
+                 drawdown_windows: Tuple[int, ...] = DEFAULT_WINDOWS,
+                 provider: Optional[MarketDataProvider] = None,
+                 scheduler: Optional[RefreshScheduler] = None,
+                 alert_engine: Optional[AlertEngine] = None, shared_state: Optional[bool] = None):
         self.data_file = data_file
+        self.batch_size = batch_size
+        # 추가로 계산할 고점 대비 하락률 구간 (거래일 수)
+        self.drawdown_windows = tuple(sorted(drawdown_windows))
         self.ensure_data_directory()
+        # 종목 데이터 저장소 (JSON 파일 또는 SQLite)
+        self.store = store or create_stock_store(self.data_file)
+        # 일봉 히스토리 로컬 저장소 (증분 조회용)
+        self.price_store = price_store or PriceHistoryStore(
+            os.path.join(os.path.dirname(self.data_file), 'price_history.db')
+        )
+        # 시세 제공자 (yfinance, 또는 MARKET_DATA_MODE에 따라 기록/재생)
+        self.provider = provider or create_market_data_provider()
+        # 병렬 새로고침 엔진 (스레드 풀, 요청 속도 제한, 재시도)
+        self.refresh_engine = refresh_engine or RefreshEngine()
+        # 시장별 장 시간에 따른 새로고침 대상 선정
+        self.scheduler = scheduler or RefreshScheduler()
+        # 마지막 새로고침의 종목별 소요 시간 및 결과
+        self.last_refresh_report = []
+        # 마지막 새로고침의 조회/건너뜀 종목 수 및 누적 건너뜀 수
+        self.last_schedule_report = {'due': 0, 'skipped': {}}
+        self.avoided_fetches = 0
+        # 마지막 새로고침에서 값이 바뀐 종목 요약 및 저장 여부
+        self.last_change_summary = {'changed': [], 'settled': 0, 'written': False}
+        # 디스크에 저장된 종목별 last_updated (마감 정산 기록 여부 판단용)
+        self._persisted_updated = {}
+        # 종목 변경 알림을 받을 함수 목록 (event, payload)
+        self.listeners = []
+        # 하락률 구간 변경 알림 (JSONL 기록, 웹훅)
+        self.alert_engine = alert_engine or create_alert_engine(
+            os.path.join(os.path.dirname(self.data_file), 'alerts.jsonl')
+        )
+        # 마지막 새로고침에서 발생한 구간 변경 알림
+        self.last_alerts = []
+        # 백그라운드 새로고침과 요청 처리 스레드 사이의 데이터 변경 보호
+        self.lock = threading.RLock()
+        # 데이터 버전 (추가/삭제/갱신 시 증가) 및 화면용 목록 캐시
+        self.instance_id = uuid.uuid4().hex[:8]
+        self.data_version = 0
+        self._view_cache = None
+        self._view_version = None
+        self._view_expires_at = None
+        # 여러 프로세스(gunicorn 워커 등)가 같은 저장소를 함께 쓰는 모드 (STOCK_SHARED_STATE=0이면 끔)
+        if shared_state is None:
+            shared_state = os.environ.get('STOCK_SHARED_STATE', '1') != '0'
+        self.shared_state = shared_state
+        # 마지막으로 읽거나 쓴 저장소 버전 (다른 프로세스의 저장 감지용)
+        self._store_version = None
         self.stocks = self.load_stocks()
     
+    def add_listener(self, callback):
+        """종목 변경 알림 함수 등록
+        
+        callback(event, payload)는 다음 이벤트로 호출된다.
+        - 'stocks': 새로고침으로 값이나 상태가 바뀐 종목들 ({'stocks': [화면용 항목, ...]})
+        - 'added' / 'removed': 종목 추가/삭제 ({'code': 종목 코드})
+        """
+        self.listeners.append(callback)
+    
+    def _notify(self, event: str, payload: Dict):
+        """등록된 변경 알림 함수 호출 (알림 실패는 기록만 하고 무시)"""
+        for callback in list(self.listeners):
+            try:
+                callback(event, payload)
+            except Exception as e:
+                logging.error(f"Error notifying stock listener: {e}")
+                record_error('tracker', e)
+    
     def ensure_data_directory(self):
         """데이터 디렉토리 생성"""
         os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
@@ -20,68 +132,237 @@ class StockTracker:
     def load_stocks(self) -> Dict:
         """저장된 주식 데이터 로드"""
         try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return {}
+            version = self._read_store_version()
+            stocks = self.store.load()
         except Exception as e:
             logging.error(f"Error loading stocks data: {e}")
             return {}
+        self._store_version = version
+        self._remember_persisted(stocks)
+        return stocks
     
     def save_stocks(self):
         """주식 데이터 저장"""
         try:
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(self.stocks, f, ensure_ascii=False, indent=2)
+            with stage_timer('tracker', 'save_stocks'):
+                self.store.save(self.stocks)
+            self._remember_persisted(self.stocks)
+            self._store_version = self._read_store_version()
         except Exception as e:
             logging.error(f"Error saving stocks data: {e}")
+            record_error('tracker', e)
+    
+    def _read_store_version(self):
+        """저장소의 현재 버전 (버전을 제공하지 않는 저장소면 None)"""
+        version = getattr(self.store, 'version', None)
+        return version() if version else None
+    
+    def sync(self) -> bool:
+        """다른 프로세스가 저장소를 바꿨으면 다시 읽어 반영 (다시 읽었으면 True)
+        
+        버전 확인은 파일 stat 또는 한 행 조회라서 요청마다 호출해도 된다. 다시 읽은 뒤에는
+        바뀐 종목을 이 프로세스의 변경 알림 함수에도 전달한다.
+        """
+        if not self.shared_state:
+            return False
+        try:
+            if self._read_store_version() == self._store_version:
+                return False
+        except Exception as e:
+            logging.error(f"Error checking stocks data version: {e}")
+            record_error('tracker', e)
+            return False
+        
+        with self.lock:
+            previous = {code: record_digest(data) for code, data in self.stocks.items()}
+            try:
+                version = self._read_store_version()
+                if version == self._store_version:
+                    return False
+                stocks = self.store.load()
+            except Exception as e:
+                logging.error(f"Error reloading stocks data: {e}")
+                record_error('tracker', e)
+                return False
+            self.stocks = stocks
+            self._store_version = version
+            self._remember_persisted(stocks)
+            self._bump_version()
+            STATE_RELOADS.inc()
+            logging.info(f"Reloaded {len(stocks)} stocks changed by another process")
+            
+            changed = sorted(code for code in stocks if code in previous and record_digest(stocks[code]) != previous[code])
+            if changed:
+                self._notify('stocks', {'stocks': [self._format_stock(code, stocks[code]) for code in changed]})
+        
+        for code in previous:
+            if code not in stocks:
+                self._notify('removed', {'code': code})
+        for code in stocks:
+            if code not in previous:
+                self._notify('added', {'code': code})
+        return True
+    
+    @contextmanager
+    def _shared_write(self):
+        """읽고-고치고-저장하는 구간 (공유 모드에서는 저장소 잠금을 잡고 최신 내용을 다시 읽음)
+        
+        잠금 없이 저장하면 다른 워커가 그 사이에 저장한 추가/삭제를 덮어쓰게 된다.
+        """
+        with self.lock:
+            if not self.shared_state or not hasattr(self.store, 'lock'):
+                yield
+                return
+            with self.store.lock:
+                self.sync()
+                yield
+    
+    def watch_shared_state(self, interval: float = 5.0):
+        """interval초마다 다른 프로세스의 변경을 확인하는 루프 (백그라운드 스레드용)"""
+        while True:
+            time.sleep(interval)
+            self.sync()
+    
+    def _remember_persisted(self, stocks: Dict):
+        """저장된 상태의 종목별 last_updated 기록"""
+        self._persisted_updated = {code: data.get('last_updated') for code, data in stocks.items()}
+    
+    def export_json(self, path: Optional[str] = None):
+        """현재 데이터를 stocks.json 형태로 내보내기 (저장소 종류와 무관)"""
+        self.store.export_json(path or self.data_file, self.stocks)
     
     def add_stock(self, stock_code: str, stock_name: str) -> bool:
         """새로운 추적 종목 추가 (한국 및 해외 주식 지원)"""
-        try:
-            # 해외 주식인지 확인하여 적절한 접미사 추가
-            formatted_code = self._format_stock_code(stock_code)
+        result = self.add_stocks([{'code': stock_code, 'name': stock_name}])[0]
+        return result['status'] == 'added'
+    
+    def add_stocks(self, entries: List[Dict]) -> List[Dict]:
+        """여러 종목을 한 번에 추가 (entries: [{'code': 종목 코드, 'name': 종목명}, ...])
+        
+        새 종목 전체의 히스토리를 한 번의 다운로드로 받아 유효성 검증과 초기 하락률
+        계산에 함께 쓰고, 저장은 마지막에 한 번만 한다. 입력 순서대로 종목별 결과
+        {'code', 'name', 'formatted_code', 'status', 'message'}를 반환하며 status는
+        added, exists(이미 추적 중), duplicate(요청 안에서 중복), invalid(코드/종목명 누락),
+        not_found(최근 데이터 없음), error(조회 실패) 중 하나다.
+        """
+        self.sync()
+        results = []
+        pending = {}
+        for entry in entries:
+            code = str(entry.get('code') or '').strip()
+            name = str(entry.get('name') or '').strip()
+            result = {'code': code, 'name': name, 'formatted_code': None, 'status': 'added', 'message': None}
+            results.append(result)
             
-            # 이미 존재하는 종목인지 확인 (formatted_code 기준)
+            if not code or not name:
+                result.update(status='invalid', message='종목 코드와 종목명이 필요합니다.')
+                continue
+            
+            # 해외 주식인지 확인하여 적절한 접미사 추가
+            formatted_code = self._format_stock_code(code)
+            result['formatted_code'] = formatted_code
             if formatted_code in self.stocks:
                 logging.info(f"Stock {formatted_code} already exists")
-                return False
-            
-            # yfinance로 종목 유효성 검증
-            stock = yf.Ticker(formatted_code)
-            
-            # 히스토리 데이터로 유효성 검증 (더 안정적)
-            hist = stock.history(period="5d")
-            if hist.empty:
+                result.update(status='exists', message='이미 추적 중인 종목입니다.')
+            elif formatted_code in pending:
+                result.update(status='duplicate', message='요청에 같은 종목이 이미 있습니다.')
+            else:
+                pending[formatted_code] = result
+        
+        if not pending:
+            return results
+        
+        # 새 종목의 전체 조회 기간을 한 번에 받아 검증과 초기 데이터로 함께 사용
+        start_date, end_date = self._get_history_range()
+        try:
+            histories = self._download_histories(list(pending), start_date, end_date)
+        except Exception as e:
+            logging.error(f"Error fetching history for {len(pending)} new stocks: {e}")
+            record_error('tracker', e)
+            for result in pending.values():
+                result.update(status='error', message=str(e))
+            return results
+        
+        # 최근 거래 데이터가 있는 종목만 유효한 종목으로 인정
+        recent_start = (end_date - timedelta(days=self.VALIDATION_DAYS)).replace(hour=0, minute=0, second=0, microsecond=0)
+        added_codes = []
+        for formatted_code, result in pending.items():
+            hist = histories.get(formatted_code)
+            if hist is None or hist.empty or hist.index[-1] < recent_start:
                 logging.error(f"No history data found for {formatted_code}")
-                return False
+                result.update(status='not_found', message='최근 거래 데이터가 없는 종목입니다.')
+                continue
+            added_codes.append(formatted_code)
+        
+        if not added_codes:
+            return results
+        
+        with self._shared_write():
+            # 조회하는 동안 다른 워커가 먼저 추가한 종목은 제외
+            for formatted_code in [code for code in added_codes if code in self.stocks]:
+                pending[formatted_code].update(status='exists', message='이미 추적 중인 종목입니다.')
+                added_codes.remove(formatted_code)
+            if not added_codes:
+                return results
             
-            logging.info(f"Adding stock: {formatted_code} ({stock_name})")
+            with stage_timer('tracker', 'merge_history'):
+                for formatted_code in list(added_codes):
+                    try:
+                        self.price_store.merge_history(formatted_code, histories[formatted_code])
+                    except Exception as e:
+                        logging.error(f"Error saving history for {formatted_code}: {e}")
+                        record_error('tracker', e)
+                        pending[formatted_code].update(status='error', message='가격 데이터를 저장하지 못했습니다.')
+                        added_codes.remove(formatted_code)
+            if not added_codes:
+                return results
             
-            # 종목 추가
-            self.stocks[formatted_code] = {
-                'name': stock_name,
-                'code': formatted_code,
-                'original_code': stock_code,
-                'added_date': datetime.now().isoformat(),
-                'last_updated': None,
-                'current_price': None,
-                'recent_high': None,
-                'recent_high_date': None,
-                'decline_rate': None,
-                'error_message': None,
-                'market_type': self._get_market_type(formatted_code)
-            }
+            for formatted_code in added_codes:
+                result = pending[formatted_code]
+                logging.info(f"Adding stock: {formatted_code} ({result['name']})")
+                self.stocks[formatted_code] = self._new_stock_record(formatted_code, result['code'], result['name'])
             
-            # 초기 데이터 업데이트
-            self.update_stock_data(formatted_code)
-            self.save_stocks()
-            logging.info(f"Successfully added stock: {formatted_code}")
-            return True
+            # 초기 데이터: 받은 히스토리로 하락률을 한 번에 계산
+            try:
+                drawdowns = self._compute_drawdowns(added_codes)
+                for formatted_code in added_codes:
+                    result = drawdowns[formatted_code]
+                    if isinstance(result, Exception):
+                        logging.error(f"Error computing initial data for {formatted_code}: {result}")
+                        self._mark_stock_error(formatted_code, str(result))
+                        continue
+                    self._apply_decline_result(formatted_code, result)
+                    self.alert_engine.initialize(self.stocks[formatted_code])
+            except Exception as e:
+                logging.error(f"Error computing initial data for new stocks: {e}")
+                record_error('tracker', e)
+                for formatted_code in added_codes:
+                    self._mark_stock_error(formatted_code, str(e))
             
-        except Exception as e:
-            logging.error(f"Error adding stock {stock_code}: {e}")
-            return False
+            self._bump_version()
+            self.save_stocks()
+        
+        for formatted_code in added_codes:
+            self._notify('added', {'code': formatted_code})
+        logging.info(f"Successfully added {len(added_codes)} stocks")
+        return results
+    
+    def _new_stock_record(self, formatted_code: str, original_code: str, name: str) -> Dict:
+        """새 추적 종목 레코드 (데이터는 조회 전 상태)"""
+        return {
+            'name': name,
+            'code': formatted_code,
+            'original_code': original_code,
+            'added_date': timestamp_now(),
+            'last_updated': None,
+            'current_price': None,
+            'recent_high': None,
+            'recent_high_date': None,
+            'decline_rate': None,
+            'drawdowns': {},
+            'error_message': None,
+            'market_type': self._get_market_type(formatted_code)
+        }
     
     def _format_stock_code(self, code: str) -> str:
         """주식 코드를 yfinance 형식으로 포맷"""
@@ -108,7 +389,7 @@ class StockTracker:
     
     def _get_market_type(self, code: str) -> str:
         """주식 코드로부터 시장 유형 판단"""
-        if code.endswith('.KS'):
+        if code.endswith(('.KS', '.KQ')):
             return 'KRX'
         elif code.endswith('.T'):
             return 'TSE'
@@ -120,10 +401,14 @@ class StockTracker:
     def remove_stock(self, stock_code: str) -> bool:
         """추적 종목 제거"""
         try:
-            if stock_code in self.stocks:
-                del self.stocks[stock_code]
-                self.save_stocks()
-                return True
+            with self._shared_write():
+                if stock_code in self.stocks:
+                    del self.stocks[stock_code]
+                    self._bump_version()
+                    self.price_store.delete_history(stock_code)
+                    self.save_stocks()
+                    self._notify('removed', {'code': stock_code})
+                    return True
             return False
         except Exception as e:
             logging.error(f"Error removing stock {stock_code}: {e}")
@@ -132,138 +417,581 @@ class StockTracker:
     def calculate_recent_high_decline(self, stock_code: str) -> Tuple[Optional[float], Optional[float], Optional[str], Optional[float]]:
         """직전 고점 대비 하락률 계산"""
         try:
-            stock = yf.Ticker(stock_code)
-            
-            # 최근 3개월 데이터 가져오기
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=90)
-            
-            hist = stock.history(start=start_date, end=end_date)
-            
-            if hist.empty:
-                return None, None, None, None
-            
-            # 현재 가격 (최신 종가)
-            current_price = float(hist['Close'].iloc[-1])
-            
-            # 최근 고점 찾기 (최근 3개월 중 최고가)
-            recent_high = float(hist['High'].max())
-            recent_high_date_idx = hist['High'].idxmax()
-            try:
-                recent_high_date = recent_high_date_idx.strftime('%Y-%m-%d')
-            except:
-                recent_high_date = str(recent_high_date_idx)[:10]
-            
-            # 하락률 계산
-            decline_rate = ((recent_high - current_price) / recent_high) * 100
-            
-            return current_price, recent_high, recent_high_date, decline_rate
-            
+            return self._fetch_recent_high_decline(stock_code)
         except Exception as e:
             logging.error(f"Error calculating decline for {stock_code}: {e}")
             return None, None, None, None
     
+    def _fetch_recent_high_decline(self, stock_code: str) -> Tuple[Optional[float], Optional[float], Optional[str], Optional[float]]:
+        """직전 고점 대비 하락률 계산 (조회 실패 시 예외 발생)
+        
+        로컬 저장소의 마지막 봉 이후만 새로 받아 병합한 뒤,
+        저장된 최근 3개월 히스토리로 계산한다.
+        """
+        self._sync_price_history(stock_code)
+        hist = self.price_store.load_history(stock_code, self._get_recent_high_start())
+        return self._calculate_decline_from_history(hist)
+    
+    def _sync_price_history(self, stock_code: str):
+        """단일 종목의 신규 봉만 받아 로컬 저장소에 병합"""
+        start_date, end_date = self._get_history_range()
+        self._sync_price_histories([stock_code], start_date, end_date)
+    
+    def _get_history_range(self) -> Tuple[datetime, datetime]:
+        """로컬 저장소에 유지할 조회 기간 (기본 3개월 또는 가장 긴 하락률 구간)"""
+        end_date = datetime.now()
+        # 거래일 수를 달력 일수로 환산 (주말과 연휴 여유 포함)
+        window_days = int(max(self.drawdown_windows, default=0) * 1.5) + 10
+        start_date = end_date - timedelta(days=max(self.RECENT_HIGH_DAYS, window_days))
+        return start_date, end_date
+    
+    def _get_recent_high_start(self) -> datetime:
+        """기본 하락률의 고점 조회 시작일 (최근 3개월)"""
+        return datetime.now() - timedelta(days=self.RECENT_HIGH_DAYS)
+    
+    def _compute_drawdowns(self, stock_codes: List[str]) -> Dict:
+        """로컬 히스토리로 여러 종목의 구간별 하락률을 한 번에 계산
+        
+        기본 구간(최근 3개월) 고점은 행렬에서 다시 구하지 않고, 반영할 때 레코드의 고점 덱에
+        새 봉만 넣어 갱신하도록 기본 구간의 봉 배열(_bars)을 결과에 함께 담는다.
+        여러 종목을 함께 계산하다 실패하면(잘못된 봉 등) 종목별로 다시 계산해, 실패한
+        종목만 결과 값을 예외로 돌려준다. 한 종목만 계산할 때는 예외를 그대로 던진다.
+        """
+        import numpy as np
+        
+        start_date, _ = self._get_history_range()
+        window_start = np.datetime64(self._get_recent_high_start().strftime('%Y-%m-%d'), 'D')
+        try:
+            with stage_timer('tracker', 'load_history'):
+                series = self.price_store.load_price_series(stock_codes, start_date)
+            with stage_timer('tracker', 'compute_drawdowns'):
+                matrix = PriceMatrix.from_series(series)
+                results = compute_drawdowns(matrix, self.drawdown_windows, base=False)
+                for stock_code, result in results.items():
+                    dates, highs, _ = series[stock_code]
+                    position = int(np.searchsorted(dates, window_start))
+                    result['_bars'] = (dates[position:], highs[position:])
+        except Exception as e:
+            if len(stock_codes) <= 1:
+                raise
+            logging.warning(f"Batched drawdown computation failed, computing {len(stock_codes)} stocks one by one: {e}")
+            results = {}
+            for stock_code in stock_codes:
+                try:
+                    results.update(self._compute_drawdowns([stock_code]))
+                except Exception as error:
+                    results[stock_code] = error
+        return results
+    
+    def _calculate_decline_from_history(self, hist) -> Tuple[Optional[float], Optional[float], Optional[str], Optional[float]]:
+        """가격 히스토리(DataFrame)로부터 현재가, 고점, 고점일, 하락률 계산"""
+        if hist is None or hist.empty:
+            return None, None, None, None
+        
+        # 현재 가격 (최신 종가)
+        current_price = float(hist['Close'].iloc[-1])
+        
+        # 최근 고점 찾기 (최근 3개월 중 최고가)
+        recent_high = float(hist['High'].max())
+        recent_high_date_idx = hist['High'].idxmax()
+        try:
+            recent_high_date = recent_high_date_idx.strftime('%Y-%m-%d')
+        except:
+            recent_high_date = str(recent_high_date_idx)[:10]
+        
+        # 하락률 계산
+        decline_rate = ((recent_high - current_price) / recent_high) * 100
+        
+        return current_price, recent_high, recent_high_date, decline_rate
+    
     def update_stock_data(self, stock_code: str):
         """특정 종목의 데이터 업데이트"""
         try:
             if stock_code not in self.stocks:
                 return
             
-            current_price, recent_high, recent_high_date, decline_rate = self.calculate_recent_high_decline(stock_code)
-            
-            self.stocks[stock_code].update({
-                'last_updated': datetime.now().isoformat(),
-                'current_price': current_price,
-                'recent_high': recent_high,
-                'recent_high_date': recent_high_date,
-                'decline_rate': decline_rate,
-                'error_message': None
-            })
+            self._sync_price_history(stock_code)
+            result = self._compute_drawdowns([stock_code])[stock_code]
+            self._apply_decline_result(stock_code, result)
             
         except Exception as e:
             logging.error(f"Error updating stock data for {stock_code}: {e}")
-            self.stocks[stock_code]['error_message'] = str(e)
-            self.stocks[stock_code]['last_updated'] = datetime.now().isoformat()
+            record_error('tracker', e)
+            self._mark_stock_error(stock_code, str(e))
     
-    def refresh_all_stocks(self) -> int:
-        """모든 추적 종목 데이터 새로고침"""
-        updated_count = 0
-        for stock_code in self.stocks.keys():
-            try:
-                self.update_stock_data(stock_code)
-                updated_count += 1
-            except Exception as e:
-                logging.error(f"Error refreshing {stock_code}: {e}")
+    def _apply_decline_result(self, stock_code: str, result: Dict):
+        """계산된 하락률 결과(_compute_drawdowns 항목)를 종목 레코드에 반영
+        
+        기본 구간의 고점은 레코드에 저장된 고점 덱(high_window)에 마지막 반영일 이후의
+        봉만 넣어 분할 상환 O(1)로 갱신한다.
+        """
+        record = self.stocks[stock_code]
+        record.update({
+            'last_updated': timestamp_now(),
+            'current_price': result['current_price'],
+            'recent_high': result['recent_high'],
+            'recent_high_date': result['recent_high_date'],
+            'decline_rate': result['decline_rate'],
+            'drawdowns': result['drawdowns'],
+            'error_message': None
+        })
         
-        self.save_stocks()
-        return updated_count
+        bars = result.get('_bars')
+        if bars is not None and result['current_price'] is not None:
+            rolling = self._advance_rolling_high(record.get('high_window'), *bars)
+            record['high_window'] = rolling.to_dict()
+            high_date, high = rolling.high
+            if high:
+                record['recent_high'] = high
+                record['recent_high_date'] = high_date
+                record['decline_rate'] = ((high - result['current_price']) / high) * 100
+        self._bump_version()
     
-    def get_tracked_stocks(self) -> List[Dict]:
-        """추적 중인 모든 종목 정보 반환"""
-        stocks_list = []
+    def _advance_rolling_high(self, state: Optional[Dict], dates, highs) -> RollingHigh:
+        """저장된 고점 덱에 마지막 반영일 이후의 봉만 추가 (이어서 갱신할 수 없으면 기본 구간 봉으로 재생성)
         
-        for stock_code, data in self.stocks.items():
-            stock_info = {
-                'code': stock_code,
-                'name': data.get('name', ''),
-                'current_price': data.get('current_price'),
-                'recent_high': data.get('recent_high'),
-                'recent_high_date': data.get('recent_high_date'),
-                'decline_rate': data.get('decline_rate'),
-                'last_updated': data.get('last_updated'),
-                'error_message': data.get('error_message'),
-                'status': self._get_stock_status(data),
-                'market_type': data.get('market_type', 'KRX'),
-                'original_code': data.get('original_code', stock_code)
+        dates/highs는 기본 구간의 봉(날짜 오름차순)이다. 덱의 최고가가 히스토리와 다르면
+        수정주가가 반영된 것이므로 다시 만든다.
+        """
+        import numpy as np
+        
+        rolling = RollingHigh.from_dict(state, self.RECENT_HIGH_DAYS)
+        if rolling is not None and rolling.last_date and self._rolling_high_matches(rolling, dates, highs):
+            # 마지막 반영일의 봉도 장중 갱신되었을 수 있으므로 포함
+            position = int(np.searchsorted(dates, np.datetime64(rolling.last_date, 'D')))
+            new_bars = zip(np.datetime_as_string(dates[position:]).tolist(), highs[position:].tolist())
+            if all(rolling.push(date, high) for date, high in new_bars):
+                rolling.evict()
+                return rolling
+        
+        return RollingHigh.from_bars(self.RECENT_HIGH_DAYS, zip(np.datetime_as_string(dates).tolist(), highs.tolist()))
+    
+    def _rolling_high_matches(self, rolling: RollingHigh, dates, highs) -> bool:
+        """덱의 최고가가 현재 히스토리와 같은지 확인 (수정주가 변경 감지)"""
+        import numpy as np
+        
+        high_date, high = rolling.high
+        if high_date is None:
+            return True
+        position = int(np.searchsorted(dates, np.datetime64(high_date, 'D')))
+        if position >= len(dates) or str(dates[position]) != high_date:
+            # 덱의 최고가 봉이 이미 기본 구간 밖이면 곧 제거되므로 비교하지 않음
+            return position == 0
+        stored = highs[position]
+        return bool(stored == stored and abs(stored - high) <= abs(high) * self.price_store.ADJUSTMENT_TOLERANCE)
+    
+    def _mark_stock_error(self, stock_code: str, message: str):
+        """종목 레코드에 오류 메시지 기록"""
+        self.stocks[stock_code]['error_message'] = message
+        self.stocks[stock_code]['last_updated'] = timestamp_now()
+        self._bump_version()
+    
+    def _bump_version(self):
+        """데이터 버전 증가 (화면용 목록 캐시 무효화)"""
+        self.data_version += 1
+    
+    def get_data_etag(self) -> str:
+        """현재 데이터 버전을 나타내는 ETag 값 (프로세스마다 다른 접두어 포함)"""
+        return f"{self.instance_id}-{self.data_version}"
+    
+    def refresh_all_stocks(self, batch_size: Optional[int] = None, progress_callback=None,
+                           force: bool = False) -> int:
+        """모든 추적 종목 데이터 새로고침
+        
+        batch_size가 1보다 크면 여러 종목을 한 번의 다운로드로 묶어 조회하고,
+        1 이하이면 종목별로 조회한다. 조회는 새로고침 엔진에서 병렬로 실행되며,
+        결과는 모두 모은 뒤 한 번에 반영하고 저장한다.
+        장이 닫힌 뒤 마감 정산까지 마친 종목은 다음 장 시작까지 건너뛰며,
+        force가 True이면 장 시간과 무관하게 모든 종목을 조회한다.
+        progress_callback은 (완료 수, 전체 수, 실패 수)로 진행 상황을 받는다.
+        """
+        if batch_size is None:
+            batch_size = self.batch_size
+        
+        self.sync()
+        stock_codes = list(self.stocks.keys())
+        if not force:
+            stock_codes = self._plan_refresh(stock_codes)
+        if not stock_codes:
+            return 0
+        
+        if batch_size and batch_size > 1:
+            units = [stock_codes[i:i + batch_size] for i in range(0, len(stock_codes), batch_size)]
+            fetch_fn = self._fetch_batch
+        else:
+            units = [[stock_code] for stock_code in stock_codes]
+            fetch_fn = self._fetch_single
+        
+        with stage_timer('tracker', 'refresh_fetch'):
+            results, report = self.refresh_engine.run(units, fetch_fn, progress_callback)
+        
+        # 결과 반영은 호출 스레드에서만 수행 (조회 중 다른 워커가 저장한 내용 위에 반영)
+        with self._shared_write():
+            previous = {
+                code: (record_digest(self.stocks[code]), self.stocks[code].get('current_price'),
+                       self.stocks[code].get('decline_rate'))
+                for code in results if code in self.stocks
             }
+            previous_status = {code: self._get_stock_status(self.stocks[code]) for code in previous}
+            with stage_timer('tracker', 'apply_results'):
+                for stock_code, result in results.items():
+                    if stock_code not in self.stocks:
+                        continue
+                    if not isinstance(result, Exception):
+                        try:
+                            self._apply_decline_result(stock_code, result)
+                            continue
+                        except Exception as e:
+                            result = e
+                    logging.error(f"Error refreshing {stock_code}: {result}")
+                    record_error('tracker', result)
+                    self._mark_stock_error(stock_code, str(result))
             
-            # 시장 타입에 따른 가격 포맷팅
-            market_type = stock_info['market_type']
-            currency_symbol = self._get_currency_symbol(market_type)
-            
-            # 가격 포맷팅
-            if stock_info['current_price']:
-                if market_type == 'KRX':
-                    stock_info['current_price_formatted'] = f"{stock_info['current_price']:,.0f}원"
-                else:
-                    stock_info['current_price_formatted'] = f"{currency_symbol}{stock_info['current_price']:,.2f}"
-            
-            if stock_info['recent_high']:
-                if market_type == 'KRX':
-                    stock_info['recent_high_formatted'] = f"{stock_info['recent_high']:,.0f}원"
-                else:
-                    stock_info['recent_high_formatted'] = f"{currency_symbol}{stock_info['recent_high']:,.2f}"
+            for entry in report:
+                TICKER_FETCH_SECONDS.observe(entry['latency'], status=entry['status'])
+            self.last_refresh_report = report
+            self._log_refresh_report(report)
             
-            # 하락률 포맷팅
-            if stock_info['decline_rate'] is not None:
-                stock_info['decline_rate_formatted'] = f"{stock_info['decline_rate']:.2f}%"
-                
-                # 하락률에 따른 상태 분류
-                if stock_info['decline_rate'] <= 10:
-                    stock_info['decline_status'] = 'low'
-                elif stock_info['decline_rate'] <= 30:
-                    stock_info['decline_status'] = 'medium'
-                else:
-                    stock_info['decline_status'] = 'high'
-            
-            # 업데이트 시간 포맷팅
-            if stock_info['last_updated']:
-                try:
-                    updated_dt = datetime.fromisoformat(stock_info['last_updated'])
-                    stock_info['last_updated_formatted'] = updated_dt.strftime('%Y-%m-%d %H:%M')
-                except:
-                    stock_info['last_updated_formatted'] = stock_info['last_updated']
+            # 의미 있는 값이 바뀌었거나 마감 정산을 처음 기록할 때만 저장
+            changed = self._summarize_changes(previous)
+            # 구간 변경 판단은 값이 바뀐 종목만 대상으로 함
+            alerts = self.alert_engine.evaluate({entry['code']: self.stocks[entry['code']] for entry in changed})
+            self.last_alerts = alerts
+            settled = self._settlement_pending(previous.keys())
+            written = bool(changed or settled)
+            if written:
+                self.save_stocks()
+            REFRESH_WRITES.inc(result='written' if written else 'skipped')
+            self.last_change_summary = {'changed': changed, 'settled': len(settled), 'written': written}
+            self._log_change_summary(self.last_change_summary)
             
-            # 시장 표시명 추가
-            stock_info['market_display'] = self._get_market_display_name(market_type)
+            # 값이나 상태가 바뀐 종목만 화면용 항목으로 알림
+            delta_codes = {entry['code'] for entry in changed}
+            delta_codes.update(
+                code for code, status in previous_status.items()
+                if code in self.stocks and self._get_stock_status(self.stocks[code]) != status
+            )
+            if delta_codes:
+                self._notify('stocks', {
+                    'stocks': [self._format_stock(code, self.stocks[code]) for code in sorted(delta_codes)]
+                })
+        
+        # 외부 전송은 잠금 밖에서 한 번에 처리
+        if alerts:
+            logging.info(f"{len(alerts)} decline band alerts: " + ', '.join(
+                f"{alert['code']} {alert['previous_status']} -> {alert['status']}" for alert in alerts[:10]
+            ))
+            self.alert_engine.dispatch(alerts)
+        return len(results)
+    
+    def _summarize_changes(self, previous: Dict[str, Tuple]) -> List[Dict]:
+        """새로고침 전후로 의미 있는 필드가 바뀐 종목 목록"""
+        changed = []
+        for code, (digest, previous_price, previous_rate) in previous.items():
+            data = self.stocks.get(code)
+            if data is None or record_digest(data) == digest:
+                continue
+            changed.append({
+                'code': code,
+                'name': data.get('name'),
+                'previous_price': previous_price,
+                'current_price': data.get('current_price'),
+                'previous_decline_rate': previous_rate,
+                'decline_rate': data.get('decline_rate'),
+                'error_message': data.get('error_message')
+            })
+        return changed
+    
+    def _settlement_pending(self, stock_codes) -> List[str]:
+        """값은 그대로지만 마감 정산 조회를 아직 디스크에 기록하지 않은 종목
+        
+        저장된 last_updated로는 다음 실행에서 다시 조회 대상이 되므로,
+        한 번은 저장해야 장이 닫힌 동안 조회를 건너뛸 수 있다.
+        """
+        pending = []
+        for code in stock_codes:
+            data = self.stocks.get(code)
+            if data is None:
+                continue
+            market_type = data.get('market_type', 'OTHER')
+            persisted = self._persisted_updated.get(code)
+            try:
+                persisted_time = parse_timestamp(persisted) if persisted else None
+            except (TypeError, ValueError):
+                persisted_time = None
+            if (self.scheduler.is_due(market_type, persisted_time)
+                    and not self.scheduler.is_due(market_type, self.scheduler.last_success(data))):
+                pending.append(code)
+        return pending
+    
+    def _log_change_summary(self, summary: Dict):
+        """값이 바뀐 종목 요약 로그"""
+        changed = summary['changed']
+        if not summary['written']:
+            logging.info("No stock data changed; skipped saving")
+            return
+        moved = ', '.join(
+            f"{entry['code']} {entry['previous_price']} -> {entry['current_price']}" for entry in changed[:10]
+        )
+        more = f" and {len(changed) - 10} more" if len(changed) > 10 else ''
+        logging.info(
+            f"{len(changed)} stocks changed, {summary['settled']} settled"
+            + (f": {moved}{more}" if changed else '')
+        )
+    
+    def _plan_refresh(self, stock_codes: List[str]) -> List[str]:
+        """장 시간 기준으로 이번에 조회할 종목 선정 및 건너뛴 수 기록"""
+        with self.lock:
+            records = {code: self.stocks[code] for code in stock_codes if code in self.stocks}
+        due, skipped = self.scheduler.plan(records)
+        
+        for market_type, count in skipped.items():
+            REFRESH_SKIPPED.inc(count, market=market_type)
+        skipped_total = sum(skipped.values())
+        self.avoided_fetches += skipped_total
+        self.last_schedule_report = {'due': len(due), 'skipped': skipped}
+        if skipped_total:
+            logging.info(
+                f"Skipped {skipped_total} stocks in closed markets "
+                f"({', '.join(f'{market}: {count}' for market, count in sorted(skipped.items()))}), "
+                f"refreshing {len(due)}"
+            )
+        return due
+    
+    def _fetch_single(self, stock_codes: List[str]) -> Dict:
+        """단일 종목 조회 (새로고침 엔진 작업 단위)"""
+        stock_code = stock_codes[0]
+        self._sync_price_history(stock_code)
+        return self._compute_drawdowns(stock_codes)
+    
+    def _fetch_batch(self, stock_codes: List[str]) -> Dict:
+        """묶음 종목 조회 (새로고침 엔진 작업 단위)
+        
+        묶음 다운로드가 실패하면 예외를 던져 엔진이 재시도하게 하고,
+        하락률은 묶음 전체를 하나의 가격 행렬로 만들어 한 번에 계산한다.
+        종목 하나의 병합이나 계산 실패는 그 종목의 결과 값(예외)으로만 돌려준다.
+        """
+        start_date, end_date = self._get_history_range()
+        failures = self._sync_price_histories(stock_codes, start_date, end_date)
+        codes = [stock_code for stock_code in stock_codes if stock_code not in failures]
+        results = self._compute_drawdowns(codes) if codes else {}
+        results.update(failures)
+        return results
+    
+    def _log_refresh_report(self, report: List[Dict]):
+        """새로고침 결과 요약 로그"""
+        if not report:
+            return
+        failed = [entry for entry in report if entry['status'] != 'success']
+        slowest = max(report, key=lambda entry: entry['latency'])
+        logging.info(
+            f"Refreshed {len(report)} stocks: {len(report) - len(failed)} succeeded, "
+            f"{len(failed)} failed, slowest {slowest['code']} ({slowest['latency']:.2f}s)"
+        )
+    
+    def _sync_price_histories(self, stock_codes: List[str], start_date: datetime, end_date: datetime) -> Dict:
+        """묶음 종목의 신규 봉만 받아 로컬 저장소에 병합 (병합에 실패한 종목의 {종목 코드: 예외} 반환)
+        
+        요청 시작일이 같은 종목끼리 묶어 다운로드하므로, 평상시에는
+        묶음당 한 번의 요청으로 마지막 저장일 이후의 봉만 받는다.
+        """
+        groups = {}
+        for stock_code in stock_codes:
+            fetch_start = self.price_store.get_fetch_start(stock_code, start_date)
+            groups.setdefault(fetch_start, []).append(stock_code)
+        
+        failures = {}
+        stale_codes = []
+        for fetch_start, codes in groups.items():
+            histories = self._download_histories(codes, fetch_start, end_date)
+            with stage_timer('tracker', 'merge_history'):
+                for stock_code in codes:
+                    try:
+                        if not self.price_store.merge_history(stock_code, histories.get(stock_code)):
+                            stale_codes.append(stock_code)
+                    except Exception as e:
+                        failures[stock_code] = e
+        
+        # 수정주가가 바뀐 종목은 전체 기간을 다시 받음
+        if stale_codes:
+            histories = self._download_histories(stale_codes, start_date, end_date)
+            with stage_timer('tracker', 'merge_history'):
+                for stock_code in stale_codes:
+                    try:
+                        self.price_store.merge_history(stock_code, histories.get(stock_code))
+                    except Exception as e:
+                        failures[stock_code] = e
+        return failures
+    
+    def _download_histories(self, stock_codes: List[str], start_date: datetime, end_date: datetime) -> Dict:
+        """시세 제공자에서 여러 종목의 히스토리를 한 번에 받아 종목별 DataFrame으로 반환"""
+        with stage_timer('tracker', 'download'):
+            return self.provider.get_history(stock_codes, start_date, end_date)
+    
+    def get_tracked_stocks(self) -> List[Dict]:
+        """추적 중인 모든 종목 정보 반환
+        
+        포맷팅과 정렬을 마친 목록을 데이터 버전별로 캐시하여, 데이터가 바뀌었거나
+        '업데이트필요' 상태로 넘어갈 시점이 지났을 때만 다시 만든다.
+        반환된 항목은 캐시와 공유되므로 수정하지 않아야 한다.
+        """
+        self.sync()
+        with self.lock:
+            now = datetime.now()
+            if self._view_cache is not None and self._view_version == self.data_version:
+                if self._view_expires_at is None or now < self._view_expires_at:
+                    VIEW_CACHE.inc(result='hit')
+                    return list(self._view_cache)
+                # 시간 경과로 상태가 바뀌므로 데이터 버전도 올림
+                self._bump_version()
             
-            stocks_list.append(stock_info)
+            VIEW_CACHE.inc(result='miss')
+            with stage_timer('tracker', 'view_build'):
+                self._view_cache = self._build_tracked_stocks()
+            self._view_version = self.data_version
+            self._view_expires_at = self._get_view_expiry()
+            return list(self._view_cache)
+    
+    def _get_view_expiry(self) -> Optional[datetime]:
+        """가장 먼저 '업데이트필요'(24시간 경과) 상태가 되는 시각
+        
+        24시간이 지났지만 장이 닫혀 정산을 마친 종목은 다음 장 시작 시각에 바뀐다.
+        """
+        now = datetime.now()
+        expiry = None
+        for data in self.stocks.values():
+            last_updated = data.get('last_updated')
+            if not last_updated:
+                continue
+            try:
+                outdated_at = parse_timestamp(last_updated) + timedelta(hours=24)
+            except (TypeError, ValueError):
+                continue
+            if outdated_at <= now:
+                outdated_at = self.scheduler.next_due_at(data.get('market_type', 'OTHER'), now)
+            if outdated_at and outdated_at > now and (expiry is None or outdated_at < expiry):
+                expiry = outdated_at
+        return expiry
+    
+    def _build_tracked_stocks(self) -> List[Dict]:
+        """화면 표시용 종목 목록 생성 (포맷팅 및 하락률 순 정렬)"""
+        stocks_list = []
+        
+        for stock_code, data in list(self.stocks.items()):
+            stocks_list.append(self._format_stock(stock_code, data))
         
         # 하락률 순으로 정렬 (높은 하락률부터)
-        stocks_list.sort(key=lambda x: x.get('decline_rate', 0), reverse=True)
+        stocks_list.sort(key=lambda x: x.get('decline_rate') or 0, reverse=True)
         
         return stocks_list
     
+    def _format_stock(self, stock_code: str, data: Dict) -> Dict:
+        """종목 레코드 하나를 화면 표시용 항목으로 포맷팅"""
+        stock_info = {
+            'code': stock_code,
+            'name': data.get('name', ''),
+            'current_price': data.get('current_price'),
+            'recent_high': data.get('recent_high'),
+            'recent_high_date': data.get('recent_high_date'),
+            'decline_rate': data.get('decline_rate'),
+            'drawdowns': self._format_drawdowns(data.get('drawdowns') or {}),
+            'last_updated': data.get('last_updated'),
+            'error_message': data.get('error_message'),
+            'status': self._get_stock_status(data),
+            'market_type': data.get('market_type', 'KRX'),
+            'original_code': data.get('original_code', stock_code)
+        }
+        
+        # 시장 타입에 따른 가격 포맷팅
+        market_type = stock_info['market_type']
+        currency_symbol = self._get_currency_symbol(market_type)
+        
+        # 가격 포맷팅
+        if stock_info['current_price']:
+            if market_type == 'KRX':
+                stock_info['current_price_formatted'] = f"{stock_info['current_price']:,.0f}원"
+            else:
+                stock_info['current_price_formatted'] = f"{currency_symbol}{stock_info['current_price']:,.2f}"
+        
+        if stock_info['recent_high']:
+            if market_type == 'KRX':
+                stock_info['recent_high_formatted'] = f"{stock_info['recent_high']:,.0f}원"
+            else:
+                stock_info['recent_high_formatted'] = f"{currency_symbol}{stock_info['recent_high']:,.2f}"
+        
+        # 하락률 포맷팅
+        if stock_info['decline_rate'] is not None:
+            stock_info['decline_rate_formatted'] = f"{stock_info['decline_rate']:.2f}%"
+            
+            # 하락률에 따른 상태 분류 (주의권/경고권/발동권)
+            stock_info['decline_status'] = decline_band(stock_info['decline_rate'])
+        
+        # 업데이트 시간 포맷팅
+        if stock_info['last_updated']:
+            try:
+                updated_dt = parse_timestamp(stock_info['last_updated'])
+                stock_info['last_updated_formatted'] = updated_dt.strftime('%Y-%m-%d %H:%M')
+            except:
+                stock_info['last_updated_formatted'] = stock_info['last_updated']
+        
+        # 시장 표시명 추가
+        stock_info['market_display'] = self._get_market_display_name(market_type)
+        
+        return stock_info
+    
+    def _format_drawdowns(self, drawdowns: Dict) -> Dict:
+        """구간별 하락률에 표시용 문자열 추가 (설정된 구간 순서)"""
+        formatted = {}
+        for window in self.drawdown_windows:
+            entry = drawdowns.get(str(window))
+            if not entry:
+                continue
+            entry = dict(entry)
+            if entry.get('decline_rate') is not None:
+                entry['decline_rate_formatted'] = f"{entry['decline_rate']:.2f}%"
+            formatted[str(window)] = entry
+        return formatted
+    
+    def get_drawdown_series(self, stock_code: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                            window_days: Optional[int] = None, max_points: Optional[int] = None) -> Optional[Dict]:
+        """로컬 히스토리로 고점 대비 하락률 시계열 생성 (추적 중이 아닌 종목은 None)
+        
+        각 날짜의 고점은 직전 window_days일(기본 90일)의 최고가이며,
+        점 수가 max_points를 넘으면 LTTB로 하락률 모양을 유지하며 줄인다.
+        """
+        import numpy as np
+        
+        if stock_code not in self.stocks:
+            return None
+        
+        window_days = window_days or self.RECENT_HIGH_DAYS
+        max_points = min(max_points or self.DEFAULT_SERIES_POINTS, self.MAX_SERIES_POINTS)
+        
+        # 시작일의 고점도 정확하도록 고점 조회 기간만큼 앞서서 읽음
+        load_start = start - timedelta(days=window_days) if start else None
+        dates, highs, closes = self.price_store.load_price_series([stock_code], load_start, end)[stock_code]
+        series = drawdown_series(dates, highs, closes, window_days)
+        
+        if start is not None:
+            visible = series['dates'] >= np.datetime64(start.strftime('%Y-%m-%d'), 'D')
+            series = {key: values[visible] for key, values in series.items()}
+        
+        total_points = len(series['dates'])
+        selected = lttb_indices(series['drawdown'], max_points)
+        return {
+            'code': stock_code,
+            'window_days': window_days,
+            'total_points': total_points,
+            'dates': np.datetime_as_string(series['dates'][selected]).tolist(),
+            'close': self._to_json_floats(series['close'][selected]),
+            'rolling_high': self._to_json_floats(series['rolling_high'][selected]),
+            'drawdown': self._to_json_floats(series['drawdown'][selected], 4)
+        }
+    
+    def _to_json_floats(self, values, digits: int = 6) -> List[Optional[float]]:
+        """NaN을 None으로 바꾼 반올림 float 목록 (JSON 응답용)"""
+        return [None if value != value else round(value, digits) for value in values.tolist()]
+    
     def _get_currency_symbol(self, market_type: str) -> str:
         """시장 타입에 따른 통화 기호 반환"""
         if market_type == 'KRX':
@@ -295,13 +1023,14 @@ class StockTracker:
         if not data.get('current_price') or not data.get('recent_high'):
             return 'no_data'
         
-        # 업데이트가 오래된 경우 (24시간 이상)
+        # 업데이트가 오래된 경우 (24시간 이상, 장이 닫혀 정산을 마친 종목 제외)
         last_updated = data.get('last_updated')
         if last_updated:
             try:
                 from datetime import datetime, timedelta
-                updated_time = datetime.fromisoformat(last_updated)
-                if datetime.now() - updated_time > timedelta(hours=24):
+                updated_time = parse_timestamp(last_updated)
+                if (datetime.now() - updated_time > timedelta(hours=24)
+                        and self.scheduler.is_due(data.get('market_type', 'OTHER'), updated_time)):
                     return 'outdated'
             except:
                 pass
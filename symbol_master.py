@@ -0,0 +1,256 @@
+import io
+import os
+import csv
+import sys
+import logging
+import argparse
+from array import array
+from html.parser import HTMLParser
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# 전체 상장 종목 마스터 파일 기본 경로 (없으면 내장 종목만 사용)
+DEFAULT_SYMBOL_MASTER_FILE = "data/symbol_master.csv"
+
+# 한국거래소 KIND 상장법인 목록 다운로드 (시장별 HTML 표, EUC-KR)
+KRX_LISTING_URL = "https://kind.krx.co.kr/corpgeneral/corpList.do"
+# 시장 -> (KIND marketType 값, yfinance 접미사)
+KRX_MARKETS = {
+    'KOSPI': ('stockMkt', '.KS'),
+    'KOSDAQ': ('kosdaqMkt', '.KQ')
+}
+# 시장별 최소 종목 수 (이보다 적으면 다운로드 형식이 바뀐 것으로 보고 파일을 바꾸지 않음)
+MIN_LISTING_ROWS = 300
+
+
+class CompactSymbolTable:
+    """대량의 종목 목록을 적은 메모리로 보관하는 열 기반 테이블
+
+    종목명과 코드는 각각 하나의 문자열에 이어 붙이고 시작 위치만 array로 저장하며,
+    시장/접미사는 중복이 많으므로 작은 목록의 번호로 저장한다.
+    항목당 dict를 만들지 않으므로 수만 건도 수 MB 안에 들어간다.
+    """
+
+    def __init__(self):
+        self._names = []
+        self._codes = []
+        self.name_offsets = array('I', [0])
+        self.code_offsets = array('I', [0])
+        self.market_ids = array('B')
+        self.suffix_ids = array('B')
+        self.markets = []
+        self.suffixes = ['']
+        self._name_buffer = ''
+        self._code_buffer = ''
+        self._frozen = False
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[str, str, str, str]]) -> 'CompactSymbolTable':
+        """(종목명, 코드, 시장, 접미사) 행으로 테이블 생성"""
+        table = cls()
+        seen = set()
+        for name, code, market, suffix in rows:
+            if not name or not code or name in seen:
+                continue
+            seen.add(name)
+            table.append(name, code, market, suffix)
+        table.freeze()
+        return table
+
+    def append(self, name: str, code: str, market: str, suffix: str = ''):
+        """행 추가 (freeze 전까지만 가능)"""
+        if self._frozen:
+            raise RuntimeError("CompactSymbolTable is frozen")
+        self._names.append(name)
+        self.name_offsets.append(self.name_offsets[-1] + len(name))
+        self._codes.append(code)
+        self.code_offsets.append(self.code_offsets[-1] + len(code))
+        self.market_ids.append(self._intern(self.markets, market))
+        self.suffix_ids.append(self._intern(self.suffixes, suffix or ''))
+
+    def freeze(self):
+        """임시 목록을 하나의 문자열 버퍼로 합침"""
+        self._name_buffer = ''.join(self._names)
+        self._code_buffer = ''.join(self._codes)
+        self._names = []
+        self._codes = []
+        self._frozen = True
+
+    def name(self, index: int) -> str:
+        return self._name_buffer[self.name_offsets[index]:self.name_offsets[index + 1]]
+
+    def code(self, index: int) -> str:
+        return self._code_buffer[self.code_offsets[index]:self.code_offsets[index + 1]]
+
+    def __len__(self) -> int:
+        return len(self.market_ids)
+
+    def __getitem__(self, index: int) -> Tuple[str, Dict]:
+        """(종목명, 종목 정보) 반환 - 기존 stock_database 항목과 같은 형태"""
+        info = {'code': self.code(index), 'market': self.markets[self.market_ids[index]]}
+        suffix = self.suffixes[self.suffix_ids[index]]
+        if suffix:
+            info['suffix'] = suffix
+        return self.name(index), info
+
+    def __iter__(self) -> Iterator[Tuple[str, Dict]]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def _intern(self, values: list, value: str) -> int:
+        """작은 목록에 값을 등록하고 번호 반환"""
+        try:
+            return values.index(value)
+        except ValueError:
+            if len(values) >= 255:
+                raise ValueError("Too many distinct values for compact column")
+            values.append(value)
+            return len(values) - 1
+
+
+def read_symbol_master(path: str) -> Iterator[Tuple[str, str, str, str]]:
+    """종목 마스터 CSV 읽기
+
+    헤더: name,code,market[,suffix]
+    예:   삼성전자,005930,KOSPI,.KS
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            yield (
+                (row.get('name') or '').strip(),
+                (row.get('code') or '').strip(),
+                (row.get('market') or '').strip(),
+                (row.get('suffix') or '').strip()
+            )
+
+
+def symbol_master_path(path: Optional[str] = None) -> str:
+    """사용할 종목 마스터 파일 경로 (지정하지 않으면 SYMBOL_MASTER_FILE 또는 기본 경로)"""
+    if path is None:
+        path = os.environ.get('SYMBOL_MASTER_FILE', DEFAULT_SYMBOL_MASTER_FILE)
+    return path
+
+
+def load_symbol_table(builtin: Dict[str, Dict], path: Optional[str] = None) -> CompactSymbolTable:
+    """내장 종목과 종목 마스터 파일을 합쳐 테이블 생성 (내장 종목 우선)"""
+    path = symbol_master_path(path)
+
+    def rows():
+        for name, info in builtin.items():
+            yield name, info['code'], info['market'], info.get('suffix', '')
+        if path and os.path.exists(path):
+            try:
+                yield from read_symbol_master(path)
+            except Exception as e:
+                logging.error(f"종목 마스터 파일 로드 실패 ({path}): {e}")
+
+    return CompactSymbolTable.from_rows(rows())
+
+
+class _TableParser(HTMLParser):
+    """HTML 표의 셀 텍스트를 행 단위로 모으는 파서"""
+
+    def __init__(self):
+        super().__init__()
+        self.rows = []
+        self._row = None
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'tr':
+            self._row = []
+        elif tag in ('td', 'th') and self._row is not None:
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if tag in ('td', 'th') and self._cell is not None:
+            self._row.append(''.join(self._cell).strip())
+            self._cell = None
+        elif tag == 'tr' and self._row is not None:
+            self.rows.append(self._row)
+            self._row = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+
+def parse_krx_listing(html: str) -> List[Tuple[str, str]]:
+    """KIND 상장법인 목록 HTML에서 (회사명, 종목코드) 목록 추출 (헤더 이름으로 열을 찾음)"""
+    parser = _TableParser()
+    parser.feed(html)
+    if not parser.rows:
+        return []
+
+    header = parser.rows[0]
+    if '회사명' not in header or '종목코드' not in header:
+        raise ValueError(f"Unexpected KRX listing header: {header}")
+    name_column = header.index('회사명')
+    code_column = header.index('종목코드')
+
+    listing = []
+    for row in parser.rows[1:]:
+        if len(row) <= max(name_column, code_column):
+            continue
+        name, code = row[name_column], row[code_column]
+        if not name or not code:
+            continue
+        # 엑셀 숫자로 저장된 경우 앞자리 0이 빠질 수 있음 (영문이 섞인 신규 코드는 그대로)
+        listing.append((name, code.zfill(6) if code.isdigit() else code))
+    return listing
+
+
+def download_krx_listing(markets: Iterable[str] = tuple(KRX_MARKETS), timeout: float = 30.0) -> List[Tuple[str, str, str, str]]:
+    """KIND에서 시장별 전체 상장 종목을 받아 (종목명, 코드, 시장, 접미사) 행 목록 생성"""
+    import requests
+
+    rows = []
+    for market in markets:
+        market_type, suffix = KRX_MARKETS[market]
+        response = requests.get(
+            KRX_LISTING_URL,
+            params={'method': 'download', 'searchType': '13', 'marketType': market_type},
+            headers={'User-Agent': 'Mozilla/5.0'},
+            timeout=timeout
+        )
+        response.raise_for_status()
+        listing = parse_krx_listing(response.content.decode('cp949', errors='replace'))
+        if len(listing) < MIN_LISTING_ROWS:
+            raise ValueError(f"{market} listing has only {len(listing)} rows")
+        logging.info(f"{market} 상장 종목 {len(listing)}개")
+        rows.extend((name, code, market, suffix) for name, code in listing)
+    return rows
+
+
+def format_symbol_master(rows: Iterable[Tuple[str, str, str, str]]) -> bytes:
+    """종목 마스터 CSV 내용 (헤더 name,code,market,suffix, 코드 순 정렬)"""
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator='\n')
+    writer.writerow(['name', 'code', 'market', 'suffix'])
+    for row in sorted(rows, key=lambda row: (row[2], row[1])):
+        writer.writerow(row)
+    return output.getvalue().encode('utf-8')
+
+
+def main() -> int:
+    from content_digest import write_if_changed
+
+    parser = argparse.ArgumentParser(description='한국거래소 전체 상장 종목 마스터 생성')
+    parser.add_argument('--markets', default=','.join(KRX_MARKETS), help='대상 시장 (쉼표로 구분)')
+    parser.add_argument('--output', default=DEFAULT_SYMBOL_MASTER_FILE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        rows = download_krx_listing([market for market in args.markets.split(',') if market])
+    except Exception as e:
+        # 다운로드가 실패하면 기존 파일을 그대로 둠
+        logging.error(f"종목 목록 다운로드 실패: {e}")
+        return 1
+
+    changed = write_if_changed(args.output, format_symbol_master(rows))
+    print(f"{args.output}: {len(rows)}개 종목 ({'갱신' if changed else '변경 없음'})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+import pytest
+
+from alert_engine import AlertEngine, WebhookAlertSink, decline_band
+
+
+@pytest.mark.parametrize('decline_rate, band', [
+    (None, None),
+    (0.0, 'low'),
+    (10.0, 'low'),
+    (10.01, 'medium'),
+    (30.0, 'medium'),
+    (30.01, 'high'),
+])
+def test_decline_band_boundaries(decline_rate, band):
+    assert decline_band(decline_rate) == band
+
+
+def evaluate(engine, record, decline_rate):
+    record['decline_rate'] = decline_rate
+    return engine.evaluate({'005930.KS': record})
+
+
+def test_new_record_is_initialized_without_alert():
+    engine = AlertEngine()
+    record = {'decline_rate': 35.0}
+    assert engine.evaluate({'005930.KS': record}) == []
+    assert record['alert_band'] == 'high'
+
+
+def test_up_then_down_within_hysteresis():
+    engine = AlertEngine(hysteresis=1.0)
+    record = {'alert_band': 'low'}
+
+    alerts = evaluate(engine, record, 10.5)
+    assert [(alert['previous_status'], alert['status'], alert['direction']) for alert in alerts] == [
+        ('low', 'medium', 'up')
+    ]
+
+    # 경계 아래로 1%p 미만 회복은 무시
+    assert evaluate(engine, record, 9.5) == []
+    assert evaluate(engine, record, 10.2) == []
+    assert record['alert_band'] == 'medium'
+
+    alerts = evaluate(engine, record, 9.0)
+    assert [(alert['status'], alert['direction']) for alert in alerts] == [('low', 'down')]
+
+
+def test_upper_boundary_is_inclusive_for_lower_band():
+    engine = AlertEngine()
+    record = {'alert_band': 'medium'}
+    assert evaluate(engine, record, 30.0) == []
+    assert [alert['status'] for alert in evaluate(engine, record, 30.01)] == ['high']
+    # 30%로 돌아와도 29% 이하가 아니면 경고권으로 내려가지 않음
+    assert evaluate(engine, record, 30.0) == []
+    assert [alert['status'] for alert in evaluate(engine, record, 29.0)] == ['medium']
+
+
+def test_records_with_errors_are_skipped():
+    engine = AlertEngine()
+    record = {'alert_band': 'low', 'decline_rate': 50.0, 'error_message': 'timeout'}
+    assert engine.evaluate({'005930.KS': record}) == []
+    assert record['alert_band'] == 'low'
+
+
+class FailingSink:
+    def send(self, alerts):
+        raise RuntimeError('down')
+
+
+class ListSink:
+    def __init__(self):
+        self.batches = []
+
+    def send(self, alerts):
+        self.batches.append(list(alerts))
+
+
+def test_dispatch_sends_one_batch_per_sink_and_isolates_failures():
+    sink = ListSink()
+    engine = AlertEngine([FailingSink(), sink])
+    alerts = [{'code': str(n), 'direction': 'up'} for n in range(3)]
+    engine.dispatch(alerts)
+    assert sink.batches == [alerts]
+
+
+def test_webhook_sink_posts_in_batches(monkeypatch):
+    posts = []
+
+    class Response:
+        def raise_for_status(self):
+            pass
+
+    def post(url, json, timeout):
+        posts.append(json['alerts'])
+        return Response()
+
+    monkeypatch.setattr('requests.post', post)
+    WebhookAlertSink('http://localhost/hook', batch_size=2).send([{'code': str(n)} for n in range(5)])
+    assert [len(batch) for batch in posts] == [2, 2, 1]
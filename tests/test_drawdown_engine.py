@@ -0,0 +1,71 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from drawdown_engine import PriceMatrix, compute_drawdowns, lttb_indices
+
+
+def bars(start, highs):
+    dates = np.arange(np.datetime64(start), np.datetime64(start) + len(highs))
+    highs = np.asarray(highs, dtype=float)
+    return dates, highs, highs * 0.5
+
+
+def test_uneven_histories_are_right_aligned():
+    matrix = PriceMatrix.from_series({
+        'LONG': bars('2026-01-01', [1, 2, 3, 4, 5]),
+        'SHORT': bars('2026-01-04', [7, 8]),
+        'EMPTY': ((), (), ()),
+    })
+
+    assert matrix.high.shape == (3, 5)
+    assert matrix.high[0].tolist() == [1, 2, 3, 4, 5]
+    assert np.isnan(matrix.high[1, :3]).all()
+    assert matrix.high[1, 3:].tolist() == [7, 8]
+    assert str(matrix.dates[1, -1]) == '2026-01-05'
+    assert np.isnan(matrix.high[2]).all()
+
+
+def test_windows_count_only_available_bars():
+    matrix = PriceMatrix.from_series({
+        'LONG': bars('2026-01-01', [9, 1, 1, 1, 2]),
+        'SHORT': bars('2026-01-04', [8, 4]),
+    })
+    results = compute_drawdowns(matrix, windows=(2, 4))
+
+    long = results['LONG']
+    assert long['current_price'] == 1.0
+    assert long['recent_high'] == 9.0
+    assert long['drawdowns']['2'] == {'high': 2.0, 'high_date': '2026-01-05', 'decline_rate': 50.0, 'bars': 2}
+    assert long['drawdowns']['4']['high'] == 2.0
+    assert long['drawdowns']['4']['bars'] == 4
+
+    short = results['SHORT']
+    assert short['current_price'] == 2.0
+    assert short['drawdowns']['4'] == {'high': 8.0, 'high_date': '2026-01-04', 'decline_rate': 75.0, 'bars': 2}
+    assert short['recent_high_date'] == '2026-01-04'
+
+
+def test_since_limits_base_window_and_empty_rows():
+    matrix = PriceMatrix.from_series({
+        'LONG': bars('2026-01-01', [9, 1, 1, 1, 2]),
+        'EMPTY': ((), (), ()),
+    })
+    results = compute_drawdowns(matrix, windows=(), since=datetime(2026, 1, 3))
+
+    assert results['LONG']['recent_high'] == 2.0
+    assert results['LONG']['decline_rate'] == pytest.approx(50.0)
+    assert results['EMPTY']['current_price'] is None
+    assert results['EMPTY']['drawdowns'] == {}
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    y = np.zeros(100)
+    y[37] = 10.0
+    indices = lttb_indices(y, 10)
+
+    assert len(indices) == 10
+    assert indices[0] == 0 and indices[-1] == 99
+    assert 37 in indices
+    assert lttb_indices(y[:5], 10).tolist() == [0, 1, 2, 3, 4]
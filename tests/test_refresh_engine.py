@@ -0,0 +1,66 @@
+import threading
+import time
+
+from refresh_engine import RefreshEngine
+
+
+def test_units_complete_with_per_code_results():
+    engine = RefreshEngine(max_workers=2, requests_per_second=None)
+    results, report = engine.run([['A', 'B'], ['C']], lambda unit: {code: code.lower() for code in unit})
+
+    assert results == {'A': 'a', 'B': 'b', 'C': 'c'}
+    assert {entry['status'] for entry in report} == {'success'}
+
+
+def test_failing_unit_is_retried_then_reported():
+    calls = []
+
+    def fetch(unit):
+        calls.append(unit)
+        raise ValueError('boom')
+
+    engine = RefreshEngine(max_workers=1, requests_per_second=None, max_retries=1, backoff_base=0.001)
+    results, report = engine.run([['A']], fetch)
+
+    assert len(calls) == 2
+    assert isinstance(results['A'], ValueError)
+    assert report[0]['status'] == 'error' and report[0]['attempts'] == 2
+
+
+def test_queued_units_time_out_when_every_worker_is_stuck():
+    release = threading.Event()
+
+    def fetch(unit):
+        if unit == ['A']:
+            release.wait(10)
+        return {code: 1 for code in unit}
+
+    engine = RefreshEngine(max_workers=1, requests_per_second=None, deadline=0.3)
+    start = time.monotonic()
+    try:
+        results, report = engine.run([['A'], ['B']], fetch)
+    finally:
+        release.set()
+
+    assert time.monotonic() - start < 2.0
+    assert isinstance(results['A'], TimeoutError)
+    assert isinstance(results['B'], TimeoutError)
+    assert [entry['status'] for entry in report] == ['timeout', 'timeout']
+
+
+def test_free_worker_keeps_draining_queue_while_another_is_stuck():
+    release = threading.Event()
+
+    def fetch(unit):
+        if unit == ['A']:
+            release.wait(10)
+        return {code: 1 for code in unit}
+
+    engine = RefreshEngine(max_workers=2, requests_per_second=None, deadline=0.3)
+    try:
+        results, _ = engine.run([['A'], ['B'], ['C'], ['D']], fetch)
+    finally:
+        release.set()
+
+    assert isinstance(results['A'], TimeoutError)
+    assert [results[code] for code in 'BCD'] == [1, 1, 1]
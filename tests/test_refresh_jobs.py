@@ -0,0 +1,86 @@
+import json
+import threading
+import time
+
+from refresh_jobs import RefreshJobManager
+
+
+class FakeTracker:
+    """refresh_all_stocks가 release될 때까지 멈춰 있는 추적기"""
+
+    def __init__(self, total=3):
+        self.stocks = {str(n): {} for n in range(total)}
+        self.last_schedule_report = {'skipped': {'KRX': 1}}
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.calls = 0
+
+    def refresh_all_stocks(self, progress_callback=None):
+        self.calls += 1
+        self.started.set()
+        progress_callback(1, len(self.stocks), 0)
+        assert self.release.wait(10)
+        progress_callback(len(self.stocks), len(self.stocks), 0)
+        return len(self.stocks)
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_in_memory_jobs_attach_to_running_refresh():
+    tracker = FakeTracker()
+    manager = RefreshJobManager(tracker)
+    job = manager.start_refresh()
+    assert job['attached'] is False and job['status'] == 'running'
+    assert tracker.started.wait(5)
+
+    assert manager.start_refresh()['id'] == job['id']
+    tracker.release.set()
+    wait_for(lambda: manager.get_job(job['id'])['status'] == 'completed')
+
+    finished = manager.get_job(job['id'])
+    assert (finished['done'], finished['total'], finished['updated_count'], finished['skipped_count']) == (3, 3, 3, 1)
+    assert tracker.calls == 1
+
+
+def test_workers_share_jobs_through_state_file(tmp_path):
+    state_file = str(tmp_path / 'refresh_jobs.json')
+    first_tracker, second_tracker = FakeTracker(), FakeTracker()
+    first = RefreshJobManager(first_tracker, state_file)
+    second = RefreshJobManager(second_tracker, state_file)
+
+    job = first.start_refresh()
+    assert first_tracker.started.wait(5)
+
+    # 다른 워커도 같은 작업을 조회하고, 새로 시작하지 않고 합류함
+    assert second.get_job(job['id'])['status'] == 'running'
+    attached = second.start_refresh()
+    assert attached['attached'] is True and attached['id'] == job['id']
+    assert second_tracker.calls == 0
+
+    first_tracker.release.set()
+    wait_for(lambda: second.get_job(job['id'])['status'] == 'completed')
+    assert second.get_job(job['id'])['done'] == 3
+
+
+def test_job_of_dead_process_is_not_joined(tmp_path):
+    state_file = tmp_path / 'refresh_jobs.json'
+    now = time.time()
+    state_file.write_text(json.dumps({'old': {
+        'id': 'old', 'status': 'running', 'done': 0, 'total': 1, 'failures': 0,
+        'updated_count': None, 'skipped_count': None, 'error': None,
+        'started_at': None, 'finished_at': None,
+        '_started': now, '_finished': None, '_owner': 2 ** 22 + 1, '_heartbeat': now
+    }}))
+
+    tracker = FakeTracker()
+    manager = RefreshJobManager(tracker, str(state_file))
+    job = manager.start_refresh()
+    assert job['attached'] is False and job['id'] != 'old'
+    assert manager.get_job('old')['status'] == 'failed'
+    tracker.release.set()
+    wait_for(lambda: manager.get_job(job['id'])['status'] == 'completed')
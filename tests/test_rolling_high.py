@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from rolling_high import RollingHigh
+
+pytest.importorskip('pandas')
+
+from drawdown_engine import PriceMatrix, compute_drawdowns
+from market_data import MarketDataProvider, slice_history
+from refresh_engine import RefreshEngine
+from stock_tracker import StockTracker
+from synthetic_market import SyntheticMarket
+
+
+def test_push_keeps_non_increasing_highs_and_earliest_date():
+    rolling = RollingHigh(90)
+    for date, high in [('2026-01-01', 5), ('2026-01-02', 3), ('2026-01-03', 4), ('2026-01-04', 5)]:
+        assert rolling.push(date, high)
+
+    assert list(rolling.entries) == [('2026-01-01', 5.0), ('2026-01-04', 5.0)]
+    assert rolling.high == ('2026-01-01', 5.0)
+
+
+def test_evict_drops_bars_outside_window():
+    rolling = RollingHigh.from_bars(10, [('2026-01-01', 9), ('2026-01-05', 4), ('2026-01-08', 6)],
+                                    as_of=datetime(2026, 1, 12))
+    assert rolling.high == ('2026-01-08', 6.0)
+
+    rolling.evict(as_of=datetime(2026, 1, 20))
+    assert rolling.high == (None, None)
+
+
+def test_same_day_update_and_non_incremental_cases():
+    rolling = RollingHigh.from_bars(90, [('2026-01-01', 5), ('2026-01-02', 3)], as_of=datetime(2026, 1, 2))
+    assert rolling.push('2026-01-02', 6)
+    assert list(rolling.entries) == [('2026-01-02', 6.0)]
+
+    # 과거 날짜나 당일 고가 하락은 덱만으로 반영할 수 없음
+    assert not rolling.push('2026-01-01', 7)
+    assert not rolling.push('2026-01-02', 5)
+
+
+def test_state_round_trips_through_record():
+    rolling = RollingHigh.from_bars(90, [('2026-01-01', 5), ('2026-01-02', 3)], as_of=datetime(2026, 1, 2))
+    restored = RollingHigh.from_dict(rolling.to_dict(), 90)
+    assert list(restored.entries) == list(rolling.entries)
+    assert restored.last_date == '2026-01-02'
+    assert RollingHigh.from_dict(rolling.to_dict(), 60) is None
+
+
+def expected_high(tracker, code):
+    start_date, _ = tracker._get_history_range()
+    series = tracker.price_store.load_price_series([code], start_date)
+    result = compute_drawdowns(PriceMatrix.from_series(series), (), since=tracker._get_recent_high_start())[code]
+    return result['recent_high'], result['recent_high_date'], result['decline_rate']
+
+
+class DelayedMarket(MarketDataProvider):
+    """SyntheticMarket과 같은 봉을 cutoff 이전까지만 보여 주는 제공자"""
+
+    def __init__(self, market, cutoff):
+        self.market = market
+        self.cutoff = cutoff
+
+    def get_history(self, symbols, start, end):
+        return {symbol: slice_history(self.market.history(symbol), start, min(end, self.cutoff)) for symbol in symbols}
+
+
+def test_refresh_pushes_only_appended_bars(tmp_path, monkeypatch):
+    market = SyntheticMarket()
+    tracker = StockTracker(
+        data_file=str(tmp_path / 'stocks.json'),
+        provider=DelayedMarket(market, datetime.now() - timedelta(days=7)),
+        refresh_engine=RefreshEngine(requests_per_second=None),
+        shared_state=False
+    )
+    assert tracker.add_stock('005930.KS', '삼성전자')
+    record = tracker.stocks['005930.KS']
+    first_last_date = record['high_window']['last_date']
+    assert (record['recent_high'], record['recent_high_date']) == expected_high(tracker, '005930.KS')[:2]
+
+    rebuilds = []
+    original = RollingHigh.from_bars.__func__
+    monkeypatch.setattr(RollingHigh, 'from_bars',
+                        classmethod(lambda cls, *args, **kwargs: rebuilds.append(args) or original(cls, *args, **kwargs)))
+
+    tracker.provider = market
+    tracker.update_stock_data('005930.KS')
+
+    record = tracker.stocks['005930.KS']
+    assert rebuilds == []
+    assert record['high_window']['last_date'] > first_last_date
+    high, high_date, decline_rate = expected_high(tracker, '005930.KS')
+    assert (record['recent_high'], record['recent_high_date']) == (high, high_date)
+    assert record['decline_rate'] == pytest.approx(decline_rate)
@@ -0,0 +1,72 @@
+import json
+import multiprocessing
+
+import pytest
+
+pytest.importorskip('pandas')
+
+from refresh_engine import RefreshEngine
+from stock_tracker import StockTracker
+from synthetic_market import SyntheticMarket
+
+
+def make_tracker(data_file):
+    return StockTracker(
+        data_file=data_file,
+        provider=SyntheticMarket(),
+        refresh_engine=RefreshEngine(requests_per_second=1e6),
+        shared_state=True
+    )
+
+
+def add_and_remove(data_file, prefix, count, barrier):
+    """종목을 하나씩 추가한 뒤 짝수 번째 종목을 제거 (다른 프로세스와 동시에 실행)"""
+    tracker = make_tracker(data_file)
+    codes = [f"{prefix}{n:04d}.KS" for n in range(count)]
+    barrier.wait()
+    for code in codes:
+        assert tracker.add_stock(code, code)
+    for code in codes[::2]:
+        assert tracker.remove_stock(code)
+
+
+def test_two_processes_add_and_remove_without_losing_writes(tmp_path):
+    data_file = str(tmp_path / 'stocks.json')
+    count = 6
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(2)
+    workers = [
+        context.Process(target=add_and_remove, args=(data_file, prefix, count, barrier))
+        for prefix in ('10', '20')
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(120)
+        assert worker.exitcode == 0
+
+    expected = {f"{prefix}{n:04d}.KS" for prefix in ('10', '20') for n in range(1, count, 2)}
+    with open(data_file, encoding='utf-8') as f:
+        assert set(json.load(f)) == expected
+
+    tracker = make_tracker(data_file)
+    assert set(tracker.stocks) == expected
+    assert all(tracker.stocks[code]['current_price'] for code in expected)
+
+
+def test_sync_picks_up_other_process_writes(tmp_path):
+    data_file = str(tmp_path / 'stocks.json')
+    reader = make_tracker(data_file)
+    writer = make_tracker(data_file)
+    seen = []
+    reader.add_listener(lambda event, payload: seen.append(event))
+
+    assert writer.add_stock('300000.KS', 'A')
+    assert reader.sync()
+    assert '300000.KS' in reader.stocks
+    assert seen == ['added']
+
+    assert writer.remove_stock('300000.KS')
+    assert reader.sync()
+    assert reader.stocks == {}
+    assert seen == ['added', 'removed']
@@ -0,0 +1,67 @@
+import time
+
+from stock_events import StockEventBroker
+
+
+def collect(broker, last_event_id=None):
+    return list(broker.stream(last_event_id))
+
+
+def events(messages):
+    return [line.split(': ', 1)[1] for message in messages for line in message.splitlines()
+            if line.startswith('event: ')]
+
+
+def make_broker(**kwargs):
+    options = {'heartbeat_seconds': 0.02, 'max_stream_seconds': 0.05}
+    options.update(kwargs)
+    return StockEventBroker(**options)
+
+
+def test_resume_sends_only_missed_events():
+    broker = make_broker()
+    first = broker.publish('stocks', {'n': 1})
+    broker.publish('stocks', {'n': 2})
+    broker.publish('removed', {'code': 'A'})
+
+    messages = collect(broker, first)
+    assert events(messages) == ['stocks', 'removed']
+    assert '"n":2' in ''.join(messages)
+
+
+def test_same_broker_id_outside_history_gets_reset():
+    broker = make_broker(history_size=2)
+    first = broker.publish('stocks', {'n': 1})
+    for n in range(2, 5):
+        broker.publish('stocks', {'n': n})
+
+    assert events(collect(broker, first)) == ['reset']
+
+
+def test_unknown_or_malformed_id_gets_reset():
+    broker = make_broker()
+    broker.publish('stocks', {'n': 1})
+
+    for last_event_id in ('deadbeef-1', 'garbage', f'{broker.broker_id}-x'):
+        messages = collect(broker, last_event_id)
+        assert events(messages) == ['reset']
+        assert f'id: {broker.broker_id}-1\n' in messages[1]
+
+
+def test_first_connection_starts_quietly_with_current_id():
+    broker = make_broker()
+    broker.publish('stocks', {'n': 1})
+
+    messages = collect(broker)
+    assert events(messages) == []
+    # 이벤트 없이 연결이 끝나도 재접속 때 이 순번부터 이어 받을 수 있게 ID를 알려 줌
+    assert f'id: {broker.broker_id}-1\n\n' in messages
+
+
+def test_stream_ends_after_max_lifetime():
+    broker = make_broker(heartbeat_seconds=10.0, max_stream_seconds=0.1)
+    start = time.monotonic()
+    messages = collect(broker)
+    assert time.monotonic() - start < 1.0
+    assert messages[0].startswith('retry: ')
+    assert broker.subscribers == 0